@@ -1,23 +1,62 @@
 """
 Quantitative analytics and statistical computations.
 """
-from .sampling import load_ticks, resample_ticks
+from .sampling import (
+    load_ticks,
+    resample_ticks,
+    resample_ticks_sql,
+    resample_ticks_chunked,
+    load_bars,
+    last_bar_timestamp
+)
 from .regression import compute_hedge_ratio
+from .kalman import KalmanHedgeRatio, kalman_filter, kalman_hedge_ratio
+from .alignment import asof_align, asof_indices
 from .stats import (
+    pair_prices,
     compute_spread,
     compute_zscore,
     compute_rolling_correlation,
     price_statistics
 )
+from .correlation import RollingCorrelationMatrix, compute_correlation_matrix
+from .live_state import LiveAnalyticsState, restore_live_state
 from .stationarity import adf_test
+from .backtest import backtest_grid, backtest_pairs
+from .executor import AnalyticsExecutor, AnalyticsCancelled
+from .pipeline import run_pair_analytics
+from .cache import ResultCache
+from .profiling import StageProfiler, cprofile_run
 
 __all__ = [
     'load_ticks',
     'resample_ticks',
+    'resample_ticks_sql',
+    'resample_ticks_chunked',
+    'load_bars',
+    'last_bar_timestamp',
     'compute_hedge_ratio',
+    'KalmanHedgeRatio',
+    'kalman_filter',
+    'kalman_hedge_ratio',
+    'asof_align',
+    'asof_indices',
+    'pair_prices',
     'compute_spread',
     'compute_zscore',
     'compute_rolling_correlation',
     'price_statistics',
-    'adf_test'
+    'RollingCorrelationMatrix',
+    'compute_correlation_matrix',
+    'LiveAnalyticsState',
+    'restore_live_state',
+    'adf_test',
+    'backtest_grid',
+    'backtest_pairs',
+    'AnalyticsExecutor',
+    'AnalyticsCancelled',
+    'run_pair_analytics',
+    'ResultCache',
+    'StageProfiler',
+    'cprofile_run'
 ]
@@ -0,0 +1,98 @@
+import numpy as np
+import pandas as pd
+
+
+def asof_indices(left_ts, right_ts, tolerance_ns=None):
+    """
+    For each left timestamp, the position of the latest right timestamp at
+    or before it (vectorized binary search over sorted int64 arrays).
+
+    Args:
+        left_ts: Sorted int64 epoch-nanosecond array to align
+        right_ts: Sorted int64 epoch-nanosecond array to look up
+        tolerance_ns: Max age of the matched right timestamp; older
+            matches count as missing
+
+    Returns:
+        int64 array of positions into right_ts, -1 where there is no match
+    """
+    if 2 * len(right_ts) < len(left_ts):
+        # Sparse right side (illiquid leg): place the few right timestamps
+        # into left instead, then count right ticks at or before each left
+        # one. O(m log n + n) beats O(n log m) binary searches per left row.
+        positions = np.searchsorted(left_ts, right_ts, side="left")
+        counts = np.bincount(positions, minlength=len(left_ts) + 1)[:len(left_ts)]
+        idx = np.cumsum(counts) - 1
+    else:
+        idx = np.searchsorted(right_ts, left_ts, side="right") - 1
+
+    if tolerance_ns is not None and len(right_ts):
+        # Gather with a clamped index instead of boolean-mask fancy indexing;
+        # rows with idx == -1 stay -1 either way
+        age = left_ts - right_ts[np.maximum(idx, 0)]
+        idx[age > tolerance_ns] = -1
+
+    return idx
+
+
+def _leg(ticks, symbol):
+    """
+    Sorted (int64 ns timestamps, float64 prices) of one symbol's ticks.
+    """
+    leg = ticks[ticks["symbol"] == symbol]
+    index = leg.index
+    ts = index.as_unit("ns").asi8 if isinstance(index, pd.DatetimeIndex) else index.to_numpy("int64")
+    prices = leg["price"].to_numpy("float64")
+
+    if len(ts) > 1 and (np.diff(ts) < 0).any():
+        order = np.argsort(ts, kind="stable")
+        ts, prices = ts[order], prices[order]
+
+    return ts, prices
+
+
+def asof_align(ticks, symbol_a, symbol_b, tolerance=None):
+    """
+    Tick-resolution as-of alignment of a pair.
+
+    Every tick of `symbol_a` is paired with the latest `symbol_b` price at
+    or before it; pairs whose B price is older than `tolerance` are dropped.
+    Unlike pivoting bars and calling `.dropna()`, no A observation is lost
+    just because B did not trade in the same bucket. Several A ticks with
+    the same timestamp collapse to the last one.
+
+    The result has the same layout as the pivoted bar frames, so it can be
+    passed straight to `compute_hedge_ratio`, `kalman_hedge_ratio` and
+    `compute_spread` in place of bars.
+
+    Args:
+        ticks: Output of `load_ticks` (plain or compact)
+        symbol_a: Leg whose ticks drive the alignment (uppercase)
+        symbol_b: Leg looked up as of each A tick (uppercase)
+        tolerance: Max staleness of B (Timedelta, string like '5s', or
+            nanoseconds); None accepts any age
+
+    Returns:
+        DataFrame indexed by ts with columns symbol_a and symbol_b
+    """
+    columns = pd.Index([symbol_a, symbol_b], name="symbol")
+    if ticks.empty:
+        return pd.DataFrame(columns=columns, index=pd.DatetimeIndex([], name="ts"))
+
+    a_ts, a_price = _leg(ticks, symbol_a)
+    b_ts, b_price = _leg(ticks, symbol_b)
+
+    # Keep the last A tick per timestamp
+    if len(a_ts) > 1:
+        last = np.append(a_ts[1:] != a_ts[:-1], True)
+        a_ts, a_price = a_ts[last], a_price[last]
+
+    tolerance_ns = None if tolerance is None else pd.Timedelta(tolerance).value
+    idx = asof_indices(a_ts, b_ts, tolerance_ns)
+    matched = idx >= 0
+
+    return pd.DataFrame(
+        {symbol_a: a_price[matched], symbol_b: b_price[idx[matched]]},
+        index=pd.DatetimeIndex(pd.to_datetime(a_ts[matched], unit="ns"), name="ts"),
+        columns=columns
+    )
@@ -0,0 +1,297 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from .regression import compute_hedge_ratio
+from .stats import compute_spread, compute_zscore
+
+# Bars per year for each timeframe (crypto futures trade 24/7)
+PERIODS_PER_YEAR = {
+    "1s": 365 * 24 * 60 * 60,
+    "1m": 365 * 24 * 60,
+    "5m": 365 * 24 * 12
+}
+
+RESULT_COLUMNS = [
+    "window", "entry", "exit", "pnl", "sharpe",
+    "turnover", "n_trades", "hit_rate"
+]
+
+
+def _ffill_events(events):
+    """
+    Forward-fill NaN entries along the last axis, starting flat (0).
+    """
+    t = np.arange(events.shape[-1])
+    idx = np.where(np.isnan(events), 0, t)
+    idx = np.maximum.accumulate(idx, axis=-1)
+    filled = np.take_along_axis(events, idx, axis=-1)
+    return np.nan_to_num(filled, nan=0.0)
+
+
+def _grid_positions(z, entry, exit_):
+    """
+    Simulate mean-reversion positions for every (entry, exit) pair at once.
+
+    Long the spread when z <= -entry and hold until z >= -exit; short the
+    spread when z >= entry and hold until z <= exit.
+
+    Args:
+        z: Array of z-scores, shape (T,)
+        entry: Entry thresholds, shape (E,)
+        exit_: Exit thresholds, shape (X,)
+
+    Returns:
+        Array of positions in {-1, 0, 1}, shape (E, X, T)
+    """
+    shape = (len(entry), len(exit_), len(z))
+    zz = z[None, None, :]
+    en = entry[:, None, None]
+    ex = exit_[None, :, None]
+
+    long_events = np.full(shape, np.nan)
+    long_events[np.broadcast_to(zz <= -en, shape)] = 1.0
+    long_events[np.broadcast_to(zz >= -ex, shape)] = 0.0
+
+    short_events = np.full(shape, np.nan)
+    short_events[np.broadcast_to(zz >= en, shape)] = -1.0
+    short_events[np.broadcast_to(zz <= ex, shape)] = 0.0
+
+    return _ffill_events(long_events) + _ffill_events(short_events)
+
+
+def _grid_metrics(pos, move, cost, valid, periods_per_year):
+    """
+    Compute PnL, Sharpe, turnover and hit rate for a stack of position paths.
+
+    Args:
+        pos: Positions, shape (G, T)
+        move: PnL of one unit of spread held from the previous bar's close
+            into each bar, shape (T,) (see `_spread_moves`)
+        cost: Fee per unit of position change at each bar, shape (T,)
+        valid: Boolean mask of bars used for Sharpe, shape (T,)
+        periods_per_year: Annualization factor for Sharpe (None = per bar)
+
+    Returns:
+        Dictionary of metric arrays, each shape (G,)
+    """
+    n_paths, n_bars = pos.shape
+
+    prev = np.zeros_like(pos)
+    prev[:, 1:] = pos[:, :-1]
+    changed = pos != prev
+
+    # Position decided at the close of bar t-1 earns the move into bar t
+    gross = prev * move
+
+    # A change always closes |prev| units and opens |pos| units
+    exit_fee = cost * np.abs(prev) * changed
+    entry_fee = cost * np.abs(pos) * changed
+    net = gross - exit_fee - entry_fee
+
+    opened = changed & (pos != 0)
+    trade_id = np.cumsum(opened, axis=1)
+    prev_id = np.zeros_like(trade_id)
+    prev_id[:, 1:] = trade_id[:, :-1]
+    n_trades = trade_id[:, -1]
+
+    # Attribute every bar's PnL and fees to the trade that produced it
+    n_slots = int(n_trades.max()) + 1
+    rows = np.arange(n_paths)[:, None] * n_slots
+    held = prev != 0
+    entered = opened
+    keys = np.concatenate([(rows + prev_id)[held], (rows + trade_id)[entered]])
+    weights = np.concatenate([(gross - exit_fee)[held], -entry_fee[entered]])
+    trade_pnl = np.bincount(
+        keys, weights=weights, minlength=n_paths * n_slots
+    ).reshape(n_paths, n_slots)
+
+    # Closed trades are ids 1..n_trades, minus one still open at the end
+    slot = np.arange(n_slots)[None, :]
+    n_closed = n_trades - (pos[:, -1] != 0)
+    closed = (slot >= 1) & (slot <= n_closed[:, None])
+    wins = ((trade_pnl > 0) & closed).sum(axis=1)
+
+    sample = net[:, valid]
+    std = sample.std(axis=1, ddof=1) if sample.shape[1] > 1 else np.full(n_paths, np.nan)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sharpe = np.where(std > 0, sample.mean(axis=1) / std, np.nan)
+        hit_rate = np.where(n_closed > 0, wins / n_closed, np.nan)
+
+    if periods_per_year:
+        sharpe = sharpe * np.sqrt(periods_per_year)
+
+    return {
+        "pnl": net.sum(axis=1),
+        "sharpe": sharpe,
+        "turnover": np.abs(pos - prev).sum(axis=1),
+        "n_trades": n_trades,
+        "hit_rate": hit_rate
+    }
+
+
+def _spread_moves(price_a, price_b, beta):
+    """
+    Per-unit PnL of holding the spread (long A / short β·B) from each bar's
+    close into the next, leg by leg.
+
+    The position entered at bar t-1 holds β_{t-1} units of B, so the move
+    into bar t is ΔA_t − β_{t-1}·ΔB_t. With a time-varying β this differs
+    from diff(A − β·B), which would also book the re-hedge −Δβ·B as PnL.
+    Bars whose previous β is unknown (NaN) move 0; nothing is held there.
+
+    Returns:
+        Array of shape (T,), 0 at the first bar
+    """
+    move = np.zeros(len(price_a))
+    move[1:] = np.diff(price_a) - beta[:-1] * np.diff(price_b)
+    return np.nan_to_num(move, nan=0.0)
+
+
+def backtest_grid(spread_df, symbol_a, symbol_b, hedge_ratio,
+                  windows, entry_thresholds, exit_thresholds,
+                  fee_bps=0.0, periods_per_year=None):
+    """
+    Vectorized mean-reversion backtest over a (window, entry, exit) grid.
+
+    For each rolling window the z-score is computed once with
+    `compute_zscore`; all (entry, exit) combinations are then simulated
+    together as NumPy arrays. Positions are taken on the spread
+    (+1 = long A / short β·B) at bar close and earn the next bar's move,
+    valued per leg so a dynamic (e.g. Kalman) β is re-hedged, not booked
+    as PnL. Bars before β is known (NaN) are never traded.
+    Fees are charged per unit of position change on the gross notional
+    of both legs.
+
+    Args:
+        spread_df: DataFrame from `compute_spread` (columns symbol_a,
+            symbol_b, 'spread'; timestamp index)
+        symbol_a: First symbol name
+        symbol_b: Second symbol name
+        hedge_ratio: Hedge ratio used to build the spread (float or
+            Series indexed like spread_df)
+        windows: Iterable of rolling window sizes
+        entry_thresholds: Iterable of |z| entry levels
+        exit_thresholds: Iterable of exit levels (must be < entry)
+        fee_bps: Fee per trade in basis points of gross notional
+        periods_per_year: Annualization factor for Sharpe (None = per bar)
+
+    Returns:
+        DataFrame with one row per valid combination and columns
+        window, entry, exit, pnl, sharpe, turnover, n_trades, hit_rate,
+        sorted by Sharpe (best first)
+    """
+    if spread_df.empty:
+        return pd.DataFrame(columns=RESULT_COLUMNS)
+
+    entry = np.asarray(sorted(entry_thresholds), dtype=float)
+    exit_ = np.asarray(sorted(exit_thresholds), dtype=float)
+
+    price_a = spread_df[symbol_a].to_numpy(dtype=float)
+    price_b = spread_df[symbol_b].to_numpy(dtype=float)
+
+    if isinstance(hedge_ratio, pd.Series):
+        beta = hedge_ratio.reindex(spread_df.index).to_numpy(dtype=float)
+    else:
+        beta = np.full(len(spread_df), float(hedge_ratio))
+    hedged = ~np.isnan(beta)
+
+    move = _spread_moves(price_a, price_b, beta)
+    notional = np.abs(price_a) + np.abs(beta) * np.abs(price_b)
+    cost = np.where(hedged, notional * fee_bps / 10_000, 0.0)
+
+    ee, xx = np.meshgrid(entry, exit_, indexing="ij")
+    # Exits must sit strictly inside the entry band
+    keep = ((xx < ee) & (xx > -ee)).ravel()
+
+    results = []
+
+    for window in windows:
+        z = compute_zscore(spread_df["spread"], window).to_numpy(dtype=float)
+        # No signal (hence no position) until β is known
+        z = np.where(hedged, z, np.nan)
+        valid = ~np.isnan(z)
+
+        pos = _grid_positions(z, entry, exit_).reshape(-1, len(z))
+        metrics = _grid_metrics(pos, move, cost, valid, periods_per_year)
+
+        frame = pd.DataFrame({"window": window, "entry": ee.ravel(), "exit": xx.ravel()})
+        for name, values in metrics.items():
+            frame[name] = values
+
+        results.append(frame[keep])
+
+    if not results:
+        return pd.DataFrame(columns=RESULT_COLUMNS)
+
+    return (
+        pd.concat(results, ignore_index=True)
+        .sort_values("sharpe", ascending=False, na_position="last")
+        .reset_index(drop=True)
+    )
+
+
+def _backtest_pair(args):
+    """
+    Worker: fit the hedge ratio for one pair and run its grid backtest.
+    """
+    df, symbol_a, symbol_b, grid_kwargs = args
+
+    hedge = compute_hedge_ratio(df, symbol_a, symbol_b)
+    if hedge is None:
+        return None
+
+    spread_df = compute_spread(df, symbol_a, symbol_b, hedge)
+    result = backtest_grid(spread_df, symbol_a, symbol_b, hedge, **grid_kwargs)
+
+    result.insert(0, "hedge_ratio", hedge)
+    result.insert(0, "symbol_b", symbol_b)
+    result.insert(0, "symbol_a", symbol_a)
+
+    return result
+
+
+def backtest_pairs(df, pairs, windows, entry_thresholds, exit_thresholds,
+                   fee_bps=0.0, periods_per_year=None, max_workers=None):
+    """
+    Run `backtest_grid` for many pairs in parallel across CPU cores.
+
+    Each pair gets an in-sample OLS hedge ratio (`compute_hedge_ratio`)
+    before its grid is simulated in a worker process.
+
+    Args:
+        df: Resampled DataFrame with columns 'symbol', 'ts', 'price_close'
+        pairs: Iterable of (symbol_a, symbol_b) tuples
+        windows, entry_thresholds, exit_thresholds, fee_bps,
+        periods_per_year: Passed through to `backtest_grid`
+        max_workers: Number of worker processes (None = CPU count)
+
+    Returns:
+        DataFrame of grid results for all pairs with leading columns
+        symbol_a, symbol_b, hedge_ratio
+    """
+    grid_kwargs = {
+        "windows": list(windows),
+        "entry_thresholds": list(entry_thresholds),
+        "exit_thresholds": list(exit_thresholds),
+        "fee_bps": fee_bps,
+        "periods_per_year": periods_per_year
+    }
+
+    jobs = []
+    for symbol_a, symbol_b in pairs:
+        # Ship only the two legs to each worker
+        legs = df[df["symbol"].isin([symbol_a, symbol_b])]
+        jobs.append((legs, symbol_a, symbol_b, grid_kwargs))
+
+    if not jobs:
+        return pd.DataFrame()
+
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        results = [r for r in pool.map(_backtest_pair, jobs) if r is not None]
+
+    if not results:
+        return pd.DataFrame()
+
+    return pd.concat(results, ignore_index=True)
@@ -0,0 +1,147 @@
+import sys
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+
+import numpy as np
+import pandas as pd
+
+
+class LeaderAborted(Exception):
+    """
+    The session computing a shared result stopped before finishing
+    (e.g. its Streamlit script was rerun); waiters should retry.
+    """
+
+
+def estimate_size(obj):
+    """
+    Approximate memory footprint of a cached value in bytes.
+    """
+    if isinstance(obj, np.ndarray):
+        return int(obj.nbytes)
+    if isinstance(obj, (pd.DataFrame, pd.Series)):
+        usage = obj.memory_usage(deep=True)
+        return int(usage.sum() if isinstance(usage, pd.Series) else usage)
+    if isinstance(obj, dict):
+        return sys.getsizeof(obj) + sum(estimate_size(k) + estimate_size(v) for k, v in obj.items())
+    if isinstance(obj, (list, tuple)):
+        return sys.getsizeof(obj) + sum(estimate_size(v) for v in obj)
+    return sys.getsizeof(obj)
+
+
+class ResultCache:
+    """
+    Thread-safe LRU cache for analytics results shared by all sessions.
+
+    Entries are evicted least-recently-used first once their estimated
+    size exceeds `max_bytes`. Concurrent requests for the same key are
+    coalesced (single-flight): one caller computes, the rest wait for it.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._inflight = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+    def get_or_compute(self, key, compute, timeout=None):
+        """
+        Return the cached value for `key`, computing it at most once.
+
+        Args:
+            key: Hashable cache key
+            compute: Zero-argument callable producing the value
+            timeout: Max seconds to wait on another caller's computation
+
+        Returns:
+            The cached or freshly computed value
+        """
+        while True:
+            with self._lock:
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return self._entries[key][0]
+
+                future = self._inflight.get(key)
+                leader = future is None
+                if leader:
+                    future = Future()
+                    self._inflight[key] = future
+                    self.misses += 1
+                else:
+                    self.coalesced += 1
+
+            if leader:
+                return self._compute(key, future, compute)
+
+            try:
+                return future.result(timeout=timeout)
+            except LeaderAborted:
+                continue
+
+    def _compute(self, key, future, compute):
+        try:
+            value = compute()
+        except Exception as e:
+            self._finish(key)
+            future.set_exception(e)
+            raise
+        except BaseException:
+            # Script stop/rerun: let a waiting session take over
+            self._finish(key)
+            future.set_exception(LeaderAborted())
+            raise
+
+        self._finish(key, value)
+        future.set_result(value)
+        return value
+
+    def _finish(self, key, value=None):
+        with self._lock:
+            self._inflight.pop(key, None)
+            if value is None:
+                return
+
+            size = estimate_size(value)
+            if size > self.max_bytes:
+                return
+
+            if key in self._entries:
+                self._bytes -= self._entries.pop(key)[1]
+            self._entries[key] = (value, size)
+            self._bytes += size
+
+            while self._bytes > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._bytes -= evicted
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def metrics(self):
+        """
+        Hit/miss counters and memory usage.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses + self.coalesced
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hit_rate": (self.hits + self.coalesced) / lookups if lookups else None
+            }
@@ -0,0 +1,195 @@
+import numpy as np
+import pandas as pd
+
+
+class RollingCorrelationMatrix:
+    """
+    Incrementally maintained N×N rolling covariance/correlation matrix.
+
+    Keeps running sums Σx and Σxxᵀ over a circular buffer of the last
+    `window` observations. Each `update` adds the new row and evicts the
+    oldest one, costing O(N²) instead of recomputing the whole window.
+
+    Prices are stored relative to the first observation of each symbol
+    (covariance is shift-invariant), and the sums are rebuilt from the
+    buffer once per window to stop floating-point drift from accumulating.
+    """
+
+    def __init__(self, symbols, window):
+        """
+        Args:
+            symbols: List of symbol names (matrix row/column order)
+            window: Number of observations in the rolling window
+        """
+        if window < 2:
+            raise ValueError("window must be at least 2")
+
+        self.symbols = list(symbols)
+        self.window = window
+        n = len(self.symbols)
+
+        self.buffer = np.zeros((window, n))
+        self.pos = 0
+        self.count = 0
+        self.sum = np.zeros(n)
+        self.cross = np.zeros((n, n))
+
+        self.ref = None
+        self.last = np.full(n, np.nan)
+        self._since_resync = 0
+
+    def update(self, values):
+        """
+        Add one observation (e.g. the close of every symbol at a bar close).
+
+        Missing values (NaN or absent keys) carry forward the symbol's last
+        value. Observations are skipped until every symbol has been seen.
+
+        Args:
+            values: Array of shape (N,) in `symbols` order, or a dict of
+                symbol -> value
+
+        Returns:
+            True if the observation entered the window, else False
+        """
+        if isinstance(values, dict):
+            values = [values.get(s, np.nan) for s in self.symbols]
+        x = np.asarray(values, dtype=float)
+
+        x = np.where(np.isnan(x), self.last, x)
+        self.last = x
+        if np.isnan(x).any():
+            return False
+
+        if self.ref is None:
+            self.ref = x.copy()
+        x = x - self.ref
+
+        if self.count == self.window:
+            old = self.buffer[self.pos]
+            self.sum -= old
+            self.cross -= np.outer(old, old)
+        else:
+            self.count += 1
+
+        self.buffer[self.pos] = x
+        self.sum += x
+        self.cross += np.outer(x, x)
+        self.pos = (self.pos + 1) % self.window
+
+        self._since_resync += 1
+        if self._since_resync >= self.window:
+            self._resync()
+
+        return True
+
+    def _resync(self):
+        """
+        Recompute the running sums exactly from the buffer.
+        """
+        rows = self.buffer[:self.count]
+        self.sum = rows.sum(axis=0)
+        self.cross = rows.T @ rows
+        self._since_resync = 0
+
+    def get_state(self):
+        """
+        Window buffer and running sums as a dict of arrays (e.g. for
+        `np.savez`). `ref` is NaN until the first complete observation.
+        """
+        n = len(self.symbols)
+        return {
+            "buffer": self.buffer.copy(),
+            "pos": np.int64(self.pos),
+            "count": np.int64(self.count),
+            "sum": self.sum.copy(),
+            "cross": self.cross.copy(),
+            "ref": np.full(n, np.nan) if self.ref is None else self.ref.copy(),
+            "last": self.last.copy(),
+            "since_resync": np.int64(self._since_resync)
+        }
+
+    def set_state(self, state):
+        """
+        Restore a state produced by `get_state` for the same symbols and window.
+        """
+        buffer = np.asarray(state["buffer"], dtype=float)
+        if buffer.shape != self.buffer.shape:
+            raise ValueError(f"Correlation buffer has shape {buffer.shape}, expected {self.buffer.shape}")
+
+        ref = np.asarray(state["ref"], dtype=float)
+        self.buffer = buffer.copy()
+        self.pos = int(state["pos"])
+        self.count = int(state["count"])
+        self.sum = np.asarray(state["sum"], dtype=float).copy()
+        self.cross = np.asarray(state["cross"], dtype=float).copy()
+        self.ref = None if np.isnan(ref).all() else ref.copy()
+        self.last = np.asarray(state["last"], dtype=float).copy()
+        self._since_resync = int(state["since_resync"])
+
+    def covariance(self):
+        """
+        Sample covariance matrix over the current window.
+
+        Returns:
+            DataFrame (N×N) labelled by symbol, or None until the window is full
+        """
+        if self.count < self.window:
+            return None
+
+        n = self.count
+        cov = (self.cross - np.outer(self.sum, self.sum) / n) / (n - 1)
+        return pd.DataFrame(cov, index=self.symbols, columns=self.symbols)
+
+    def correlation(self):
+        """
+        Correlation matrix over the current window.
+
+        Returns:
+            DataFrame (N×N) labelled by symbol, or None until the window is full
+        """
+        cov = self.covariance()
+        if cov is None:
+            return None
+
+        values = cov.to_numpy()
+        sd = np.sqrt(np.clip(np.diag(values), 0.0, None))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            corr = values / np.outer(sd, sd)
+        corr[~np.isfinite(corr)] = np.nan
+        corr = np.clip(corr, -1.0, 1.0)
+
+        return pd.DataFrame(corr, index=self.symbols, columns=self.symbols)
+
+
+def compute_correlation_matrix(df, window, symbols=None):
+    """
+    Build the rolling correlation matrix from resampled bars.
+
+    Feeds every bar close through a `RollingCorrelationMatrix`, so the
+    result matches what a live tracker would hold after the last bar.
+
+    Args:
+        df: Resampled DataFrame with columns 'symbol', 'ts', 'price_close'
+        window: Rolling window size
+        symbols: Optional symbol order (default: sorted symbols in df)
+
+    Returns:
+        Correlation DataFrame (N×N), or None if insufficient data
+    """
+    if df.empty:
+        return None
+
+    wide = df.pivot(index="ts", columns="symbol", values="price_close").sort_index()
+    if symbols is None:
+        symbols = sorted(wide.columns)
+    wide = wide.reindex(columns=symbols)
+
+    if len(symbols) < 2 or len(wide) < window:
+        return None
+
+    tracker = RollingCorrelationMatrix(symbols, window)
+    for row in wide.to_numpy():
+        tracker.update(row)
+
+    return tracker.correlation()
@@ -0,0 +1,216 @@
+import logging
+import multiprocessing
+import threading
+import time
+from concurrent.futures import CancelledError, ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+class AnalyticsCancelled(Exception):
+    """
+    Raised inside a worker when its job was cancelled between stages.
+    """
+
+
+def report_progress(progress, stage, fraction):
+    """
+    Publish a job's progress and honour cancellation.
+
+    Workers call this between stages. `progress` is a shared dict proxy
+    (or None when running in-process).
+
+    Raises:
+        AnalyticsCancelled: If the submitting side cancelled the job
+    """
+    if progress is None:
+        return
+    if progress.get("cancelled"):
+        raise AnalyticsCancelled(stage)
+    progress.update(stage=stage, fraction=float(fraction))
+
+
+def frame_to_buffers(df):
+    """
+    Flatten a DataFrame into plain NumPy arrays for cheap transfer between
+    processes (arrays pickle as raw buffers; DataFrames carry block and
+    index machinery). Datetimes travel as int64 nanoseconds.
+    """
+    def encode(values):
+        if pd.api.types.is_datetime64_any_dtype(values):
+            return "datetime", pd.DatetimeIndex(values).as_unit("ns").asi8
+        if pd.api.types.is_numeric_dtype(values):
+            return "plain", np.asarray(values)
+        return "plain", np.asarray(values, dtype=str)
+
+    index_kind, index = encode(df.index)
+
+    return {
+        "index": index,
+        "index_kind": index_kind,
+        "index_name": df.index.name,
+        "columns_name": df.columns.name,
+        "columns": [(name, *encode(df[name])) for name in df.columns]
+    }
+
+
+def buffers_to_frame(buffers):
+    """
+    Rebuild a DataFrame produced by `frame_to_buffers`.
+    """
+    def decode(kind, values):
+        return pd.to_datetime(values, unit="ns") if kind == "datetime" else values
+
+    df = pd.DataFrame(
+        {name: decode(kind, values) for name, kind, values in buffers["columns"]},
+        index=pd.Index(
+            decode(buffers["index_kind"], buffers["index"]), name=buffers["index_name"]
+        )
+    )
+    df.columns.name = buffers["columns_name"]
+
+    return df
+
+
+class AnalyticsJob:
+    """
+    Handle for one submitted analytics job.
+    """
+
+    def __init__(self, future, progress, params, pool=None):
+        self.future = future
+        self._progress = progress
+        self.params = params
+        # Pool the job runs on, so `AnalyticsExecutor.terminate` recycles the right one
+        self.pool = pool
+        self.submitted_at = time.monotonic()
+
+    def progress(self):
+        """
+        Latest (stage, fraction) reported by the worker.
+        """
+        try:
+            return self._progress.get("stage", "Queued"), self._progress.get("fraction", 0.0)
+        except (OSError, EOFError):
+            return "Unknown", 0.0
+
+    def done(self):
+        return self.future.done()
+
+    def cancel(self):
+        """
+        Cancel the job: drop it if still queued, otherwise ask the worker to
+        stop at its next stage boundary. A stage that never returns (e.g. a
+        stuck ADF fit) is not interrupted; see `AnalyticsExecutor.terminate`.
+        """
+        if not self.future.cancel():
+            try:
+                self._progress["cancelled"] = True
+            except (OSError, EOFError):
+                pass
+
+    def result(self, timeout=None):
+        """
+        Wait for the job's result.
+
+        Raises:
+            TimeoutError: If it does not finish within `timeout` seconds
+                (the job is cancelled)
+            AnalyticsCancelled: If the job was cancelled, or its worker was
+                terminated by `AnalyticsExecutor.terminate`
+        """
+        try:
+            return self.future.result(timeout=timeout)
+        except FutureTimeoutError:
+            self.cancel()
+            raise TimeoutError(f"Analytics job exceeded {timeout}s")
+        except CancelledError:
+            raise AnalyticsCancelled("cancelled before start")
+        except BrokenProcessPool:
+            raise AnalyticsCancelled("worker terminated")
+
+
+class AnalyticsExecutor:
+    """
+    Process pool for heavy analytics (resampling, OLS, ADF), keeping the
+    Streamlit script thread free and sidestepping the GIL across sessions.
+
+    One instance is shared by all sessions. Each job gets a shared progress
+    dict that doubles as its cancellation flag; a job that ignores it past
+    a hard timeout gets its worker pool replaced (`terminate`).
+    """
+
+    def __init__(self, max_workers=None):
+        # spawn: forking a multi-threaded server process is unsafe
+        self._context = multiprocessing.get_context("spawn")
+        self._max_workers = max_workers
+        self._pool_lock = threading.Lock()
+        self._pool = self._new_pool()
+        self._manager = self._context.Manager()
+        self.recycled = 0
+
+    def _new_pool(self):
+        return ProcessPoolExecutor(max_workers=self._max_workers, mp_context=self._context)
+
+    def submit(self, fn, params, **kwargs):
+        """
+        Run fn(**params, progress=<shared dict>, **kwargs) in a worker.
+
+        Args:
+            fn: Module-level function accepting a `progress` keyword
+            params: Dict of keyword arguments; also kept on the job so
+                callers can detect parameter changes
+
+        Returns:
+            AnalyticsJob
+        """
+        progress = self._manager.dict(stage="Queued", fraction=0.0)
+        with self._pool_lock:
+            pool = self._pool
+            future = pool.submit(fn, **params, progress=progress, **kwargs)
+        return AnalyticsJob(future, progress, dict(params), pool)
+
+    def terminate(self, job, grace_seconds):
+        """
+        Hard-cancel a job: request cooperative cancellation, and if the job
+        is still running after `grace_seconds`, kill its pool's worker
+        processes and continue on a fresh pool so a stuck stage cannot keep
+        a worker busy forever.
+
+        Other jobs running on the same pool fail with AnalyticsCancelled
+        ("worker terminated") and have to be resubmitted.
+
+        Returns:
+            True if the pool was recycled
+        """
+        job.cancel()
+
+        deadline = time.monotonic() + grace_seconds
+        while not job.done() and time.monotonic() < deadline:
+            time.sleep(0.05)
+        if job.done():
+            return False
+
+        with self._pool_lock:
+            if job.pool is not self._pool:
+                # Already recycled by another caller
+                return False
+            old, self._pool = self._pool, self._new_pool()
+            self.recycled += 1
+
+        # ProcessPoolExecutor has no public way to kill a busy worker
+        for process in list(getattr(old, "_processes", {}).values()):
+            process.terminate()
+        old.shutdown(wait=False, cancel_futures=True)
+
+        logger.warning("Analytics job ignored cancellation; worker pool recycled")
+        return True
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        self._manager.shutdown()
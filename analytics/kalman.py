@@ -0,0 +1,174 @@
+import numpy as np
+import pandas as pd
+
+from .stats import pair_prices
+
+
+class KalmanHedgeRatio:
+    """
+    Streaming Kalman-filter estimate of a dynamic hedge ratio.
+
+    Models Price_A = α + β × Price_B with (α, β) following a random walk.
+    Each `update` is O(1) per pair and vectorized across many pairs, so
+    it can run on every tick or bar close without refitting.
+
+    State for N pairs is held as flat NumPy arrays: (α, β) and the three
+    distinct entries of the symmetric 2x2 covariance matrix.
+    """
+
+    def __init__(self, n_pairs=1, delta=1e-5, obs_var=1e-3, init_var=1.0):
+        """
+        Args:
+            n_pairs: Number of pairs filtered in parallel
+            delta: State drift; process noise is delta / (1 - delta)
+            obs_var: Measurement noise variance of Price_A
+            init_var: Initial variance of α and β
+        """
+        self.n_pairs = n_pairs
+        self.q = delta / (1.0 - delta)
+        self.r = obs_var
+
+        self.alpha = np.zeros(n_pairs)
+        self.beta = np.zeros(n_pairs)
+        self.p00 = np.full(n_pairs, float(init_var))
+        self.p01 = np.zeros(n_pairs)
+        self.p11 = np.full(n_pairs, float(init_var))
+        self.n_obs = np.zeros(n_pairs, dtype=np.int64)
+
+    def update(self, y, x, skip_missing=False):
+        """
+        Incorporate one observation per pair.
+
+        Pairs whose y or x is NaN only receive the prediction step, or are
+        left untouched with skip_missing=True (as if the bar did not exist,
+        which is what filtering only the bars where both legs traded does).
+
+        Args:
+            y: Price_A, scalar or array of shape (n_pairs,)
+            x: Price_B, scalar or array of shape (n_pairs,)
+            skip_missing: Skip the prediction step for unobserved pairs
+
+        Returns:
+            Tuple (alpha, beta) of arrays with shape (n_pairs,)
+        """
+        y = np.broadcast_to(np.asarray(y, dtype=float), (self.n_pairs,))
+        x = np.broadcast_to(np.asarray(x, dtype=float), (self.n_pairs,))
+        observed = ~(np.isnan(y) | np.isnan(x))
+
+        # Predict: random-walk state, covariance grows by Q
+        q = np.where(observed, self.q, 0.0) if skip_missing else self.q
+        self.p00 += q
+        self.p11 += q
+
+        if observed.any():
+            xo = np.where(observed, x, 0.0)
+            yo = np.where(observed, y, 0.0)
+
+            ph0 = self.p00 + self.p01 * xo
+            ph1 = self.p01 + self.p11 * xo
+            s = ph0 + ph1 * xo + self.r
+
+            k0 = np.where(observed, ph0 / s, 0.0)
+            k1 = np.where(observed, ph1 / s, 0.0)
+            err = yo - (self.alpha + self.beta * xo)
+
+            self.alpha += k0 * err
+            self.beta += k1 * err
+            self.p00 -= k0 * ph0
+            self.p01 -= k0 * ph1
+            self.p11 -= k1 * ph1
+            self.n_obs += observed
+
+        return self.alpha.copy(), self.beta.copy()
+
+    def get_state(self):
+        """
+        Filter state as a dict of arrays (e.g. for `np.savez`).
+        """
+        return {
+            "alpha": self.alpha.copy(),
+            "beta": self.beta.copy(),
+            "p00": self.p00.copy(),
+            "p01": self.p01.copy(),
+            "p11": self.p11.copy(),
+            "n_obs": self.n_obs.copy()
+        }
+
+    def set_state(self, state):
+        """
+        Restore a state produced by `get_state` for the same number of pairs.
+        """
+        for name in ("alpha", "beta", "p00", "p01", "p11", "n_obs"):
+            values = np.asarray(state[name], dtype=getattr(self, name).dtype)
+            if values.shape != (self.n_pairs,):
+                raise ValueError(f"Kalman state '{name}' has shape {values.shape}, expected ({self.n_pairs},)")
+            setattr(self, name, values.copy())
+
+
+def kalman_filter(y, x, delta=1e-5, obs_var=1e-3):
+    """
+    Run the Kalman hedge-ratio filter over history.
+
+    Row t holds the estimate available *before* observing bar t (the
+    posterior after bar t-1), so a spread built from it has no look-ahead.
+    Rows before a pair's first observation are NaN.
+
+    Args:
+        y: Price_A history, shape (T,) or (T, N) for N pairs
+        x: Price_B history, same shape as y
+
+    Returns:
+        Tuple (alpha, beta) of arrays with the same shape as y
+    """
+    y = np.asarray(y, dtype=float)
+    x = np.asarray(x, dtype=float)
+    single = y.ndim == 1
+    if single:
+        y = y[:, None]
+        x = x[:, None]
+
+    kf = KalmanHedgeRatio(n_pairs=y.shape[1], delta=delta, obs_var=obs_var)
+    alpha = np.empty_like(y)
+    beta = np.empty_like(y)
+
+    for t in range(y.shape[0]):
+        seen = kf.n_obs > 0
+        alpha[t] = np.where(seen, kf.alpha, np.nan)
+        beta[t] = np.where(seen, kf.beta, np.nan)
+        kf.update(y[t], x[t])
+
+    if single:
+        return alpha[:, 0], beta[:, 0]
+    return alpha, beta
+
+
+def kalman_hedge_ratio(df, symbol_a, symbol_b, delta=1e-5, obs_var=1e-3):
+    """
+    Computes a time-varying hedge ratio with a Kalman filter after
+    aligning timestamps.
+
+    The 'beta' column can be passed straight to `compute_spread` as a
+    dynamic hedge; each row uses only bars strictly before it.
+
+    Args:
+        df: Resampled DataFrame with columns 'symbol', 'ts', 'price_close',
+            or an as-of aligned pair from `asof_align`
+        symbol_a: Dependent symbol (Price_A)
+        symbol_b: Hedge symbol (Price_B)
+        delta: State drift of α and β
+        obs_var: Measurement noise variance
+
+    Returns:
+        DataFrame indexed by ts with columns 'alpha' and 'beta'
+    """
+    wide = pair_prices(df, symbol_a, symbol_b)
+
+    if wide.empty or symbol_a not in wide or symbol_b not in wide:
+        return pd.DataFrame(columns=["alpha", "beta"])
+
+    alpha, beta = kalman_filter(
+        wide[symbol_a].to_numpy(), wide[symbol_b].to_numpy(),
+        delta=delta, obs_var=obs_var
+    )
+
+    return pd.DataFrame({"alpha": alpha, "beta": beta}, index=wide.index)
@@ -0,0 +1,333 @@
+"""
+Rolling pair-analytics state that survives restarts.
+
+`LiveAnalyticsState` keeps, per bar close, what the dashboard would
+otherwise rebuild from the full tick lookback: a Kalman hedge ratio for
+every pair of symbols, the last `window` spreads behind each pair's
+z-score, and the rolling correlation matrix buffer. It is checkpointed to a
+compact `.npz` snapshot tagged with the last processed bar; on restart the
+snapshot is restored and only ticks after that bar are replayed.
+"""
+import logging
+import os
+import time
+from datetime import datetime, timedelta
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+
+import config
+from .kalman import KalmanHedgeRatio
+from .correlation import RollingCorrelationMatrix
+from .sampling import TIMEFRAME_SECONDS, load_ticks, resample_ticks
+
+logger = logging.getLogger(__name__)
+
+# Bump when the snapshot layout changes; older snapshots are then ignored
+SNAPSHOT_VERSION = 1
+
+
+class LiveAnalyticsState:
+    """
+    Incremental hedge ratio, z-score and correlation state for a symbol set.
+
+    Fed one bar timestamp at a time (`update`) or with `BarClosed` events
+    (`on_bar`). A pair only advances on bars where both legs traded, so the
+    state after a bar matches `kalman_hedge_ratio`, `compute_zscore` and
+    `compute_correlation_matrix` run over the same bars. Not thread-safe.
+
+    Args:
+        symbols: Symbols to track (uppercase, as stored)
+        timeframe: '1s', '1m' or '5m'
+        window: Rolling window for z-scores and correlations
+        delta: Kalman state drift
+        obs_var: Kalman measurement noise variance
+    """
+
+    def __init__(self, symbols, timeframe=None, window=None, delta=None, obs_var=None):
+        self.symbols = [s.upper() for s in symbols]
+        self.timeframe = timeframe or config.LIVE_STATE_TIMEFRAME
+        self.window = window or config.LIVE_STATE_WINDOW
+        self.delta = config.KALMAN_DELTA if delta is None else delta
+        self.obs_var = config.KALMAN_OBS_VAR if obs_var is None else obs_var
+
+        if self.timeframe not in TIMEFRAME_SECONDS:
+            raise ValueError(f"Unsupported timeframe: {self.timeframe}")
+
+        self.pairs = list(combinations(self.symbols, 2))
+        self._legs = np.array(
+            [[self.symbols.index(a), self.symbols.index(b)] for a, b in self.pairs], dtype=np.int64
+        ).reshape(-1, 2)
+        n_pairs = len(self.pairs)
+
+        self.kalman = KalmanHedgeRatio(n_pairs=n_pairs, delta=self.delta, obs_var=self.obs_var)
+        self.spreads = np.full((self.window, n_pairs), np.nan)
+        self.spread_pos = np.zeros(n_pairs, dtype=np.int64)
+        self.spread_count = np.zeros(n_pairs, dtype=np.int64)
+        self.last_spread = np.full(n_pairs, np.nan)
+        self.corr = RollingCorrelationMatrix(self.symbols, self.window) if len(self.symbols) > 1 else None
+
+        self.last_ts = None
+        self._pending_ts = None
+        self._pending = {}
+
+    @property
+    def step(self):
+        return timedelta(seconds=TIMEFRAME_SECONDS[self.timeframe])
+
+    def update(self, ts, closes):
+        """
+        Advance the state by one bar.
+
+        Args:
+            ts: Bar start (naive local time, like stored ticks)
+            closes: Dict of symbol -> close for the symbols that traded
+
+        Returns:
+            True if applied, False for bars at or before `last_ts`
+        """
+        ts = pd.Timestamp(ts).to_pydatetime()
+        if self.last_ts is not None and ts <= self.last_ts:
+            return False
+
+        x = np.array([closes.get(s, np.nan) for s in self.symbols], dtype=float)
+        a, b = x[self._legs[:, 0]], x[self._legs[:, 1]]
+        observed = ~(np.isnan(a) | np.isnan(b))
+
+        if observed.any():
+            # Spread uses the hedge known before this bar (no look-ahead)
+            seen = observed & (self.kalman.n_obs > 0)
+            spread = a - self.kalman.beta * b
+            for i in np.flatnonzero(seen):
+                self.spreads[self.spread_pos[i], i] = spread[i]
+                self.spread_pos[i] = (self.spread_pos[i] + 1) % self.window
+                self.spread_count[i] = min(self.spread_count[i] + 1, self.window)
+            self.last_spread[seen] = spread[seen]
+
+            self.kalman.update(a, b, skip_missing=True)
+
+        if self.corr is not None:
+            self.corr.update(x)
+
+        self.last_ts = ts
+        return True
+
+    def on_bar(self, bar):
+        """
+        Feed a `BarClosed` event. Bars of one timestamp are collected until
+        every symbol has reported or a later bar arrives, so a symbol that
+        did not trade delays that bar's update until the next one closes.
+        """
+        # Revised bars (after a backfill) are older than the state; a restart
+        # replays them from storage instead
+        if bar.timeframe != self.timeframe or bar.symbol not in self.symbols or bar.revised:
+            return
+
+        if self._pending_ts is not None and bar.ts > self._pending_ts:
+            self.flush()
+        if self._pending_ts is not None and bar.ts < self._pending_ts:
+            return
+
+        self._pending_ts = bar.ts
+        self._pending[bar.symbol] = bar.close
+        if len(self._pending) == len(self.symbols):
+            self.flush()
+
+    def flush(self):
+        """
+        Apply the bars collected by `on_bar` for the pending timestamp.
+        """
+        if self._pending_ts is not None:
+            self.update(self._pending_ts, self._pending)
+        self._pending_ts = None
+        self._pending = {}
+
+    def replay_bars(self, bars):
+        """
+        Feed resampled bars (`resample_ticks` layout) in time order.
+
+        Returns:
+            Number of bar timestamps applied
+        """
+        if bars.empty:
+            return 0
+
+        wide = bars.pivot(index="ts", columns="symbol", values="price_close").sort_index()
+        applied = 0
+        for ts, row in zip(wide.index, wide.to_dict("records")):
+            closes = {s: v for s, v in row.items() if not pd.isna(v)}
+            applied += self.update(ts, closes)
+
+        return applied
+
+    def zscores(self):
+        """
+        Latest z-score per pair, NaN until its spread window is full.
+        """
+        full = self.spread_count == self.window
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = self.spreads.mean(axis=0)
+            std = self.spreads.std(axis=0, ddof=1)
+            z = (self.last_spread - mean) / std
+        return np.where(full, z, np.nan)
+
+    def summary(self):
+        """
+        JSON-friendly view: per-pair hedge, spread and z-score, and the
+        correlation matrix once its window is full.
+        """
+        def number(value):
+            value = float(value)
+            return value if np.isfinite(value) else None
+
+        zscores = self.zscores()
+        corr = None if self.corr is None else self.corr.correlation()
+
+        return {
+            "timeframe": self.timeframe,
+            "window": self.window,
+            "last_ts": None if self.last_ts is None else self.last_ts.isoformat(),
+            "pairs": [
+                {
+                    "symbol_a": a,
+                    "symbol_b": b,
+                    "alpha": number(self.kalman.alpha[i]) if self.kalman.n_obs[i] else None,
+                    "beta": number(self.kalman.beta[i]) if self.kalman.n_obs[i] else None,
+                    "spread": number(self.last_spread[i]),
+                    "zscore": number(zscores[i]),
+                    "observations": int(self.kalman.n_obs[i])
+                }
+                for i, (a, b) in enumerate(self.pairs)
+            ],
+            "correlation": None if corr is None else {
+                "symbols": self.symbols,
+                "values": [[number(v) for v in row] for row in corr.to_numpy()]
+            }
+        }
+
+    def _signature(self):
+        return {
+            "version": np.int64(SNAPSHOT_VERSION),
+            "symbols": np.array(self.symbols, dtype=str),
+            "timeframe": np.array(self.timeframe),
+            "window": np.int64(self.window),
+            "delta": np.float64(self.delta),
+            "obs_var": np.float64(self.obs_var)
+        }
+
+    def save(self, path=None):
+        """
+        Write an `.npz` snapshot (atomically: temp file, then rename).
+
+        Returns:
+            Snapshot path
+        """
+        path = path or config.LIVE_STATE_PATH
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+        arrays = {
+            **self._signature(),
+            "last_ts": np.int64(-1 if self.last_ts is None else pd.Timestamp(self.last_ts).value),
+            "spreads": self.spreads,
+            "spread_pos": self.spread_pos,
+            "spread_count": self.spread_count,
+            "last_spread": self.last_spread,
+            **{f"kalman_{k}": v for k, v in self.kalman.get_state().items()}
+        }
+        if self.corr is not None:
+            arrays.update({f"corr_{k}": v for k, v in self.corr.get_state().items()})
+
+        tmp = f"{path}.tmp"
+        with open(tmp, "wb") as fh:
+            np.savez(fh, **arrays)
+        os.replace(tmp, path)
+
+        return path
+
+    def load(self, path=None):
+        """
+        Restore a snapshot written by `save` for the same symbols, timeframe,
+        window and filter parameters.
+
+        Returns:
+            True if restored, False if there is no usable snapshot
+        """
+        path = path or config.LIVE_STATE_PATH
+        if not os.path.exists(path):
+            return False
+
+        try:
+            with np.load(path, allow_pickle=False) as snap:
+                expected = self._signature()
+                for key, value in expected.items():
+                    if key not in snap or not np.array_equal(snap[key], value):
+                        logger.info(f"Ignoring live state snapshot {path}: {key} differs")
+                        return False
+
+                self.kalman.set_state({k[len("kalman_"):]: snap[k] for k in snap.files if k.startswith("kalman_")})
+                if self.corr is not None:
+                    self.corr.set_state({k[len("corr_"):]: snap[k] for k in snap.files if k.startswith("corr_")})
+                self.spreads = snap["spreads"].copy()
+                self.spread_pos = snap["spread_pos"].copy()
+                self.spread_count = snap["spread_count"].copy()
+                self.last_spread = snap["last_spread"].copy()
+                last_ts = int(snap["last_ts"])
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Ignoring unreadable live state snapshot {path}: {e}")
+            return False
+
+        self.last_ts = None if last_ts < 0 else pd.Timestamp(last_ts).to_pydatetime()
+        return True
+
+
+def restore_live_state(symbols, path=None, lookback_minutes=None, now=None, **kwargs):
+    """
+    Build a warm `LiveAnalyticsState`: restore the snapshot if it matches,
+    then replay ticks from the bar after its `last_ts` up to the last
+    completed bar. Without a snapshot, the last `lookback_minutes` are
+    replayed instead (a cold start).
+
+    Args:
+        symbols: Symbols to track
+        path: Snapshot path (default config.LIVE_STATE_PATH)
+        lookback_minutes: Cold-start history (default config.DEFAULT_LOOKBACK_MINUTES)
+        now: Naive local time bounding the replay (default now)
+        **kwargs: Passed to LiveAnalyticsState
+
+    Returns:
+        Tuple (state, info) where info has 'restored', 'replayed_bars',
+        'replay_from' and 'seconds'
+    """
+    started = time.perf_counter()
+    state = LiveAnalyticsState(symbols, **kwargs)
+    restored = state.load(path)
+    if not restored:
+        # A rejected snapshot may have been partly applied
+        state = LiveAnalyticsState(symbols, **kwargs)
+
+    now = now or datetime.now()
+    step = TIMEFRAME_SECONDS[state.timeframe]
+    end = pd.Timestamp(now).floor(f"{step}s").to_pydatetime()
+    if state.last_ts is not None:
+        start = state.last_ts + state.step
+    else:
+        lookback = lookback_minutes or config.DEFAULT_LOOKBACK_MINUTES
+        start = pd.Timestamp(now - timedelta(minutes=lookback)).floor(f"{step}s").to_pydatetime()
+
+    replayed = 0
+    if start < end:
+        ticks = load_ticks(state.symbols, compact=True, start=start, end=end)
+        replayed = state.replay_bars(resample_ticks(ticks, state.timeframe))
+
+    info = {
+        "restored": restored,
+        "replayed_bars": replayed,
+        "replay_from": start.isoformat(),
+        "seconds": time.perf_counter() - started
+    }
+    logger.info(
+        f"Live state {'restored' if restored else 'cold-started'}: replayed {replayed} "
+        f"{state.timeframe} bars from {start:%Y-%m-%d %H:%M:%S} in {info['seconds']:.2f}s"
+    )
+    return state, info
@@ -0,0 +1,136 @@
+import numpy as np
+
+import config
+from .executor import frame_to_buffers, report_progress
+from .sampling import load_ticks, resample_ticks_sql, resample_ticks_chunked
+from .alignment import asof_align
+from .regression import compute_hedge_ratio
+from .kalman import kalman_hedge_ratio
+from .stats import compute_spread, compute_zscore, compute_rolling_correlation
+from .correlation import compute_correlation_matrix
+from .stationarity import adf_test
+from .profiling import StageProfiler, cprofile_run
+
+
+def run_pair_analytics(symbols, timeframe, symbol_a, symbol_b, window,
+                       hedge_method="OLS", sql_resample=True,
+                       lookback_minutes=60, alignment="bars", progress=None,
+                       run_id=None, cprofile=False):
+    """
+    Full pair analytics pipeline, suitable for running in a worker process.
+
+    Loads and resamples bars, fits the hedge ratio, builds the spread and
+    z-score, rolling and universe correlation, and runs the ADF test.
+    Frames are returned as NumPy buffers (see `frame_to_buffers`).
+
+    Args:
+        symbols: All tracked symbols (lowercase)
+        timeframe: '1s', '1m' or '5m'
+        symbol_a, symbol_b: Pair legs (uppercase, as stored)
+        window: Rolling window size
+        hedge_method: 'OLS' or 'Kalman'
+        sql_resample: Build bars inside SQLite instead of chunked pandas
+        lookback_minutes: Tick history to load
+        alignment: 'bars' fits hedge and spread on bars where both legs
+            traded; 'asof' uses every tick of A with B as of that tick
+            (see `asof_align`, tolerance config.ASOF_TOLERANCE)
+        progress: Optional shared dict for progress/cancellation
+        run_id: Id tagging this run's profile records and cProfile dump
+        cprofile: Also dump a cProfile of the run to config.PROFILE_DIR
+
+    Returns:
+        Dict with 'status' ('ok', 'no_data', 'no_hedge' or 'insufficient'),
+        'profile' (per-stage timing records) and, as far as the pipeline
+        got: 'bars', 'hedge', 'spread', 'corr', 'corr_matrix', 'adf'
+    """
+    profiler = StageProfiler(run_id, source="worker")
+
+    with cprofile_run(profiler.run_id, enabled=cprofile) as dump_path:
+        result = _run_stages(
+            profiler, symbols, timeframe, symbol_a, symbol_b, window,
+            hedge_method, sql_resample, lookback_minutes, alignment, progress
+        )
+
+    result["profile"] = profiler.records
+    result["cprofile_path"] = dump_path
+    return result
+
+
+def _run_stages(profiler, symbols, timeframe, symbol_a, symbol_b, window,
+                hedge_method, sql_resample, lookback_minutes, alignment, progress):
+    report_progress(progress, "Loading data", 0.0)
+    with profiler.stage("load_resample") as stage:
+        if sql_resample:
+            bars = resample_ticks_sql(symbols, timeframe, lookback_minutes)
+        else:
+            bars = resample_ticks_chunked(symbols, timeframe, lookback_minutes)
+        stage.rows = len(bars)
+
+    if bars.empty:
+        return {"status": "no_data"}
+
+    result = {"status": "ok", "bars": frame_to_buffers(bars)}
+
+    # Prices the hedge and spread are computed on
+    pair = bars
+    if alignment == "asof":
+        with profiler.stage("asof_align") as stage:
+            ticks = load_ticks([symbol_a, symbol_b], lookback_minutes, compact=True)
+            pair = asof_align(ticks, symbol_a, symbol_b, tolerance=config.ASOF_TOLERANCE)
+            stage.rows = len(pair)
+
+    report_progress(progress, "Fitting hedge ratio", 0.3)
+    with profiler.stage(f"hedge_ratio_{hedge_method.lower()}") as stage:
+        if hedge_method == "Kalman":
+            kalman = kalman_hedge_ratio(
+                pair, symbol_a, symbol_b,
+                delta=config.KALMAN_DELTA, obs_var=config.KALMAN_OBS_VAR
+            )
+            hedge = kalman["beta"] if len(kalman) >= 20 else None
+        else:
+            hedge = compute_hedge_ratio(pair, symbol_a, symbol_b)
+        stage.rows = len(pair)
+
+    if hedge is None:
+        result["status"] = "no_hedge"
+        return result
+
+    result["hedge"] = (
+        frame_to_buffers(hedge.to_frame()) if hasattr(hedge, "to_frame") else float(hedge)
+    )
+
+    report_progress(progress, "Computing spread & z-score", 0.5)
+    with profiler.stage("spread") as stage:
+        spread_df = compute_spread(pair, symbol_a, symbol_b, hedge)
+        stage.rows = len(spread_df)
+
+    if spread_df.empty or len(spread_df) < window:
+        result["status"] = "insufficient"
+        return result
+
+    with profiler.stage("zscore") as stage:
+        spread_df["zscore"] = compute_zscore(spread_df["spread"], window)
+        stage.rows = len(spread_df)
+    result["spread"] = frame_to_buffers(spread_df)
+
+    report_progress(progress, "Rolling correlation", 0.65)
+    with profiler.stage("rolling_corr") as stage:
+        corr = compute_rolling_correlation(bars, symbol_a, symbol_b, window)
+        stage.rows = None if corr is None else len(corr)
+    result["corr"] = None if corr is None else frame_to_buffers(corr.rename("corr").to_frame())
+
+    with profiler.stage("corr_matrix") as stage:
+        corr_matrix = compute_correlation_matrix(bars, window)
+        stage.rows = None if corr_matrix is None else len(corr_matrix)
+    result["corr_matrix"] = None if corr_matrix is None else {
+        "symbols": list(corr_matrix.columns),
+        "values": np.asarray(corr_matrix.to_numpy())
+    }
+
+    report_progress(progress, "ADF test", 0.8)
+    with profiler.stage("adf") as stage:
+        result["adf"] = adf_test(spread_df["spread"])
+        stage.rows = len(spread_df)
+
+    report_progress(progress, "Done", 1.0)
+    return result
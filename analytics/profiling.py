@@ -0,0 +1,117 @@
+import cProfile
+import json
+import logging
+import os
+import sys
+import time
+import uuid
+from contextlib import contextmanager
+
+import config
+
+logger = logging.getLogger(__name__)
+
+
+def rss_bytes():
+    """
+    Current resident memory of this process in bytes.
+
+    Reads /proc on Linux; elsewhere falls back to peak RSS from
+    `resource` (so deltas there only show growth of the peak), or 0.
+    """
+    try:
+        with open("/proc/self/statm") as fh:
+            return int(fh.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
+
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # bytes on macOS, kilobytes elsewhere
+        return peak if sys.platform == "darwin" else peak * 1024
+    except ImportError:
+        return 0
+
+
+class StageTimer:
+    """
+    Record for one stage; set `rows` inside the `with` block.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.rows = None
+
+
+class StageProfiler:
+    """
+    Lightweight per-stage timing for an analytics run.
+
+    Each stage records wall time, an optional row count and the change in
+    process RSS, and is logged as one JSON line. Records are plain dicts so
+    they pickle back from worker processes.
+
+    Usage:
+        profiler = StageProfiler(source="worker")
+        with profiler.stage("resample") as s:
+            bars = resample_ticks_sql(...)
+            s.rows = len(bars)
+    """
+
+    def __init__(self, run_id=None, source="app"):
+        self.run_id = run_id or uuid.uuid4().hex[:12]
+        self.source = source
+        self.records = []
+
+    @contextmanager
+    def stage(self, name):
+        timer = StageTimer(name)
+        mem_before = rss_bytes()
+        started = time.perf_counter()
+        try:
+            yield timer
+        finally:
+            record = {
+                "run_id": self.run_id,
+                "source": self.source,
+                "stage": name,
+                "ms": round((time.perf_counter() - started) * 1000, 2),
+                "rows": timer.rows,
+                "mem_delta_mb": round((rss_bytes() - mem_before) / 1e6, 2)
+            }
+            self.records.append(record)
+            logger.info(json.dumps(record))
+
+    def total_ms(self):
+        return sum(r["ms"] for r in self.records)
+
+
+@contextmanager
+def cprofile_run(run_id, enabled=True, directory=None):
+    """
+    Profile the enclosed block with cProfile and dump it to
+    `<directory>/<run_id>.prof`.
+
+    Open the dump with `python -m pstats`, or as a flamegraph/icicle chart
+    with e.g. `snakeviz` or `flameprof`.
+
+    Yields:
+        Path of the dump, or None when disabled
+    """
+    if not enabled:
+        yield None
+        return
+
+    directory = directory or config.PROFILE_DIR
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{run_id}.prof")
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield path
+    finally:
+        profiler.disable()
+        profiler.dump_stats(path)
+        logger.info(json.dumps({"run_id": run_id, "event": "cprofile_dump", "path": path}))
@@ -1,16 +1,16 @@
-import statsmodels.api as sm
+from .stats import pair_prices
 
 
 def compute_hedge_ratio(df, symbol_a, symbol_b, min_points=20):
     """
     Computes hedge ratio using OLS after aligning timestamps.
+
+    `df` is resampled bars or an as-of aligned pair (see `asof_align`).
     """
+    # statsmodels is slow to import; load it only when a fit is requested
+    import statsmodels.api as sm
 
-    wide = (
-        df[df["symbol"].isin([symbol_a, symbol_b])]
-        .pivot(index="ts", columns="symbol", values="price_close")
-        .dropna()
-    )
+    wide = pair_prices(df, symbol_a, symbol_b)
 
     if len(wide) < min_points:
         return None
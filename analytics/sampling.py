@@ -1,6 +1,11 @@
+from datetime import datetime, timedelta, timezone
+
 import pandas as pd
-from sqlalchemy import text
+from sqlalchemy import bindparam, text
+
 from storage.db import engine
+from storage.partitions import ticks_source, list_partitions
+import config
 
 VALID_TIMEFRAMES = {
     "1s": "1s",
@@ -8,23 +13,113 @@ VALID_TIMEFRAMES = {
     "5m": "5min"
 }
 
+# Bucket width in seconds for SQL-side resampling
+TIMEFRAME_SECONDS = {
+    "1s": 1,
+    "1m": 60,
+    "5m": 300
+}
+
+BAR_COLUMNS = ['ts', 'price_open', 'price_high', 'price_low', 'price_close', 'volume', 'symbol']
 
-def load_ticks(symbols, lookback_minutes=60):
+# Per-bar order-flow features stored by the ingestion daemon (see load_bars)
+ORDER_FLOW_COLUMNS = ['vwap', 'trade_count', 'buy_volume', 'sell_volume', 'imbalance']
+
+
+def _lookback_start(lookback_minutes):
     """
-    Load raw tick data from SQLite for selected symbols.
+    Earliest tick time a `datetime('now', -lookback)` filter can match.
+
+    SQLite's 'now' is UTC while ticks are stored in local time; partitions
+    are pruned from the earlier of the two so none the filter needs is skipped.
+    """
+    utc_now = datetime.now(timezone.utc).replace(tzinfo=None)
+    return min(datetime.now(), utc_now) - timedelta(minutes=lookback_minutes)
+
+
+def _ticks_query(conn, symbols, lookback_minutes, start=None, end=None):
+    """
+    Build the raw tick query shared by the tick loaders.
+
+    Filters on the last `lookback_minutes`, or on [start, end) when start
+    is given (naive datetimes, as stored). Only day partitions overlapping
+    that range are read.
     """
     placeholders = ",".join([f"'{s.upper()}'" for s in symbols])
 
+    params = {}
+    if start is None:
+        source = ticks_source(conn, _lookback_start(lookback_minutes))
+        time_filter = f"ts >= datetime('now', '-{lookback_minutes} minutes')"
+    else:
+        source = ticks_source(conn, start, end)
+        time_filter = "ts >= :start"
+        params["start"] = pd.Timestamp(start).isoformat()
+        if end is not None:
+            time_filter += " AND ts < :end"
+            params["end"] = pd.Timestamp(end).isoformat()
+
     query = text(f"""
         SELECT ts, symbol, price, size
-        FROM ticks
+        FROM {source}
         WHERE symbol IN ({placeholders})
-            AND ts >= datetime('now', '-{lookback_minutes} minutes')
+            AND {time_filter}
         ORDER BY ts ASC
     """)
 
+    return query.bindparams(**params) if params else query
+
+
+def _compact_chunk(chunk, symbols):
+    """
+    Convert a raw tick chunk to compact dtypes.
+
+    ts becomes int64 epoch nanoseconds (the index), symbol a categorical
+    over the requested symbols, and size float32 (exchange quantities have
+    few significant digits). Prices stay float64.
+    """
+    chunk["ts"] = (
+        pd.to_datetime(chunk["ts"], format='ISO8601').dt.as_unit("ns").astype("int64")
+    )
+    chunk["symbol"] = pd.Categorical(chunk["symbol"], categories=symbols)
+    chunk["size"] = chunk["size"].astype("float32")
+
+    return chunk.set_index("ts")
+
+
+def load_ticks(symbols, lookback_minutes=60, compact=False, chunksize=None,
+               start=None, end=None):
+    """
+    Load raw tick data from SQLite for selected symbols.
+
+    By default the last `lookback_minutes` are loaded; pass start (and
+    optionally end) to load an explicit [start, end) range instead.
+
+    With compact=True the frame uses an int64 epoch-nanosecond 'ts' index,
+    a categorical 'symbol' and float32 'size'. Rows are read in chunks of
+    `chunksize` and converted as they arrive, so the string-typed form of
+    the full result is never held in memory at once.
+    """
+    if compact:
+        categories = [s.upper() for s in symbols]
+
+        with engine.connect() as conn:
+            query = _ticks_query(conn, symbols, lookback_minutes, start, end)
+            chunks = [
+                _compact_chunk(chunk, categories)
+                for chunk in pd.read_sql(
+                    query, conn, chunksize=chunksize or config.TICK_CHUNKSIZE
+                )
+                if not chunk.empty
+            ]
+
+        if not chunks:
+            return pd.DataFrame()
+
+        return pd.concat(chunks)
+
     with engine.connect() as conn:
-        df = pd.read_sql(query, conn)
+        df = pd.read_sql(_ticks_query(conn, symbols, lookback_minutes, start, end), conn)
 
     if df.empty:
         return df
@@ -35,6 +130,87 @@ def load_ticks(symbols, lookback_minutes=60):
     return df
 
 
+def _aggregate_bars(df, step_ns):
+    """
+    OHLCV per (symbol, bucket) for a compact tick frame or for partial bars.
+
+    Partial bars (columns price_open..volume) can be re-aggregated with the
+    same rules, which is how chunked results are merged.
+    """
+    if "price" in df.columns:
+        df = pd.DataFrame({
+            "symbol": df["symbol"],
+            "bucket": df.index.to_numpy() // step_ns * step_ns,
+            "price_open": df["price"],
+            "price_high": df["price"],
+            "price_low": df["price"],
+            "price_close": df["price"],
+            # Accumulate volume in float64 even when sizes are float32
+            "volume": df["size"].astype("float64")
+        })
+
+    return (
+        df.groupby(["symbol", "bucket"], observed=True, sort=True)
+        .agg(
+            price_open=("price_open", "first"),
+            price_high=("price_high", "max"),
+            price_low=("price_low", "min"),
+            price_close=("price_close", "last"),
+            volume=("volume", "sum")
+        )
+        .reset_index()
+    )
+
+
+def _finish_bars(bars):
+    """
+    Convert aggregated (symbol, bucket) rows to the resample_ticks layout.
+    """
+    bars = bars.sort_values(["symbol", "bucket"], ignore_index=True)
+    bars["ts"] = pd.to_datetime(bars.pop("bucket"), unit="ns")
+    bars["symbol"] = bars["symbol"].astype(str)
+
+    return bars[BAR_COLUMNS]
+
+
+def resample_ticks_chunked(symbols, timeframe, lookback_minutes=60, chunksize=None):
+    """
+    Resample ticks into OHLCV bars while streaming them from SQLite in chunks.
+
+    Each chunk is compacted and aggregated immediately; only the bars (plus
+    the still-open last bucket) are kept, so peak memory is one chunk plus
+    the output regardless of the lookback.
+    """
+    if not symbols or timeframe not in TIMEFRAME_SECONDS:
+        return pd.DataFrame()
+
+    step_ns = TIMEFRAME_SECONDS[timeframe] * 1_000_000_000
+    categories = [s.upper() for s in symbols]
+    closed = []
+    pending = None
+
+    with engine.connect() as conn:
+        query = _ticks_query(conn, symbols, lookback_minutes)
+        for chunk in pd.read_sql(query, conn, chunksize=chunksize or config.TICK_CHUNKSIZE):
+            if chunk.empty:
+                continue
+
+            bars = _aggregate_bars(_compact_chunk(chunk, categories), step_ns)
+            if pending is not None:
+                bars = _aggregate_bars(pd.concat([pending, bars], ignore_index=True), step_ns)
+
+            # Ticks arrive in time order: only the latest bucket can still grow
+            is_open = bars["bucket"] == bars["bucket"].max()
+            closed.append(bars[~is_open])
+            pending = bars[is_open]
+
+    if pending is None:
+        return pd.DataFrame()
+
+    closed.append(pending)
+    return _finish_bars(pd.concat(closed, ignore_index=True))
+
+
 # REPLACE THE ENTIRE FUNCTION with this:
 
 def resample_ticks(df, timeframe):
@@ -44,6 +220,11 @@ def resample_ticks(df, timeframe):
     if df.empty or timeframe not in VALID_TIMEFRAMES:
         return pd.DataFrame()
 
+    if pd.api.types.is_integer_dtype(df.index):
+        # Compact frame from load_ticks(compact=True)
+        step_ns = TIMEFRAME_SECONDS[timeframe] * 1_000_000_000
+        return _finish_bars(_aggregate_bars(df, step_ns))
+
     rule = VALID_TIMEFRAMES[timeframe]
 
     # Process each symbol separately to avoid warnings
@@ -70,3 +251,140 @@ def resample_ticks(df, timeframe):
         resampled = pd.DataFrame()
 
     return resampled
+
+
+def resample_ticks_sql(symbols, timeframe, lookback_minutes=60):
+    """
+    Resample ticks into OHLCV bars inside SQLite and return only the bars.
+
+    Equivalent to `resample_ticks(load_ticks(symbols, lookback_minutes),
+    timeframe)`, but the GROUP BY runs in the storage engine over integer
+    epoch buckets, so raw ticks never cross into Python. Open/close are the
+    first/last tick of each bucket by (ts, id) via window functions.
+    """
+    if not symbols or timeframe not in TIMEFRAME_SECONDS:
+        return pd.DataFrame()
+
+    with engine.connect() as conn:
+        source = ticks_source(conn, _lookback_start(lookback_minutes))
+
+    query = text(f"""
+        WITH scoped AS (
+            SELECT
+                id, ts, symbol, price, size,
+                -- Drop fractional seconds first: strftime rounds them
+                CAST(strftime('%s', substr(ts, 1, 19)) AS INTEGER) / :bucket * :bucket AS bucket
+            FROM {source}
+            WHERE symbol IN :symbols
+                AND ts >= datetime('now', :lookback)
+        ),
+        ranked AS (
+            SELECT
+                *,
+                ROW_NUMBER() OVER (
+                    PARTITION BY symbol, bucket ORDER BY ts ASC, id ASC
+                ) AS rn_first,
+                ROW_NUMBER() OVER (
+                    PARTITION BY symbol, bucket ORDER BY ts DESC, id DESC
+                ) AS rn_last
+            FROM scoped
+        )
+        SELECT
+            bucket,
+            MAX(CASE WHEN rn_first = 1 THEN price END) AS price_open,
+            MAX(price) AS price_high,
+            MIN(price) AS price_low,
+            MAX(CASE WHEN rn_last = 1 THEN price END) AS price_close,
+            SUM(size) AS volume,
+            symbol
+        FROM ranked
+        GROUP BY symbol, bucket
+        ORDER BY symbol, bucket
+    """).bindparams(bindparam("symbols", expanding=True))
+
+    params = {
+        "symbols": [s.upper() for s in symbols],
+        "bucket": TIMEFRAME_SECONDS[timeframe],
+        "lookback": f"-{int(lookback_minutes)} minutes"
+    }
+
+    with engine.connect() as conn:
+        bars = pd.read_sql(query, conn, params=params)
+
+    if bars.empty:
+        return pd.DataFrame()
+
+    # Buckets are epoch seconds of the stored (naive) timestamps
+    bars["ts"] = pd.to_datetime(bars.pop("bucket"), unit="s")
+
+    return bars[BAR_COLUMNS]
+
+
+def load_bars(symbols, timeframe, lookback_minutes=60):
+    """
+    Load bars built at ingest time, with their order-flow features.
+
+    Unlike the resample functions this reads no raw ticks: the ingestion
+    daemon stores each bar with VWAP, trade count, taker buy/sell volume and
+    imbalance as it closes. Only bars closed while the daemon was running
+    exist here.
+
+    Returns:
+        DataFrame with BAR_COLUMNS + ORDER_FLOW_COLUMNS, sorted by symbol, ts
+    """
+    if not symbols or timeframe not in TIMEFRAME_SECONDS:
+        return pd.DataFrame()
+
+    query = text(f"""
+        SELECT ts, price_open, price_high, price_low, price_close, volume, symbol,
+            {', '.join(ORDER_FLOW_COLUMNS)}
+        FROM bars
+        WHERE symbol IN :symbols
+            AND timeframe = :timeframe
+            AND ts >= :start
+        ORDER BY symbol, ts
+    """).bindparams(bindparam("symbols", expanding=True))
+
+    params = {
+        "symbols": [s.upper() for s in symbols],
+        "timeframe": timeframe,
+        "start": (datetime.now() - timedelta(minutes=lookback_minutes)).isoformat()
+    }
+
+    with engine.connect() as conn:
+        bars = pd.read_sql(query, conn, params=params)
+
+    if bars.empty:
+        return pd.DataFrame()
+
+    bars["ts"] = pd.to_datetime(bars["ts"], format='ISO8601')
+
+    return bars
+
+
+def last_bar_timestamp(symbols, timeframe):
+    """
+    Start time of the latest bar across symbols, computed from the newest
+    stored tick (a cheap index lookup in the newest partition holding one).
+
+    Returns:
+        pandas Timestamp, or None if there are no ticks
+    """
+    if not symbols or timeframe not in TIMEFRAME_SECONDS:
+        return None
+
+    latest = None
+    with engine.connect() as conn:
+        for _, table in reversed(list_partitions(conn)):
+            query = text(f"""
+                SELECT MAX(ts) FROM {table} WHERE symbol IN :symbols
+            """).bindparams(bindparam("symbols", expanding=True))
+
+            latest = conn.execute(query, {"symbols": [s.upper() for s in symbols]}).scalar()
+            if latest is not None:
+                break
+
+    if latest is None:
+        return None
+
+    return pd.Timestamp(latest).floor(f"{TIMEFRAME_SECONDS[timeframe]}s")
@@ -1,6 +1,3 @@
-from statsmodels.tsa.stattools import adfuller
-
-
 def adf_test(series):
     """
     Perform Augmented Dickey-Fuller test for stationarity.
@@ -18,6 +15,9 @@ def adf_test(series):
     Returns:
         Dictionary with test results, or None if insufficient data
     """
+    # statsmodels is slow to import; load it only when the test runs
+    from statsmodels.tsa.stattools import adfuller
+
     clean_series = series.dropna()
 
     if len(clean_series) < 20:
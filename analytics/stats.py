@@ -2,13 +2,44 @@ import pandas as pd
 import numpy as np
 
 
-def compute_spread(df, symbol_a, symbol_b, hedge_ratio):
-    wide = (
+def pair_prices(df, symbol_a, symbol_b):
+    """
+    Aligned prices of a pair as a wide frame indexed by ts.
+
+    Accepts resampled bars (columns 'symbol', 'ts', 'price_close'), which
+    are pivoted and restricted to buckets where both traded, or an
+    already-aligned wide frame such as `asof_align` output.
+    """
+    if "symbol" not in df.columns and symbol_a in df.columns and symbol_b in df.columns:
+        return df[[symbol_a, symbol_b]].dropna()
+
+    return (
         df[df["symbol"].isin([symbol_a, symbol_b])]
         .pivot(index="ts", columns="symbol", values="price_close")
         .dropna()
     )
 
+
+def compute_spread(df, symbol_a, symbol_b, hedge_ratio):
+    """
+    Compute the hedged spread Price_A − β × Price_B.
+
+    Args:
+        df: Resampled DataFrame with columns 'symbol', 'ts', 'price_close',
+            or an as-of aligned pair from `asof_align`
+        symbol_a: First symbol name
+        symbol_b: Second symbol name
+        hedge_ratio: Static β (float) or a dynamic β Series indexed by ts,
+            e.g. the 'beta' column from `kalman_hedge_ratio`
+
+    Returns:
+        Wide DataFrame indexed by ts with both prices and 'spread'
+    """
+    wide = pair_prices(df, symbol_a, symbol_b).copy()
+
+    if isinstance(hedge_ratio, pd.Series):
+        hedge_ratio = hedge_ratio.reindex(wide.index)
+
     wide["spread"] = wide[symbol_a] - hedge_ratio * wide[symbol_b]
 
     return wide
@@ -1,59 +1,54 @@
 import streamlit as st
-import asyncio
-import threading
+import time
 import pandas as pd
 from sqlalchemy import text
 
-from ingestion.binance_ws import start_stream
+from ingestion.client import (
+    get_status,
+    get_live_state,
+    get_latest_bars,
+    start_ingestion,
+    stop_ingestion,
+    set_symbols
+)
 from storage.db import init_db, engine
 
-from analytics.sampling import load_ticks, resample_ticks
-from analytics.regression import compute_hedge_ratio
-from analytics.stats import (
-    compute_spread,
-    compute_zscore,
-    compute_rolling_correlation,
-    price_statistics
-)
-from analytics.stationarity import adf_test
+from analytics.sampling import load_ticks, resample_ticks, last_bar_timestamp
+from analytics.stats import price_statistics
+from analytics.executor import AnalyticsExecutor, AnalyticsCancelled, buffers_to_frame
+from analytics.pipeline import run_pair_analytics
+from analytics.cache import ResultCache
+from analytics.backtest import backtest_grid, PERIODS_PER_YEAR
+from analytics.profiling import StageProfiler
 
 from ui.plots import (
     plot_prices,
     plot_spread_zscore,
-    plot_correlation
+    plot_correlation,
+    plot_correlation_matrix
 )
 
 from alerts.rules import check_zscore_alert
+import config
 
 st.set_page_config(page_title="Quant Analytics App", layout="wide")
 
 st.title("🔬 Real-Time Quant Analytics Dashboard")
 
-# Initialize DB
-init_db()
-
-# Initialize session state
-if "ingestion_running" not in st.session_state:
-    st.session_state.ingestion_running = False
-if "ingestion_task" not in st.session_state:
-    st.session_state.ingestion_task = None
-if "stop_event" not in st.session_state:
-    st.session_state.stop_event = None
 
+@st.cache_resource
+def init_db_once():
+    """Create the schema once per server process, not on every rerun"""
+    init_db()
+    return True
 
-def run_ingestion(symbols, stop_event):
-    """Run ingestion with stop event support"""
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
-    try:
-        loop.run_until_complete(start_stream(symbols, stop_event))
-    except Exception as e:
-        st.error(f"Ingestion error: {e}")
-    finally:
-        loop.close()
 
+# Initialize DB
+init_db_once()
 
 # Sidebar - Data Ingestion Controls
+# Ingestion runs in the standalone daemon (python -m ingestion.daemon);
+# the dashboard only attaches to it, so there is exactly one writer.
 st.sidebar.header("📡 Data Ingestion")
 
 symbols_input = st.sidebar.text_input(
@@ -62,10 +57,36 @@ symbols_input = st.sidebar.text_input(
     help="Enter Binance Futures symbols in lowercase"
 )
 
+agg_symbols = st.sidebar.multiselect(
+    "Use aggTrade stream for",
+    [s.strip().lower() for s in symbols_input.split(",") if s.strip()],
+    default=[],
+    help="Aggregated trades: one message per taker order instead of per fill. "
+         "Same bars, far fewer messages and rows on busy symbols."
+)
+
+requested_symbols = [s.strip().lower() for s in symbols_input.split(",") if s.strip()]
+requested_modes = {sym: "aggTrade" for sym in agg_symbols}
+
 # System Status Indicator
 st.sidebar.markdown("### System Status")
-if st.session_state.ingestion_running:
-    st.sidebar.success("🟢 Ingestion Active")
+daemon_status = get_status()
+
+if daemon_status is None:
+    st.sidebar.warning("⚪ Ingestion daemon not running")
+    st.sidebar.code("python -m ingestion.daemon", language="bash")
+elif daemon_status["running"]:
+    st.sidebar.success(f"🟢 Ingestion Active: {', '.join(daemon_status['symbols'])}")
+    st.sidebar.caption(f"Daemon pid {daemon_status['pid']}")
+    live = daemon_status.get("live_state") or {}
+    if live.get("ready"):
+        st.sidebar.caption(
+            f"Live pair state {'restored' if live.get('restored') else 'cold-started'} "
+            f"in {live.get('seconds', 0):.1f}s ({live.get('replayed_bars', 0)} bars replayed), "
+            f"as of {live.get('last_ts') or 'n/a'}"
+        )
+    elif live.get("warming"):
+        st.sidebar.caption("Live pair state warming up (backfilling, then replaying ticks)")
 else:
     st.sidebar.error("🔴 Ingestion Stopped")
 
@@ -82,38 +103,61 @@ except:
 col_start, col_stop = st.sidebar.columns(2)
 
 with col_start:
-    if st.button("▶️ Start", width="stretch"):
-        if not st.session_state.ingestion_running:
-            symbols = [s.strip().lower() for s in symbols_input.split(",") if s.strip()]
-            if not symbols:
-                st.sidebar.error("Please enter at least one symbol")
-            else:
-                st.session_state.stop_event = threading.Event()
-                t = threading.Thread(
-                    target=run_ingestion,
-                    args=(symbols, st.session_state.stop_event),
-                    daemon=True
-                )
-                t.start()
-                st.session_state.ingestion_task = t
-                st.session_state.ingestion_running = True
-                st.sidebar.success(f"Started ingestion for: {', '.join(symbols)}")
-                st.rerun()
+    if st.button("▶️ Start", width="stretch", disabled=daemon_status is None):
+        if not requested_symbols:
+            st.sidebar.error("Please enter at least one symbol")
+        elif not daemon_status["running"]:
+            start_ingestion(requested_symbols, requested_modes)
+            st.sidebar.success(f"Started ingestion for: {', '.join(requested_symbols)}")
+            st.rerun()
 
 with col_stop:
-    if st.button("⏹️ Stop", width="stretch"):
-        if st.session_state.ingestion_running and st.session_state.stop_event:
-            st.session_state.stop_event.set()
-            st.session_state.ingestion_running = False
+    if st.button("⏹️ Stop", width="stretch", disabled=daemon_status is None):
+        if daemon_status["running"]:
+            stop_ingestion()
             st.sidebar.info("Ingestion stopped")
             st.rerun()
 
+if (daemon_status and daemon_status["running"] and requested_symbols
+        and (requested_symbols, requested_modes) != (daemon_status["symbols"], daemon_status["modes"])):
+    if st.sidebar.button("🔄 Apply Symbol Changes", width="stretch"):
+        set_symbols(requested_symbols, requested_modes)
+        st.rerun()
+
 st.sidebar.markdown("---")
 st.sidebar.markdown("### ⚙️ Analytics Controls")
 st.sidebar.info("Configure parameters below and click 'Run Analytics' to refresh metrics.")
 
+sql_resample = st.sidebar.checkbox(
+    "Resample in database",
+    value=config.SQL_RESAMPLE_DEFAULT,
+    help="Build OHLCV bars inside SQLite and load only the bars, instead of pulling every raw tick"
+)
+
+pair_alignment = st.sidebar.selectbox(
+    "Pair alignment",
+    ["Bar grid", "Tick as-of"],
+    index=0,
+    help="Bar grid keeps only bars where both legs traded. Tick as-of pairs every tick "
+         f"of Symbol A with Symbol B's latest price (at most {config.ASOF_TOLERANCE} old); "
+         "window and backtest then count ticks, not bars."
+)
+alignment = "asof" if pair_alignment == "Tick as-of" else "bars"
+
+show_profile = st.sidebar.checkbox(
+    "Show performance profile",
+    value=False,
+    help="Per-stage timings, row counts and memory deltas for each run"
+)
+
+cprofile_enabled = st.sidebar.checkbox(
+    "cProfile next run",
+    value=False,
+    help=f"Dump a cProfile of the analytics worker to {config.PROFILE_DIR}/"
+)
+
 # Main Content
-st.info("💡 **Live tick ingestion running in background** - Start ingestion to collect data, then run analytics.")
+st.info("💡 **Live tick ingestion runs in the background daemon** - Start ingestion to collect data, then run analytics.")
 
 # Parse symbols
 symbols = [s.strip().lower() for s in symbols_input.split(",") if s.strip()]
@@ -183,7 +227,7 @@ with col3:
 
     symbol_b = st.selectbox("Symbol B", symbols_b, index=0)
 
-col4, col5 = st.columns(2)
+col4, col5, col6 = st.columns(3)
 
 with col4:
     rolling_window = st.slider(
@@ -204,30 +248,199 @@ with col5:
         help="Alert when |z-score| exceeds this value"
     )
 
-# Run Analytics Button
-if st.button("🚀 Run Analytics", type="primary", width="stretch"):
+with col6:
+    hedge_method = st.selectbox(
+        "Hedge Ratio Method",
+        ["OLS", "Kalman"],
+        index=0,
+        help="Static OLS fit, or a dynamic Kalman-filter hedge that adapts per bar"
+    )
 
-    with st.spinner("📥 Loading data..."):
-        raw_df = load_ticks(symbols)
 
-        if raw_df.empty:
-            st.error("❌ No data available. Please start ingestion and wait for data collection.")
-            st.stop()
+def find_live_pair(state, symbol_a, symbol_b):
+    """The daemon's live entry for a pair (in either leg order), or None"""
+    for pair in state["pairs"]:
+        if {pair["symbol_a"], pair["symbol_b"]} == {symbol_a, symbol_b}:
+            return pair
+    return None
+
+
+@st.fragment(run_every=config.LIVE_REFRESH_SECONDS)
+def show_live_pair_state(symbol_a, symbol_b, threshold):
+    """
+    Latest bars, hedge, spread, z-score and correlation held by the daemon.
+
+    Reruns on its own every LIVE_REFRESH_SECONDS. Both endpoints are served
+    from memory the daemon's bar bus keeps current, so refreshing never
+    queries SQLite.
+    """
+    state = get_live_state()
+    pair = None if not state else find_live_pair(state, symbol_a, symbol_b)
+
+    if pair is None:
+        st.caption("⚡ Live pair state: not available yet (daemon stopped, warming up, "
+                   "or not tracking this pair)")
+        return
+
+    corr = None
+    matrix = state["correlation"]
+    if matrix is not None:
+        i, j = matrix["symbols"].index(symbol_a), matrix["symbols"].index(symbol_b)
+        corr = matrix["values"][i][j]
+
+    st.markdown("#### ⚡ Live Pair State")
+    st.caption(
+        f"Maintained by the ingestion daemon bar by bar ({pair['symbol_a']} vs "
+        f"{pair['symbol_b']}, Kalman hedge, {state['timeframe']} bars, window "
+        f"{state['window']}), as of {state['last_ts']}. Available right after a "
+        "restart; Run Analytics recomputes with the settings above."
+    )
+
+    def fmt(value, spec):
+        return "N/A" if value is None else format(value, spec)
+
+    latest = get_latest_bars() or {}
+    bar_a = latest.get(symbol_a, {}).get(state["timeframe"])
+    bar_b = latest.get(symbol_b, {}).get(state["timeframe"])
+
+    col1, col2, col3, col4, col5, col6 = st.columns(6)
+    col1.metric(f"{symbol_a} Close", fmt(bar_a and bar_a["close"], ".4f"))
+    col2.metric(f"{symbol_b} Close", fmt(bar_b and bar_b["close"], ".4f"))
+    col3.metric("Spread", fmt(pair["spread"], ".4f"))
+    col4.metric("Z-Score", fmt(pair["zscore"], ".2f"))
+    col5.metric("Correlation", fmt(corr, ".3f"))
+    col6.metric("Hedge Ratio (β)", fmt(pair["beta"], ".4f"))
+
+    alert = check_zscore_alert(pd.Series([pair["zscore"]], dtype=float), threshold)
+    if alert["triggered"]:
+        st.error(
+            f"🚨 **LIVE ALERT**: |Z-Score| = {abs(alert['value']):.2f} "
+            f"exceeded threshold {alert['threshold']:.2f}"
+        )
+
 
-        resampled_df = resample_ticks(raw_df, timeframe)
+show_live_pair_state(symbol_a.upper(), symbol_b.upper(), alert_threshold)
 
-        if resampled_df.empty:
-            st.error("❌ Not enough data to resample. Please wait for more data.")
+
+@st.cache_resource
+def get_analytics_executor():
+    """Process pool shared by all sessions"""
+    return AnalyticsExecutor(max_workers=config.ANALYTICS_WORKERS)
+
+
+@st.cache_resource
+def get_result_cache():
+    """Analytics results shared by all sessions"""
+    return ResultCache(max_bytes=config.ANALYTICS_CACHE_MAX_MB * 1024 * 1024)
+
+
+def run_analytics_job(params, run_id=None):
+    """
+    Run the analytics pipeline in the process pool, showing its progress.
+
+    If this session already has a job running with the same parameters
+    (the script was rerun while waiting on it), that job is awaited again
+    instead of submitting a duplicate.
+    """
+    job = st.session_state.get("analytics_job")
+    if job is None or job.done() or job.params != params:
+        job = get_analytics_executor().submit(run_pair_analytics, params, run_id=run_id)
+        st.session_state.analytics_job = job
+
+    progress_bar = st.progress(0.0, text="📥 Queued...")
+    while not job.done():
+        stage, fraction = job.progress()
+        progress_bar.progress(fraction, text=f"🔬 {stage}...")
+        if time.monotonic() - job.submitted_at > config.ANALYTICS_TIMEOUT_SECONDS:
+            # Cooperative cancel first; a stage stuck past the grace period
+            # gets its worker killed so the pool does not fill up with them
+            get_analytics_executor().terminate(job, config.ANALYTICS_CANCEL_GRACE_SECONDS)
+            st.error(f"❌ Analytics timed out after {config.ANALYTICS_TIMEOUT_SECONDS}s. "
+                     "Try a coarser timeframe or shorter lookback.")
             st.stop()
+        time.sleep(0.1)
+
+    try:
+        return job.result()
+    except AnalyticsCancelled:
+        st.warning("⚠️ Analytics run was cancelled")
+        st.stop()
+    finally:
+        progress_bar.empty()
+        st.session_state.analytics_job = None
 
-    with st.spinner("🔬 Computing analytics..."):
-        hedge = compute_hedge_ratio(resampled_df, symbol_a.upper(), symbol_b.upper())
 
-    if hedge is None:
+# Cache statistics
+cache_stats = get_result_cache().metrics()
+st.sidebar.caption(
+    f"Analytics cache: {cache_stats['hits']} hits · {cache_stats['misses']} misses · "
+    f"{cache_stats['coalesced']} shared · "
+    f"{cache_stats['bytes'] / 1e6:.1f}/{cache_stats['max_bytes'] / 1e6:.0f} MB"
+)
+
+analytics_params = {
+    "symbols": symbols,
+    "timeframe": timeframe,
+    "symbol_a": symbol_a.upper(),
+    "symbol_b": symbol_b.upper(),
+    "window": rolling_window,
+    "hedge_method": hedge_method,
+    "sql_resample": sql_resample,
+    "alignment": alignment,
+    "cprofile": cprofile_enabled
+}
+
+# Run Analytics Button
+run_clicked = st.button("🚀 Run Analytics", type="primary", width="stretch")
+
+# A job left running by an interrupted script run is resumed only by a Run
+# click with the same parameters; otherwise nobody waits on it, so cancel it
+previous_job = st.session_state.get("analytics_job")
+if previous_job is not None and not previous_job.done() and (
+        not run_clicked or previous_job.params != analytics_params):
+    previous_job.cancel()
+    st.session_state.analytics_job = None
+
+if run_clicked:
+    profiler = StageProfiler()
+
+    # Identical requests from any session share one computation until a new bar starts
+    cache_key = (
+        symbol_a.upper(),
+        symbol_b.upper(),
+        timeframe,
+        rolling_window,
+        hedge_method,
+        tuple(sorted(symbols)),
+        alignment,
+        cprofile_enabled,
+        last_bar_timestamp(symbols, timeframe)
+    )
+
+    try:
+        with profiler.stage("analytics_job"):
+            result = get_result_cache().get_or_compute(
+                cache_key,
+                lambda: run_analytics_job(analytics_params, profiler.run_id),
+                timeout=config.ANALYTICS_TIMEOUT_SECONDS
+            )
+    except TimeoutError:
+        st.error(f"❌ Analytics timed out after {config.ANALYTICS_TIMEOUT_SECONDS}s.")
+        st.stop()
+
+    if result["status"] == "no_data":
+        st.error("❌ No data available. Please start ingestion and wait for data collection.")
+        st.stop()
+
+    with profiler.stage("decode_bars") as stage:
+        resampled_df = buffers_to_frame(result["bars"])
+        stage.rows = len(resampled_df)
+
+    if result["status"] == "no_hedge":
         # Better diagnostics with correct threshold
         aligned = (
             resampled_df[resampled_df["symbol"].isin([symbol_a.upper(), symbol_b.upper()])]
-            .pivot(index="ts", columns="symbol", values="price")
+            .pivot(index="ts", columns="symbol", values="price_close")
             .dropna()
         )
 
@@ -238,20 +451,20 @@ if st.button("🚀 Run Analytics", type="primary", width="stretch"):
         """)
         st.stop()
 
-    # Compute all analytics
-    spread_df = compute_spread(
-        resampled_df, symbol_a.upper(), symbol_b.upper(), hedge
-    )
-
-    if spread_df.empty or len(spread_df) < rolling_window:
+    if result["status"] == "insufficient":
         st.error(f"❌ Insufficient data for rolling window analysis. Need at least {rolling_window} points.")
         st.stop()
 
-    spread_df["zscore"] = compute_zscore(spread_df["spread"], rolling_window)
+    with profiler.stage("decode_spread") as stage:
+        hedge = result["hedge"]
+        if isinstance(hedge, dict):
+            hedge = buffers_to_frame(hedge)["beta"]
 
-    corr = compute_rolling_correlation(
-        resampled_df, symbol_a.upper(), symbol_b.upper(), rolling_window
-    )
+        spread_df = buffers_to_frame(result["spread"])
+        corr = None if result["corr"] is None else buffers_to_frame(result["corr"])["corr"]
+        stage.rows = len(spread_df)
+
+    latest_hedge = hedge.iloc[-1] if isinstance(hedge, pd.Series) else hedge
 
     # ========== LIVE SUMMARY STATS ==========
     st.subheader("📊 Live Summary Statistics")
@@ -286,7 +499,7 @@ if st.button("🚀 Run Analytics", type="primary", width="stretch"):
     with col4:
         st.metric(
             "Hedge Ratio (β)",
-            f"{hedge:.4f}"
+            f"{latest_hedge:.4f}"
         )
 
     # ========== ALERT SYSTEM ==========
@@ -312,26 +525,47 @@ if st.button("🚀 Run Analytics", type="primary", width="stretch"):
 
     # Price Comparison Chart
     st.markdown("#### Price Comparison")
-    price_fig = plot_prices(
-        spread_df.reset_index().rename(columns={"index": "ts"}),
-        symbol_a.upper(),
-        symbol_b.upper()
-    )
+    with profiler.stage("plot_prices") as stage:
+        price_fig = plot_prices(
+            spread_df.reset_index().rename(columns={"index": "ts"}),
+            symbol_a.upper(),
+            symbol_b.upper()
+        )
+        stage.rows = len(spread_df)
     st.plotly_chart(price_fig, use_container_width=True)
 
     # Spread & Z-Score Chart
     st.markdown("#### Spread & Z-Score Evolution")
-    spread_fig = plot_spread_zscore(spread_df, alert_threshold)
+    with profiler.stage("plot_spread_zscore") as stage:
+        spread_fig = plot_spread_zscore(spread_df, alert_threshold)
+        stage.rows = len(spread_df)
     st.plotly_chart(spread_fig, use_container_width=True)
 
     # Rolling Correlation Chart
     if corr is not None and not corr.dropna().empty:
         st.markdown("#### Rolling Correlation")
-        corr_fig = plot_correlation(corr)
+        with profiler.stage("plot_correlation") as stage:
+            corr_fig = plot_correlation(corr)
+            stage.rows = len(corr)
         st.plotly_chart(corr_fig, use_container_width=True)
     else:
         st.info("ℹ️ Correlation data unavailable")
 
+    # Universe Correlation Heatmap (all ingested symbols)
+    corr_matrix = None
+    if result["corr_matrix"] is not None:
+        corr_matrix = pd.DataFrame(
+            result["corr_matrix"]["values"],
+            index=result["corr_matrix"]["symbols"],
+            columns=result["corr_matrix"]["symbols"]
+        )
+    if corr_matrix is not None and len(corr_matrix) > 2:
+        st.markdown("#### Universe Correlation Matrix")
+        with profiler.stage("plot_correlation_matrix") as stage:
+            matrix_fig = plot_correlation_matrix(corr_matrix)
+            stage.rows = len(corr_matrix)
+        st.plotly_chart(matrix_fig, use_container_width=True)
+
     st.markdown("---")
 
     # ========== DESCRIPTIVE STATISTICS ==========
@@ -362,25 +596,61 @@ if st.button("🚀 Run Analytics", type="primary", width="stretch"):
         - **p-value ≥ 0.05**: Fail to reject → Series is non-stationary
         """)
 
-        if st.button("Run ADF Test on Spread"):
-            with st.spinner("Running ADF test..."):
-                adf = adf_test(spread_df["spread"])
-                if adf:
-                    st.json(adf)
-
-                    # Interpretation
-                    if adf["p_value"] < 0.05:
-                        st.success(
-                            f"✅ **Stationary** (p-value: {adf['p_value']:.4f}) - "
-                            "Spread shows mean-reverting behavior"
-                        )
-                    else:
-                        st.warning(
-                            f"⚠️ **Non-Stationary** (p-value: {adf['p_value']:.4f}) - "
-                            "Spread may not be suitable for mean-reversion strategies"
-                        )
-                else:
-                    st.error("Insufficient data for ADF test")
+        # Computed in the analytics worker alongside the spread
+        adf = result["adf"]
+        if adf:
+            st.json(adf)
+
+            # Interpretation
+            if adf["p_value"] < 0.05:
+                st.success(
+                    f"✅ **Stationary** (p-value: {adf['p_value']:.4f}) - "
+                    "Spread shows mean-reverting behavior"
+                )
+            else:
+                st.warning(
+                    f"⚠️ **Non-Stationary** (p-value: {adf['p_value']:.4f}) - "
+                    "Spread may not be suitable for mean-reversion strategies"
+                )
+        else:
+            st.error("Insufficient data for ADF test")
+
+    # ========== PARAMETER BACKTEST ==========
+    with st.expander("🧪 Parameter Backtest - Window & Threshold Grid", expanded=False):
+        if hedge_method == "Kalman":
+            hedge_note = (
+                "The Kalman hedge only uses past bars and is re-hedged every bar, "
+                "but the best grid cell is still picked in-sample."
+            )
+        else:
+            hedge_note = "The hedge ratio is fitted in-sample, so results are optimistic."
+
+        st.markdown(f"""
+        Simulates the z-score mean-reversion strategy on this spread for every
+        (window, entry, exit) combination. Fees: **{config.DEFAULT_FEE_BPS} bps** per trade
+        on gross notional. Sharpe is annualized for the selected timeframe.
+        {hedge_note}
+        """)
+
+        with profiler.stage("backtest_grid") as stage:
+            grid = backtest_grid(
+                spread_df,
+                symbol_a.upper(),
+                symbol_b.upper(),
+                hedge,
+                windows=config.BACKTEST_WINDOWS,
+                entry_thresholds=config.BACKTEST_ENTRY_THRESHOLDS,
+                exit_thresholds=config.BACKTEST_EXIT_THRESHOLDS,
+                fee_bps=config.DEFAULT_FEE_BPS,
+                # Tick-aligned spreads have no fixed period; Sharpe stays per tick
+                periods_per_year=PERIODS_PER_YEAR.get(timeframe) if alignment == "bars" else None
+            )
+            stage.rows = len(grid)
+
+        if grid.empty:
+            st.info("ℹ️ Not enough data to backtest")
+        else:
+            st.dataframe(grid, width="stretch", height=300)
 
     # ========== DATA EXPORT ==========
     st.markdown("---")
@@ -389,7 +659,9 @@ if st.button("🚀 Run Analytics", type="primary", width="stretch"):
     col1, col2 = st.columns(2)
 
     with col1:
-        csv_spread = spread_df.reset_index().to_csv(index=False)
+        with profiler.stage("csv_spread") as stage:
+            csv_spread = spread_df.reset_index().to_csv(index=False)
+            stage.rows = len(spread_df)
         st.download_button(
             label="📥 Download Spread & Z-Score CSV",
             data=csv_spread,
@@ -399,7 +671,9 @@ if st.button("🚀 Run Analytics", type="primary", width="stretch"):
         )
 
     with col2:
-        csv_resampled = resampled_df.to_csv(index=False)
+        with profiler.stage("csv_bars") as stage:
+            csv_resampled = resampled_df.to_csv(index=False)
+            stage.rows = len(resampled_df)
         st.download_button(
             label="📥 Download Resampled Price Data CSV",
             data=csv_resampled,
@@ -408,6 +682,27 @@ if st.button("🚀 Run Analytics", type="primary", width="stretch"):
             width="stretch"
         )
 
+    # ========== PERFORMANCE PROFILE ==========
+    if show_profile:
+        with st.expander("⏱️ Performance Profile", expanded=True):
+            worker_records = result.get("profile", [])
+            if worker_records and worker_records[0]["run_id"] != profiler.run_id:
+                st.caption(
+                    f"Worker stages are from run {worker_records[0]['run_id']} "
+                    "(result served from cache)"
+                )
+
+            profile_df = pd.DataFrame(worker_records + profiler.records)
+            st.dataframe(
+                profile_df[["source", "stage", "ms", "rows", "mem_delta_mb"]],
+                width="stretch"
+            )
+            st.caption(f"Run {profiler.run_id} · dashboard stages {profiler.total_ms():.0f} ms")
+
+            if result.get("cprofile_path"):
+                st.markdown("cProfile dump (open as a flamegraph with `snakeviz`):")
+                st.code(f"snakeviz {result['cprofile_path']}", language="bash")
+
 # Footer
 st.markdown("---")
 st.caption("🔬 Real-Time Quantitative Analytics Dashboard | Built for Statistical Arbitrage & Mean-Reversion "
@@ -0,0 +1,217 @@
+"""
+Local stand-in for the Binance Futures WebSocket, for offline load tests.
+
+Serves Binance-format trade messages at a configurable rate, with optional
+burst windows and injected disconnects:
+
+    ws://HOST:PORT/ws/<symbol>@trade                     raw stream
+    ws://HOST:PORT/ws/<symbol>@aggTrade                  raw stream
+    ws://HOST:PORT/stream?streams=<s1>@trade/<s2>@trade  combined stream
+
+Trade ids are per symbol and continue across connections, so a reconnect
+never produces a gap on its own.
+
+Usage:
+    python benchmarks/fake_exchange.py --rate 5000 [--burst-every 10
+        --burst-seconds 2 --burst-multiplier 5] [--disconnect-every 30]
+
+Point ingestion at it with BINANCE_FUTURES_WS=ws://127.0.0.1:9443/ws.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import random
+import sys
+import time
+from collections import defaultdict
+from urllib.parse import parse_qs, urlparse
+
+import websockets
+
+# Messages are sent in small batches every TICK_SECONDS to hit high rates
+TICK_SECONDS = 0.005
+
+
+class FakeExchange:
+    """
+    WebSocket server emitting synthetic trades.
+
+    Args:
+        rate: Messages per second per stream
+        burst_every: Seconds between bursts (0 disables bursts)
+        burst_seconds: Length of each burst
+        burst_multiplier: Rate multiplier during a burst
+        disconnect_every: Close each connection after this many seconds
+            (0 disables disconnect injection)
+        abort: Drop the TCP connection instead of a clean close frame
+    """
+
+    def __init__(self, rate=1000, burst_every=0.0, burst_seconds=1.0,
+                 burst_multiplier=5.0, disconnect_every=0.0, abort=False):
+        self.rate = rate
+        self.burst_every = burst_every
+        self.burst_seconds = burst_seconds
+        self.burst_multiplier = burst_multiplier
+        self.disconnect_every = disconnect_every
+        self.abort = abort
+
+        self._trade_ids = defaultdict(lambda: itertools.count(1))
+        self._prices = {}
+        self.sent = defaultdict(int)
+        self.connections = 0
+        self.disconnects = 0
+        # Seconds each symbol's stream spent connected (closed connections)
+        self._connected = defaultdict(float)
+        self._open = {}
+
+    def current_rate(self, now):
+        if self.burst_every and (now % self.burst_every) < self.burst_seconds:
+            return self.rate * self.burst_multiplier
+        return self.rate
+
+    def connected_seconds(self):
+        """
+        Total seconds streams have been connected, summed over symbols
+        (a symbol on two connections at once counts twice).
+        """
+        now = time.monotonic()
+        total = sum(self._connected.values())
+        for opened, streams in list(self._open.values()):
+            total += (now - opened) * len(streams)
+        return total
+
+    def make_message(self, symbol, mode, combined):
+        """
+        One Binance-format trade/aggTrade message for a symbol.
+        """
+        price = self._prices.get(symbol, 100.0) * (1 + random.gauss(0, 1e-4))
+        self._prices[symbol] = price
+        ms = int(time.time() * 1000)
+        trade_id = next(self._trade_ids[symbol])
+
+        data = {
+            "e": mode,
+            "E": ms,
+            "T": ms,
+            "s": symbol.upper(),
+            "p": f"{price:.4f}",
+            "q": f"{random.uniform(0.001, 2.0):.3f}",
+            "m": random.random() < 0.5
+        }
+        if mode == "aggTrade":
+            data.update(a=trade_id, f=trade_id, l=trade_id)
+        else:
+            data["t"] = trade_id
+
+        if combined:
+            data = {"stream": f"{symbol}@{mode}", "data": data}
+        return json.dumps(data)
+
+    async def handler(self, ws):
+        url = urlparse(ws.request.path)
+        if url.path.startswith("/ws/"):
+            streams, combined = [url.path[len("/ws/"):]], False
+        elif url.path == "/stream":
+            streams = parse_qs(url.query).get("streams", [""])[0].split("/")
+            combined = True
+        else:
+            await ws.close(code=1008, reason="unknown path")
+            return
+
+        streams = [s.split("@", 1) for s in streams if "@" in s]
+        self.connections += 1
+        opened = last = time.monotonic()
+        self._open[id(ws)] = (opened, streams)
+        due = 0.0
+
+        try:
+            while True:
+                now = time.monotonic()
+                if self.disconnect_every and now - opened >= self.disconnect_every:
+                    self.disconnects += 1
+                    if self.abort:
+                        ws.transport.abort()
+                    else:
+                        await ws.close(code=1001, reason="injected disconnect")
+                    return
+
+                # Accrue by elapsed time so sleep overshoot doesn't lower the rate
+                due += self.current_rate(now) * (now - last)
+                last = now
+                batch, due = int(due), due - int(due)
+
+                for _ in range(batch):
+                    for symbol, mode in streams:
+                        # send() waits on the socket buffer, so a slow
+                        # consumer throttles us instead of queueing unboundedly
+                        await ws.send(self.make_message(symbol, mode, combined))
+                        self.sent[symbol] += 1
+
+                await asyncio.sleep(max(0.0, TICK_SECONDS - (time.monotonic() - now)))
+
+        except websockets.exceptions.ConnectionClosed:
+            pass
+        finally:
+            del self._open[id(ws)]
+            for symbol, _ in streams:
+                self._connected[symbol] += time.monotonic() - opened
+
+    def serve(self, host="127.0.0.1", port=9443):
+        """
+        Async context manager running the server.
+        """
+        return websockets.serve(self.handler, host, port, compression=None, max_queue=None)
+
+    def stats(self):
+        return {
+            "sent": dict(self.sent),
+            "connections": self.connections,
+            "disconnects": self.disconnects,
+            "connected_seconds": self.connected_seconds()
+        }
+
+
+async def run(exchange, host, port, duration):
+    async with exchange.serve(host, port):
+        print(f"Fake exchange on ws://{host}:{port}/ws  (rate {exchange.rate}/s per stream)")
+        started = time.monotonic()
+        last = 0
+        while not duration or time.monotonic() - started < duration:
+            await asyncio.sleep(1.0)
+            total = sum(exchange.sent.values())
+            print(f"{total - last:>8} msg/s  total {total}  "
+                  f"connections {exchange.connections}  disconnects {exchange.disconnects}")
+            last = total
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9443)
+    parser.add_argument("--rate", type=float, default=1000, help="Messages/s per stream")
+    parser.add_argument("--burst-every", type=float, default=0.0)
+    parser.add_argument("--burst-seconds", type=float, default=1.0)
+    parser.add_argument("--burst-multiplier", type=float, default=5.0)
+    parser.add_argument("--disconnect-every", type=float, default=0.0)
+    parser.add_argument("--abort", action="store_true", help="Drop TCP instead of closing cleanly")
+    parser.add_argument("--duration", type=float, default=0.0, help="Seconds to run (0 = forever)")
+    args = parser.parse_args()
+
+    exchange = FakeExchange(
+        rate=args.rate,
+        burst_every=args.burst_every,
+        burst_seconds=args.burst_seconds,
+        burst_multiplier=args.burst_multiplier,
+        disconnect_every=args.disconnect_every,
+        abort=args.abort
+    )
+    try:
+        asyncio.run(run(exchange, args.host, args.port, args.duration))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
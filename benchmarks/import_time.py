@@ -0,0 +1,102 @@
+"""
+Measure the dashboard's cold-start import cost with `python -X importtime`.
+
+Imports everything `app.py` loads at module level in a fresh interpreter,
+prints the slowest top-level packages, and fails if the total exceeds the
+budget or if a lazily-loaded heavy dependency sneaks back in.
+
+Usage:
+    python benchmarks/import_time.py [--budget-ms 1200]
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+import config  # noqa: E402
+
+# Project modules imported at module level by app.py
+PROJECT_IMPORTS = [
+    "ingestion.client",
+    "storage.db",
+    "analytics.sampling",
+    "analytics.stats",
+    "analytics.executor",
+    "analytics.pipeline",
+    "analytics.backtest",
+    "ui.plots",
+    "alerts.rules",
+    "config",
+]
+
+# Everything app.py imports at module level
+APP_IMPORTS = ["streamlit", "pandas", "sqlalchemy"] + PROJECT_IMPORTS
+
+# Must only load when the code path that needs them runs. Streamlit pulls in
+# plotly for st.plotly_chart itself, so this is checked on project imports only.
+LAZY_MODULES = ["statsmodels", "plotly", "scipy"]
+
+
+def measure(modules):
+    """
+    Run a fresh interpreter with -X importtime.
+
+    Returns:
+        Tuple (dict of top-level module -> cumulative import time in
+        microseconds, set of every module name imported)
+    """
+    code = "; ".join(f"import {m}" for m in modules)
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=REPO_ROOT,
+        capture_output=True,
+        text=True,
+        check=True
+    )
+
+    totals = {}
+    loaded = set()
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        loaded.add(name.strip())
+        # Nested imports are indented; only count top-level entries
+        if name.startswith(" ") and not name.startswith("  "):
+            totals[name.strip()] = int(cumulative)
+
+    return totals, loaded
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--budget-ms", type=float, default=config.COLD_START_BUDGET_MS)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    totals, _ = measure(APP_IMPORTS)
+    _, loaded = measure(PROJECT_IMPORTS)
+    total_ms = sum(totals.values()) / 1000
+
+    print(f"{'module':<40} {'cumulative ms':>14}")
+    for name, us in sorted(totals.items(), key=lambda kv: -kv[1])[:args.top]:
+        print(f"{name:<40} {us / 1000:>14.1f}")
+    print(f"{'TOTAL':<40} {total_ms:>14.1f}  (budget {args.budget_ms:.0f} ms)")
+
+    eager = [m for m in LAZY_MODULES if m in loaded]
+    if eager:
+        print(f"FAIL: imported at startup: {', '.join(eager)}")
+        return 1
+    if total_ms > args.budget_ms:
+        print("FAIL: cold-start import budget exceeded")
+        return 1
+
+    print("OK")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
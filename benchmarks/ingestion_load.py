@@ -0,0 +1,165 @@
+"""
+Find the maximum tick rate `ingestion.binance_ws` can sustain, offline.
+
+Runs `start_stream` against benchmarks/fake_exchange.py in a scratch
+directory (its own data/ticks.db) and steps the per-symbol message rate up.
+Rates are measured over the time streams were actually connected, so
+reconnect pauses and step restarts do not count as saturation: a step is
+sustained when at least --min-ratio of the target rate is stored per
+connected second. Messages lost with a dropped connection and the trade id
+gaps they leave are reported separately (gaps are not backfilled here).
+With --disconnect-every, it also checks that streams reconnect.
+
+Usage:
+    python benchmarks/ingestion_load.py [--rates 1000,5000,10000,50000,100000]
+        [--symbols btcusdt] [--step-seconds 5] [--disconnect-every 2]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import threading
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from fake_exchange import FakeExchange  # noqa: E402
+
+
+def count_ticks(get_connection, text):
+    with get_connection() as conn:
+        return conn.execute(text("SELECT COUNT(*) FROM ticks")).scalar()
+
+
+def run_step(exchange, symbols, seconds, start_stream, count, warmup=1.0):
+    """
+    Stream for `warmup + seconds` and measure the steady-state part, after
+    connecting and before stopping.
+
+    Returns:
+        Tuple (messages sent, ticks stored, elapsed seconds, connected
+        seconds summed over symbols)
+    """
+    stop_event = threading.Event()
+
+    def ingest():
+        asyncio.run(start_stream(symbols, stop_event))
+
+    thread = threading.Thread(target=ingest, daemon=True)
+    thread.start()
+    time.sleep(warmup)
+
+    sent_before, stored_before = sum(exchange.sent.values()), count()
+    connected_before = exchange.connected_seconds()
+    started = time.monotonic()
+    time.sleep(seconds)
+    sent, stored = sum(exchange.sent.values()) - sent_before, count() - stored_before
+    connected = exchange.connected_seconds() - connected_before
+    elapsed = time.monotonic() - started
+
+    stop_event.set()
+    thread.join()
+
+    return sent, stored, elapsed, connected
+
+
+def count_gaps(find_trade_id_gaps, symbols, since_ids):
+    """
+    Trade id gaps per symbol at or after since_ids[symbol].
+    """
+    return sum(len(find_trade_id_gaps(s.upper(), since_ids.get(s))) for s in symbols)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rates", default="1000,5000,10000,50000,100000",
+                        help="Comma-separated messages/s per symbol")
+    parser.add_argument("--symbols", default="btcusdt")
+    parser.add_argument("--step-seconds", type=float, default=5.0)
+    parser.add_argument("--min-ratio", type=float, default=0.95)
+    parser.add_argument("--disconnect-every", type=float, default=0.0)
+    parser.add_argument("--port", type=int, default=9443)
+    args = parser.parse_args()
+
+    symbols = [s.strip().lower() for s in args.symbols.split(",") if s.strip()]
+    rates = [float(r) for r in args.rates.split(",")]
+
+    # storage.db opens data/ticks.db relative to the cwd at import time
+    workdir = tempfile.mkdtemp(prefix="ingestion_load_")
+    os.makedirs(os.path.join(workdir, "data"))
+    os.chdir(workdir)
+
+    import config
+    config.BINANCE_FUTURES_WS = f"ws://127.0.0.1:{args.port}/ws"
+    config.WS_RECONNECT_DELAY_SECONDS = 0.1
+    # Offline: trades lost with a dropped connection are counted as gaps,
+    # not fetched over REST
+    config.BACKFILL_ON_GAP = False
+
+    import logging
+    from sqlalchemy import text
+    from storage.db import init_db, get_connection, find_trade_id_gaps, get_last_trade_id
+    from ingestion.binance_ws import start_stream
+
+    logging.getLogger("ingestion").setLevel(logging.WARNING)
+    logging.getLogger("websockets").setLevel(logging.WARNING)
+    init_db()
+
+    exchange = FakeExchange(disconnect_every=args.disconnect_every)
+    loop = asyncio.new_event_loop()
+    ready = threading.Event()
+
+    async def serve():
+        async with exchange.serve(port=args.port):
+            ready.set()
+            await asyncio.Future()
+
+    threading.Thread(target=loop.run_until_complete, args=(serve(),), daemon=True).start()
+    ready.wait()
+
+    print(f"{'target/s':>10} {'sent/s':>10} {'stored/s':>10} {'ratio':>7} "
+          f"{'up':>5} {'lost':>7} {'gaps':>5}  result")
+    max_sustained = None
+    total_gaps = 0
+    for rate in rates:
+        exchange.rate = rate
+        since_ids = {s: (get_last_trade_id(s) or 0) + 1 for s in symbols}
+        sent, stored, elapsed, connected = run_step(
+            exchange, symbols, args.step_seconds, start_stream,
+            lambda: count_ticks(get_connection, text)
+        )
+        gaps = count_gaps(find_trade_id_gaps, symbols, since_ids)
+        total_gaps += gaps
+
+        # Per connected second of each symbol's stream, i.e. insert throughput
+        target = rate * len(symbols)
+        per_second = len(symbols) / connected if connected else 0.0
+        ratio = stored * per_second / target
+        ok = ratio >= args.min_ratio
+        print(f"{target:>10.0f} {sent * per_second:>10.0f} {stored * per_second:>10.0f} "
+              f"{ratio:>7.2f} {connected / len(symbols) / elapsed:>5.0%} "
+              f"{max(sent - stored, 0):>7} {gaps:>5}  {'ok' if ok else 'saturated'}")
+        if not ok:
+            break
+        max_sustained = target
+
+    print(f"Max sustained: {max_sustained or 0:.0f} ticks/s "
+          f"({len(symbols)} symbol(s), scratch dir {workdir})")
+
+    print("up = share of the step streams were connected; lost = messages sent but not "
+          "stored within the step (in flight at a disconnect, or backlog once saturated)")
+
+    if args.disconnect_every:
+        print(f"Connections {exchange.connections}, injected disconnects "
+              f"{exchange.disconnects}, trade id gaps {total_gaps}")
+        if exchange.connections <= len(symbols):
+            print("FAIL: streams did not reconnect")
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,14 +1,41 @@
 """
 Configuration constants for the Quant Analytics Dashboard.
 """
+import os
 
 # ==================== DATABASE ====================
 DB_PATH = "data/ticks.db"
 DB_ECHO = False  # Set to True for SQL query logging
+TICK_CHUNKSIZE = 200_000  # Rows per chunk for compact/chunked tick reads
+TICK_RETENTION_DAYS = None  # Days of tick partitions to keep (None = keep all)
+RETENTION_CHECK_SECONDS = 3600  # How often the ingestion daemon applies retention
 
 # ==================== WEBSOCKET ====================
-BINANCE_FUTURES_WS = "wss://fstream.binance.com/ws"
+# Overridable, e.g. to point ingestion at benchmarks/fake_exchange.py
+BINANCE_FUTURES_WS = os.environ.get("BINANCE_FUTURES_WS", "wss://fstream.binance.com/ws")
 WS_TIMEOUT_SECONDS = 1.0  # Check stop_event every N seconds
+WS_RECONNECT_DELAY_SECONDS = 2.0  # Pause before reconnecting a dropped stream
+TICK_BATCH_SIZE = 500  # Live ticks buffered per stream before a batch insert
+TICK_FLUSH_SECONDS = 0.25  # Max time a live tick waits in the buffer
+
+# ==================== INGESTION DAEMON ====================
+INGESTION_CONTROL_HOST = "127.0.0.1"
+INGESTION_CONTROL_PORT = 8765
+INGESTION_PIDFILE = "data/ingestion.pid"
+
+# Live bar building and BarClosed events (see ingestion.bar_builder, ingestion.events)
+BAR_TIMEFRAMES = ("1s", "1m", "5m")
+BAR_CLOSE_GRACE_SECONDS = 1.0  # Wait this long past a bar's end for late ticks
+EVENT_QUEUE_SIZE = 1000  # Per-subscriber buffer before the drop policy applies
+
+# ==================== BACKFILL ====================
+BINANCE_FUTURES_REST = "https://fapi.binance.com"
+BINANCE_API_KEY = os.environ.get("BINANCE_API_KEY", "")  # historicalTrades needs a key
+BACKFILL_PAGE_SIZE = 1000  # Max trades per historicalTrades request
+BACKFILL_REQUESTS_PER_SECOND = 2.0  # Weight 20/request against 2400/min
+BACKFILL_MAX_CONCURRENCY = 4
+BACKFILL_MAX_GAP = 200_000  # Larger gaps are logged, not fetched
+BACKFILL_ON_GAP = True  # Fetch gaps seen while streaming (off: leave them for backfill_gaps)
 
 # ==================== ANALYTICS ====================
 
@@ -22,6 +49,38 @@ DEFAULT_ROLLING_WINDOW = 50
 DEFAULT_ALERT_THRESHOLD = 2.0
 DEFAULT_LOOKBACK_MINUTES = 60
 
+# Kalman hedge ratio (see analytics.kalman)
+KALMAN_DELTA = 1e-5    # State drift of alpha/beta per observation
+KALMAN_OBS_VAR = 1e-3  # Measurement noise variance
+
+# Off-thread analytics (see analytics.executor)
+ANALYTICS_WORKERS = 2
+ANALYTICS_TIMEOUT_SECONDS = 120
+ANALYTICS_CANCEL_GRACE_SECONDS = 5  # Then a job ignoring cancellation gets its workers killed
+ANALYTICS_CACHE_MAX_MB = 256  # Cross-session result cache budget (LRU beyond this)
+
+# Opt-in cProfile dumps of analytics runs (see analytics.profiling)
+PROFILE_DIR = "data/profiles"
+
+# Backtest parameter grid (see analytics.backtest)
+DEFAULT_FEE_BPS = 4.0  # Taker fee per trade, basis points of gross notional
+BACKTEST_WINDOWS = (20, 50, 100)
+BACKTEST_ENTRY_THRESHOLDS = (1.5, 2.0, 2.5, 3.0)
+BACKTEST_EXIT_THRESHOLDS = (0.0, 0.5, 1.0)
+
+# Max age of leg B's price when pairing ticks as-of (see analytics.alignment)
+ASOF_TOLERANCE = "5s"
+
+# Live pair state kept by the ingestion daemon (see analytics.live_state)
+LIVE_STATE_PATH = "data/live_state.npz"  # Snapshot restored on restart
+LIVE_STATE_TIMEFRAME = "1m"
+LIVE_STATE_WINDOW = 50  # Z-score and correlation window, in bars
+LIVE_STATE_CHECKPOINT_SECONDS = 60
+LIVE_STATE_CATCH_UP_SECONDS = 30  # Max wait for downtime backfills before replaying
+
+# Build OHLCV bars inside SQLite by default (see analytics.sampling.resample_ticks_sql)
+SQL_RESAMPLE_DEFAULT = True
+
 # Valid timeframe mappings
 VALID_TIMEFRAMES = {
     "1s": "1S",   # 1 second
@@ -36,10 +95,22 @@ PAGE_LAYOUT = "wide"
 # Default symbols for initial load
 DEFAULT_SYMBOLS = "btcusdt,ethusdt"
 
+# Live pair panel refresh from the ingestion daemon (no database reads)
+LIVE_REFRESH_SECONDS = 2
+
 # Chart heights (in pixels)
 CHART_HEIGHT_STANDARD = 400
 CHART_HEIGHT_TALL = 450
 
+# Cold-start import budget for app.py (see benchmarks/import_time.py)
+COLD_START_BUDGET_MS = 1500
+
+# ==================== ARROW SERVICE ====================
+ARROW_SERVICE_HOST = "127.0.0.1"
+ARROW_SERVICE_PORT = 8766
+ARROW_SLICE_MINUTES = 360  # Ticks loaded per slice when streaming bars
+ARROW_BATCH_ROWS = 65_536  # Max rows per record batch for analytics streams
+
 # ==================== LOGGING ====================
 LOG_LEVEL = "INFO"
 LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
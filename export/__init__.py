@@ -0,0 +1,6 @@
+"""
+Data export services for research clients.
+"""
+from .arrow_service import fetch_bars, fetch_spread, make_arrow_server
+
+__all__ = ['fetch_bars', 'fetch_spread', 'make_arrow_server']
@@ -0,0 +1,236 @@
+"""
+Local Arrow IPC streaming service for bars and spread analytics.
+
+Streams record batches instead of CSV, so notebooks keep exact dtypes and
+can read columns zero-copy into pandas/NumPy.
+
+Usage:
+    python -m export.arrow_service [--port 8766]
+
+Endpoints (all GET, response is an Arrow IPC stream):
+    /bars?symbols=btcusdt,ethusdt&timeframe=1m&start=<ISO>&end=<ISO>
+    /spread?symbol_a=ethusdt&symbol_b=btcusdt&timeframe=1m&window=50
+           &hedge=OLS&start=<ISO>&end=<ISO>
+
+start/end default to the last DEFAULT_LOOKBACK_MINUTES.
+"""
+import argparse
+import logging
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlencode, urlparse
+from urllib.request import urlopen
+
+import pandas as pd
+import pyarrow as pa
+
+import config
+from analytics.sampling import load_ticks, resample_ticks, TIMEFRAME_SECONDS
+from analytics.regression import compute_hedge_ratio
+from analytics.kalman import kalman_hedge_ratio
+from analytics.stats import compute_spread, compute_zscore
+
+logger = logging.getLogger(__name__)
+
+ARROW_STREAM_MIME = "application/vnd.apache.arrow.stream"
+
+BARS_SCHEMA = pa.schema([
+    ("ts", pa.timestamp("ns")),
+    ("price_open", pa.float64()),
+    ("price_high", pa.float64()),
+    ("price_low", pa.float64()),
+    ("price_close", pa.float64()),
+    ("volume", pa.float64()),
+    ("symbol", pa.string())
+])
+
+
+def _time_range(start, end):
+    end = pd.Timestamp(end) if end else pd.Timestamp.now()
+    start = pd.Timestamp(start) if start else end - pd.Timedelta(minutes=config.DEFAULT_LOOKBACK_MINUTES)
+    return start, end
+
+
+def iter_bar_frames(symbols, timeframe, start, end):
+    """
+    Yield resampled bars for [start, end) one time slice at a time.
+
+    Slices are ARROW_SLICE_MINUTES long and aligned to the bar size, so no
+    bar is split and only one slice of ticks is in memory at once.
+    """
+    start = start.floor(pd.Timedelta(seconds=TIMEFRAME_SECONDS[timeframe]))
+    step = pd.Timedelta(minutes=config.ARROW_SLICE_MINUTES)
+
+    cursor = start
+    while cursor < end:
+        stop = min(cursor + step, end)
+        ticks = load_ticks(symbols, compact=True, start=cursor, end=stop)
+        bars = resample_ticks(ticks, timeframe)
+        if not bars.empty:
+            yield bars
+        cursor = stop
+
+
+def iter_bar_batches(symbols, timeframe, start, end):
+    """
+    Yield bars for [start, end) as Arrow record batches (BARS_SCHEMA).
+    """
+    for bars in iter_bar_frames(symbols, timeframe, start, end):
+        yield pa.RecordBatch.from_pandas(bars, schema=BARS_SCHEMA, preserve_index=False)
+
+
+def spread_frame(symbol_a, symbol_b, timeframe, window, start, end, hedge_method="OLS"):
+    """
+    Spread and z-score for a pair over [start, end).
+
+    Returns:
+        DataFrame with columns ts, <A>, <B>, spread, zscore (and beta for
+        the Kalman hedge), or an empty DataFrame if there is not enough data
+    """
+    symbol_a, symbol_b = symbol_a.upper(), symbol_b.upper()
+    frames = list(iter_bar_frames([symbol_a, symbol_b], timeframe, start, end))
+    if not frames:
+        return pd.DataFrame()
+    bars = pd.concat(frames, ignore_index=True)
+
+    if hedge_method == "Kalman":
+        kalman = kalman_hedge_ratio(
+            bars, symbol_a, symbol_b,
+            delta=config.KALMAN_DELTA, obs_var=config.KALMAN_OBS_VAR
+        )
+        hedge = kalman["beta"] if len(kalman) >= 20 else None
+    else:
+        hedge = compute_hedge_ratio(bars, symbol_a, symbol_b)
+
+    if hedge is None:
+        return pd.DataFrame()
+
+    spread_df = compute_spread(bars, symbol_a, symbol_b, hedge)
+    spread_df["zscore"] = compute_zscore(spread_df["spread"], window)
+    if isinstance(hedge, pd.Series):
+        spread_df["beta"] = hedge.reindex(spread_df.index)
+
+    spread_df.columns.name = None
+    return spread_df.reset_index()
+
+
+class ArrowRequestHandler(BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+
+        try:
+            timeframe = query.get("timeframe", "1m")
+            if timeframe not in TIMEFRAME_SECONDS:
+                raise ValueError(f"Unsupported timeframe: {timeframe}")
+            start, end = _time_range(query.get("start"), query.get("end"))
+
+            if url.path == "/bars":
+                symbols = [s for s in query.get("symbols", "").split(",") if s.strip()]
+                if not symbols:
+                    raise ValueError("symbols is required")
+                self._stream(BARS_SCHEMA, iter_bar_batches(symbols, timeframe, start, end))
+
+            elif url.path == "/spread":
+                df = spread_frame(
+                    query["symbol_a"], query["symbol_b"], timeframe,
+                    int(query.get("window", config.DEFAULT_ROLLING_WINDOW)),
+                    start, end, query.get("hedge", "OLS")
+                )
+                table = pa.Table.from_pandas(df, preserve_index=False)
+                self._stream(table.schema, table.to_batches(max_chunksize=config.ARROW_BATCH_ROWS))
+
+            else:
+                self.send_error(404)
+
+        except (KeyError, ValueError) as e:
+            self.send_error(400, str(e))
+
+    def _stream(self, schema, batches):
+        self.send_response(200)
+        self.send_header("Content-Type", ARROW_STREAM_MIME)
+        self.end_headers()
+
+        # HTTP/1.0: the stream ends when the connection closes
+        with pa.ipc.new_stream(self.wfile, schema) as writer:
+            for batch in batches:
+                writer.write_batch(batch)
+
+    def log_message(self, fmt, *args):
+        logger.info(fmt % args)
+
+
+def make_arrow_server(host=None, port=None):
+    return ThreadingHTTPServer(
+        (host or config.ARROW_SERVICE_HOST, port or config.ARROW_SERVICE_PORT),
+        ArrowRequestHandler
+    )
+
+
+def _service_url(path, params, base_url=None):
+    base_url = base_url or f"http://{config.ARROW_SERVICE_HOST}:{config.ARROW_SERVICE_PORT}"
+    params = {k: v for k, v in params.items() if v is not None}
+    return f"{base_url}{path}?{urlencode(params)}"
+
+
+def read_arrow_stream(url):
+    """
+    Read an Arrow IPC stream from the service into a pyarrow Table.
+
+    Use table.column(name).to_numpy() for zero-copy NumPy access to
+    null-free numeric columns, or table.to_pandas() for a DataFrame.
+    """
+    with urlopen(url) as response:
+        return pa.ipc.open_stream(response).read_all()
+
+
+def fetch_bars(symbols, timeframe="1m", start=None, end=None, base_url=None, as_pandas=True):
+    """
+    Client: pull resampled bars from a running service.
+    """
+    table = read_arrow_stream(_service_url("/bars", {
+        "symbols": ",".join(symbols),
+        "timeframe": timeframe,
+        "start": None if start is None else pd.Timestamp(start).isoformat(),
+        "end": None if end is None else pd.Timestamp(end).isoformat()
+    }, base_url))
+    return table.to_pandas() if as_pandas else table
+
+
+def fetch_spread(symbol_a, symbol_b, timeframe="1m", window=None, hedge="OLS",
+                 start=None, end=None, base_url=None, as_pandas=True):
+    """
+    Client: pull spread/z-score analytics from a running service.
+    """
+    table = read_arrow_stream(_service_url("/spread", {
+        "symbol_a": symbol_a,
+        "symbol_b": symbol_b,
+        "timeframe": timeframe,
+        "window": window or config.DEFAULT_ROLLING_WINDOW,
+        "hedge": hedge,
+        "start": None if start is None else pd.Timestamp(start).isoformat(),
+        "end": None if end is None else pd.Timestamp(end).isoformat()
+    }, base_url))
+    return table.to_pandas() if as_pandas else table
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Arrow IPC streaming service for bars and analytics")
+    parser.add_argument("--host", default=config.ARROW_SERVICE_HOST)
+    parser.add_argument("--port", type=int, default=config.ARROW_SERVICE_PORT)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=config.LOG_LEVEL, format=config.LOG_FORMAT)
+
+    server = make_arrow_server(args.host, args.port)
+    logger.info(f"Arrow service listening on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,19 @@
 """
 Data ingestion module for real-time market data collection.
 """
-from .binance_ws import start_stream, stream_symbol
+from .binance_ws import start_stream, stream_symbol, parse_trade_message, STREAM_MODES
+from .backfill import backfill_gaps, backfill_range
+from .events import BarClosed, EventBus
+from .bar_builder import BarBuilder
 
-__all__ = ['start_stream', 'stream_symbol']
+__all__ = [
+    'start_stream',
+    'stream_symbol',
+    'parse_trade_message',
+    'STREAM_MODES',
+    'backfill_gaps',
+    'backfill_range',
+    'BarClosed',
+    'EventBus',
+    'BarBuilder'
+]
@@ -0,0 +1,203 @@
+import asyncio
+import json
+import logging
+import time
+from datetime import datetime
+from urllib.parse import urlencode
+from urllib.request import Request, urlopen
+
+import config
+from storage.db import find_trade_id_gaps, insert_tick_batch
+
+logger = logging.getLogger(__name__)
+
+HISTORICAL_TRADES_PATH = "/fapi/v1/historicalTrades"
+
+
+class RateLimiter:
+    """
+    Async token bucket shared by all concurrent backfill requests.
+    """
+
+    def __init__(self, rate_per_second, burst=1):
+        self.rate = rate_per_second
+        self.capacity = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        """
+        Wait until a request may be sent.
+        """
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(
+                    self.capacity, self.tokens + (now - self.updated) * self.rate
+                )
+                self.updated = now
+
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+def fetch_trades_page(symbol, from_id, limit, base_url=None, api_key=None, timeout=10):
+    """
+    Fetch one page of historical trades starting at `from_id` (blocking).
+
+    Args:
+        symbol: Trading pair symbol (e.g. 'BTCUSDT')
+        from_id: First trade id to return
+        limit: Page size (Binance max 1000)
+        base_url: REST base URL (default config.BINANCE_FUTURES_REST)
+        api_key: Binance API key (default config.BINANCE_API_KEY)
+
+    Returns:
+        List of trade dicts as returned by /fapi/v1/historicalTrades
+    """
+    base_url = base_url or config.BINANCE_FUTURES_REST
+    api_key = config.BINANCE_API_KEY if api_key is None else api_key
+
+    query = urlencode({"symbol": symbol.upper(), "fromId": from_id, "limit": limit})
+    request = Request(f"{base_url}{HISTORICAL_TRADES_PATH}?{query}")
+    if api_key:
+        request.add_header("X-MBX-APIKEY", api_key)
+
+    with urlopen(request, timeout=timeout) as response:
+        return json.loads(response.read())
+
+
+def trade_to_tick(symbol, trade):
+    """
+    Normalize a REST historical trade into a tick row.
+
+    isBuyerMaker (True = the taker sold) is kept so bars rebuilt from
+    backfilled trades split volume by aggressor like live ones.
+    """
+    is_buyer_maker = trade.get("isBuyerMaker")
+    return {
+        "ts": datetime.fromtimestamp(trade["time"] / 1000).isoformat(),
+        "symbol": symbol.upper(),
+        "price": float(trade["price"]),
+        "size": float(trade["qty"]),
+        "first_trade_id": int(trade["id"]),
+        "last_trade_id": int(trade["id"]),
+        "is_buyer_maker": None if is_buyer_maker is None else bool(is_buyer_maker)
+    }
+
+
+async def _fetch_chunk(symbol, start_id, end_id, limiter, semaphore, page_size, base_url,
+                       on_stored):
+    """
+    Fetch and store trades [start_id, end_id], paging until the range is covered.
+    """
+    from_id = start_id
+    stored = 0
+
+    while from_id <= end_id:
+        async with semaphore:
+            await limiter.acquire()
+            page = await asyncio.to_thread(
+                fetch_trades_page, symbol, from_id,
+                min(page_size, end_id - from_id + 1), base_url
+            )
+
+        ticks = [trade_to_tick(symbol, t) for t in page if t["id"] <= end_id]
+        if not ticks:
+            break
+
+        await asyncio.to_thread(insert_tick_batch, ticks)
+        if on_stored is not None:
+            on_stored(ticks)
+        stored += len(ticks)
+        from_id = ticks[-1]["last_trade_id"] + 1
+
+    return stored
+
+
+async def backfill_range(symbol, start_id, end_id, base_url=None,
+                         page_size=None, max_concurrency=None, rate_per_second=None,
+                         limiter=None, on_stored=None):
+    """
+    Fill the trade id range [start_id, end_id] for one symbol.
+
+    The range is split into page-sized chunks fetched concurrently under a
+    shared rate limit. Inserts are idempotent, so overlapping or repeated
+    backfills are safe.
+
+    Args:
+        on_stored: Optional callback(ticks), run on the event loop after
+            each page is stored (e.g. `BarBuilder.on_backfill`)
+
+    Returns:
+        Number of trades fetched and stored
+    """
+    page_size = page_size or config.BACKFILL_PAGE_SIZE
+    max_concurrency = max_concurrency or config.BACKFILL_MAX_CONCURRENCY
+    limiter = limiter or RateLimiter(rate_per_second or config.BACKFILL_REQUESTS_PER_SECOND)
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    if end_id - start_id + 1 > config.BACKFILL_MAX_GAP:
+        logger.warning(
+            f"Skipping backfill of {symbol} trades {start_id}-{end_id}: "
+            f"gap exceeds {config.BACKFILL_MAX_GAP} trades"
+        )
+        return 0
+
+    chunks = [
+        (lo, min(lo + page_size - 1, end_id))
+        for lo in range(start_id, end_id + 1, page_size)
+    ]
+
+    results = await asyncio.gather(
+        *[
+            _fetch_chunk(symbol, lo, hi, limiter, semaphore, page_size, base_url, on_stored)
+            for lo, hi in chunks
+        ],
+        return_exceptions=True
+    )
+
+    stored = 0
+    for (lo, hi), result in zip(chunks, results):
+        if isinstance(result, Exception):
+            logger.error(f"Backfill failed for {symbol} trades {lo}-{hi}: {result}")
+        else:
+            stored += result
+
+    logger.info(f"Backfilled {stored} trades for {symbol} ({start_id}-{end_id})")
+    return stored
+
+
+async def backfill_gaps(symbols, since_id=None, base_url=None, start=None, end=None, **kwargs):
+    """
+    Detect trade id gaps for each symbol and backfill them concurrently.
+
+    Args:
+        symbols: List of trading pair symbols
+        since_id: Only consider gaps at or after this trade id
+        start: Only consider ticks from this naive local datetime on
+            (limits the partitions scanned, see `find_trade_id_gaps`)
+        end: Only consider ticks before this datetime
+        base_url: REST base URL (e.g. a local stand-in server in tests)
+        **kwargs: Passed to `backfill_range`
+
+    Returns:
+        Dict of symbol -> number of trades stored
+    """
+    # One rate limit across every symbol and gap
+    rate = kwargs.pop("rate_per_second", None) or config.BACKFILL_REQUESTS_PER_SECOND
+    kwargs.setdefault("limiter", RateLimiter(rate))
+
+    async def fill_symbol(symbol):
+        gaps = await asyncio.to_thread(find_trade_id_gaps, symbol, since_id, start, end)
+        total = 0
+        for start_id, end_id in gaps:
+            total += await backfill_range(symbol, start_id, end_id, base_url=base_url, **kwargs)
+        return total
+
+    totals = await asyncio.gather(*[fill_symbol(s.upper()) for s in symbols])
+    return dict(zip([s.upper() for s in symbols], totals))
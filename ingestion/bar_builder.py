@@ -0,0 +1,255 @@
+"""
+Incremental OHLCV and order-flow bar building on the ingestion path.
+
+Ticks are folded into the open bar of each (symbol, timeframe) as they
+arrive, accumulating VWAP, trade count and taker buy/sell volume on the way
+so no raw tick has to be rescanned later. A bar closes when a tick for a
+later bucket arrives or, for quiet symbols, once its end time plus a grace
+period has passed; it is then published on the event bus as a `BarClosed`.
+
+Trades backfilled over REST arrive after later live ticks: those landing in
+a still-open bar are merged into it (`on_backfill`), and bars that already
+closed are rebuilt from storage and republished as revised (`rebuild`).
+"""
+import asyncio
+import logging
+from datetime import datetime, timedelta
+
+import config
+from analytics.sampling import TIMEFRAME_SECONDS
+from .events import BarClosed
+
+logger = logging.getLogger(__name__)
+
+EPOCH = datetime(1970, 1, 1)
+
+
+def _trade_count(tick):
+    """
+    Exchange trades behind a tick (an aggTrade covers a range of ids).
+    """
+    first_id, last_id = tick.get("first_trade_id"), tick.get("last_trade_id")
+    if first_id is None or last_id is None:
+        return 1
+    return last_id - first_id + 1
+
+
+class _OpenBar:
+    __slots__ = (
+        "bucket", "open", "open_id", "high", "low", "close", "volume",
+        "notional", "trade_count", "buy_volume"
+    )
+
+    def __init__(self, bucket, price, size, trades, taker_buy, trade_id=None):
+        self.bucket = bucket
+        self.open_id = trade_id
+        self.open = self.high = self.low = self.close = price
+        self.volume = size
+        self.notional = price * size
+        self.trade_count = trades
+        self.buy_volume = size if taker_buy else 0.0
+
+    def add(self, price, size, trades, taker_buy):
+        if price > self.high:
+            self.high = price
+        elif price < self.low:
+            self.low = price
+        self.close = price
+        self.volume += size
+        self.notional += price * size
+        self.trade_count += trades
+        if taker_buy:
+            self.buy_volume += size
+
+    def merge(self, price, size, trades, taker_buy, trade_id):
+        """
+        Fold in an earlier trade (backfilled): it can move the open, never
+        the close.
+        """
+        self.high = max(self.high, price)
+        self.low = min(self.low, price)
+        if trade_id is not None and (self.open_id is None or trade_id < self.open_id):
+            self.open = price
+            self.open_id = trade_id
+        self.volume += size
+        self.notional += price * size
+        self.trade_count += trades
+        if taker_buy:
+            self.buy_volume += size
+
+
+class _Collector:
+    """
+    Stand-in bus that keeps published bars (see `BarBuilder.rebuild`).
+    """
+
+    def __init__(self):
+        self.bars = []
+
+    def publish(self, event):
+        self.bars.append(event)
+
+
+class BarBuilder:
+    """
+    Builds bars for every symbol and timeframe from the live tick stream.
+
+    Bar buckets match `resample_ticks` / `resample_ticks_sql`: epoch-aligned
+    on the stored naive local timestamps. Not thread-safe; call from the
+    ingestion event loop.
+
+    Args:
+        bus: EventBus to publish BarClosed events on
+        timeframes: Timeframes to build (default config.BAR_TIMEFRAMES)
+        grace_seconds: How long after a bar's end to wait for late ticks
+    """
+
+    def __init__(self, bus, timeframes=None, grace_seconds=None):
+        self.bus = bus
+        self.timeframes = {
+            tf: TIMEFRAME_SECONDS[tf] for tf in (timeframes or config.BAR_TIMEFRAMES)
+        }
+        self.grace_seconds = (
+            config.BAR_CLOSE_GRACE_SECONDS if grace_seconds is None else grace_seconds
+        )
+        self._open = {}
+        self._last_closed = {}
+        self.late_ticks = 0
+
+    def on_tick(self, tick):
+        """
+        Fold one parsed tick (see `parse_trade_message`) into the open bars.
+        """
+        seconds = (datetime.fromisoformat(tick["ts"]) - EPOCH).total_seconds()
+        symbol, price, size = tick["symbol"], tick["price"], tick["size"]
+        trades = _trade_count(tick)
+        # Buyer is maker => the aggressor sold
+        taker_buy = not tick.get("is_buyer_maker", False)
+
+        for timeframe, step in self.timeframes.items():
+            key = (symbol, timeframe)
+            bucket = int(seconds // step * step)
+            bar = self._open.get(key)
+
+            if bar is not None and bucket == bar.bucket:
+                bar.add(price, size, trades, taker_buy)
+                continue
+
+            if (bar is not None and bucket < bar.bucket) or bucket <= self._last_closed.get(key, -1):
+                # The bar this tick belongs to was already published
+                self.late_ticks += 1
+                continue
+
+            if bar is not None:
+                self._close(key, bar)
+            self._open[key] = _OpenBar(
+                bucket, price, size, trades, taker_buy, tick.get("first_trade_id")
+            )
+
+    def on_backfill(self, ticks):
+        """
+        Fold backfilled ticks, which precede the live stream, into the bars.
+
+        Ticks of a bar that is still open are merged into it. Any other
+        bar they fall in has already been published (or was never built,
+        e.g. during downtime) and must be rebuilt from storage.
+
+        Returns:
+            Dict of (symbol, timeframe) -> set of bar starts (epoch seconds)
+            to pass to `rebuild`
+        """
+        stale = {}
+
+        for tick in ticks:
+            seconds = (datetime.fromisoformat(tick["ts"]) - EPOCH).total_seconds()
+            taker_buy = not tick.get("is_buyer_maker", False)
+
+            for timeframe, step in self.timeframes.items():
+                key = (tick["symbol"], timeframe)
+                bucket = int(seconds // step * step)
+                bar = self._open.get(key)
+
+                if bar is not None and bucket == bar.bucket:
+                    bar.merge(
+                        tick["price"], tick["size"], _trade_count(tick), taker_buy,
+                        tick.get("first_trade_id")
+                    )
+                else:
+                    stale.setdefault(key, set()).add(bucket)
+
+        return stale
+
+    def rebuild(self, stale, ticks):
+        """
+        Republish bars from the complete stored ticks, flagged as revised.
+
+        Args:
+            stale: Bars to rebuild, as returned by `on_backfill`
+            ticks: Stored ticks covering those bars, in trade id order
+                (see `storage.db.load_symbol_ticks`)
+
+        Returns:
+            Number of bars republished
+        """
+        collector = _Collector()
+        scratch = BarBuilder(collector, timeframes={tf for _, tf in stale}, grace_seconds=0)
+        symbols = {symbol for symbol, _ in stale}
+
+        for tick in ticks:
+            if tick["symbol"] in symbols:
+                scratch.on_tick(tick)
+        scratch.close_due(datetime.max)
+
+        published = 0
+        for bar in collector.bars:
+            bucket = int((bar.ts - EPOCH).total_seconds())
+            if bucket in stale.get((bar.symbol, bar.timeframe), ()):
+                self.bus.publish(bar._replace(revised=True))
+                published += 1
+
+        return published
+
+    def close_due(self, now=None):
+        """
+        Close bars whose end (plus grace) has passed, for symbols that have
+        gone quiet. `now` is naive local time like the stored ticks.
+        """
+        now = now or datetime.now()
+        seconds = (now - EPOCH).total_seconds() - self.grace_seconds
+
+        for key, bar in list(self._open.items()):
+            if bar.bucket + self.timeframes[key[1]] <= seconds:
+                del self._open[key]
+                self._close(key, bar)
+
+    def _close(self, key, bar):
+        symbol, timeframe = key
+        self._last_closed[key] = bar.bucket
+        sell_volume = bar.volume - bar.buy_volume
+
+        self.bus.publish(BarClosed(
+            symbol=symbol,
+            timeframe=timeframe,
+            ts=EPOCH + timedelta(seconds=bar.bucket),
+            open=bar.open,
+            high=bar.high,
+            low=bar.low,
+            close=bar.close,
+            volume=bar.volume,
+            vwap=bar.notional / bar.volume if bar.volume else bar.close,
+            trade_count=bar.trade_count,
+            buy_volume=bar.buy_volume,
+            sell_volume=sell_volume,
+            imbalance=(bar.buy_volume - sell_volume) / bar.volume if bar.volume else 0.0
+        ))
+
+    async def run(self, stop_event, interval=0.25):
+        """
+        Periodically close due bars until stop_event is set.
+        """
+        while not stop_event.is_set():
+            try:
+                self.close_due()
+            except Exception as e:
+                logger.error(f"Bar builder error: {e}")
+            await asyncio.sleep(interval)
@@ -1,86 +1,354 @@
 import asyncio
 import json
-from datetime import datetime
+from datetime import datetime, timedelta
 import websockets
-from storage.db import insert_tick
+from storage.db import insert_tick_batch, get_last_trade_id, load_symbol_ticks
+from .backfill import RateLimiter, backfill_range
+from .bar_builder import EPOCH
+import config
 import logging
 
-BINANCE_FUTURES_WS = "wss://fstream.binance.com/ws"
+# Supported stream modes: one message per fill, or per aggregated taker order
+STREAM_MODES = ("trade", "aggTrade")
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
-async def stream_symbol(symbol: str, stop_event):
+def parse_trade_message(data):
+    """
+    Normalize a Binance `trade` or `aggTrade` message into a tick.
+
+    An aggTrade carries every fill of one taker order at one price, so its
+    size is the summed quantity and its id range covers the underlying
+    trades. A raw trade is stored as a range of one id.
+
+    Args:
+        data: Decoded JSON message, either a raw stream payload or a
+            combined-stream envelope {"stream": ..., "data": {...}}
+
+    Returns:
+        Dict with keys ts, symbol, price, size, first_trade_id,
+        last_trade_id, is_buyer_maker, or None for other event types.
+        is_buyer_maker (Binance `m`) means the taker sold.
+    """
+    if "stream" in data and "data" in data:
+        data = data["data"]
+
+    event = data.get("e")
+
+    if event == "trade":
+        first_id = last_id = int(data["t"])
+    elif event == "aggTrade":
+        first_id, last_id = int(data["f"]), int(data["l"])
+    else:
+        return None
+
+    # Extract timestamp (T = trade time, E = event time)
+    ts = datetime.fromtimestamp(
+        (data.get("T") or data.get("E")) / 1000
+    ).isoformat()
+
+    return {
+        "ts": ts,
+        "symbol": data.get("s"),
+        "price": float(data.get("p")),
+        "size": float(data.get("q")),
+        "first_trade_id": first_id,
+        "last_trade_id": last_id,
+        "is_buyer_maker": bool(data.get("m"))
+    }
+
+
+async def _unless_stopped(awaitable, stop_event, poll=0.25):
+    """
+    Await `awaitable`, but cancel it as soon as stop_event is set.
+
+    Returns:
+        The awaitable's result, or None if stopped first
+    """
+    task = asyncio.ensure_future(awaitable)
+
+    while not task.done():
+        if stop_event.is_set():
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+            return None
+        await asyncio.wait({task}, timeout=poll)
+
+    return task.result()
+
+
+class TickWriter:
+    """
+    Buffers live ticks and stores them with one `insert_tick_batch` per
+    batch, on a worker thread so the event loop keeps receiving meanwhile.
+
+    A batch is written once `batch_size` ticks are buffered or, by `run`,
+    every `flush_seconds`. Ticks that arrive during a write form the next
+    batch, so batches grow with the load instead of falling behind.
+
+    Args:
+        symbol: Symbol, for logs
+        batch_size: Buffered ticks that trigger a write (default
+            config.TICK_BATCH_SIZE)
+        flush_seconds: Max time a tick stays buffered (default
+            config.TICK_FLUSH_SECONDS)
+    """
+
+    def __init__(self, symbol, batch_size=None, flush_seconds=None):
+        self.symbol = symbol
+        self.batch_size = batch_size or config.TICK_BATCH_SIZE
+        self.flush_seconds = flush_seconds or config.TICK_FLUSH_SECONDS
+        self._buffer = []
+        self._lock = asyncio.Lock()
+        self._pending = None
+        self.stored = 0
+
+    def add(self, tick):
+        """
+        Buffer a tick; starts a write in the background when the batch is full.
+        """
+        self._buffer.append(tick)
+        if len(self._buffer) >= self.batch_size and (self._pending is None or self._pending.done()):
+            self._pending = asyncio.create_task(self.flush())
+
+    async def flush(self):
+        """
+        Store every tick buffered so far, after any write in progress.
+        """
+        async with self._lock:
+            batch, self._buffer = self._buffer, []
+            if not batch:
+                return
+            try:
+                await asyncio.to_thread(insert_tick_batch, batch)
+                self.stored += len(batch)
+            except Exception as e:
+                logger.error(f"Failed to store {len(batch)} ticks for {self.symbol}: {e}")
+
+    async def run(self, stop_event):
+        """
+        Flush periodically until stop_event is set (the caller flushes the rest).
+        """
+        while not stop_event.is_set():
+            await asyncio.sleep(self.flush_seconds)
+            await self.flush()
+
+
+def _notify_caught_up(callback, symbol, writer, backfill):
+    """
+    Call callback(symbol) once the ticks buffered so far are stored and
+    `backfill` (a Task or None) is done.
+
+    Returns:
+        The waiting Task, or None without a callback
+    """
+    if callback is None:
+        return None
+
+    async def wait():
+        await writer.flush()
+        if backfill is not None:
+            await asyncio.gather(backfill, return_exceptions=True)
+        callback(symbol)
+
+    return asyncio.create_task(wait())
+
+
+async def _backfill_gap(symbol, start_id, end_id, limiter, bar_builder=None, writer=None):
+    """
+    Backfill a trade id gap and bring the bars it touches up to date.
+
+    Backfilled trades still in an open bar are merged into it; bars that
+    had already closed are rebuilt from the stored ticks once the gap is
+    filled (and `writer`'s buffered live ticks are stored) and republished
+    as revised.
+
+    Returns:
+        Number of trades stored
+    """
+    stale = {}
+
+    def fold(ticks):
+        for key, buckets in bar_builder.on_backfill(ticks).items():
+            stale.setdefault(key, set()).update(buckets)
+
+    stored = await backfill_range(
+        symbol, start_id, end_id, limiter=limiter,
+        on_stored=fold if bar_builder is not None else None
+    )
+
+    if stale:
+        if writer is not None:
+            await writer.flush()
+        buckets = [bucket for values in stale.values() for bucket in values]
+        step = max(bar_builder.timeframes[timeframe] for _, timeframe in stale)
+        start = EPOCH + timedelta(seconds=min(buckets))
+        end = EPOCH + timedelta(seconds=max(buckets) + step)
+        ticks = await asyncio.to_thread(load_symbol_ticks, symbol, start, end)
+        revised = bar_builder.rebuild(stale, ticks)
+        logger.info(f"Rebuilt {revised} bars for {symbol} after backfill")
+
+    return stored
+
+
+async def stream_symbol(symbol: str, stop_event, mode: str = "trade", bar_builder=None,
+                        limiter=None, on_caught_up=None):
     """
     Stream trade data for a single symbol from Binance Futures WebSocket.
 
+    Dropped connections are re-established until stop_event is set. Any
+    trade ids skipped between two received ticks, or between the last
+    stored trade and the first live one (e.g. while the daemon was down),
+    are backfilled over REST in the background. Live ticks are stored in
+    batches (see `TickWriter`). Connecting, the reconnect pause and pending
+    backfills are all abandoned once stop_event is set, so the stream stops
+    within about WS_TIMEOUT_SECONDS.
+
     Args:
         symbol: Trading pair symbol (lowercase, e.g., 'btcusdt')
         stop_event: Threading event to signal shutdown
+        mode: 'trade' for every fill or 'aggTrade' for aggregated trades
+        bar_builder: Optional BarBuilder fed with every live tick and
+            backfilled trade (see `_backfill_gap`)
+        limiter: RateLimiter shared by this session's backfills (default:
+            one for this stream only)
+        on_caught_up: Optional callback(symbol), called once the first live
+            tick is stored and the backfill of any gap before it has finished
     """
-    url = f"{BINANCE_FUTURES_WS}/{symbol}@trade"
+    if mode not in STREAM_MODES:
+        raise ValueError(f"Unsupported stream mode: {mode}")
+
+    # Read at call time so tests and load runs can point at another server
+    url = f"{config.BINANCE_FUTURES_WS}/{symbol}@{mode}"
+
+    limiter = limiter or RateLimiter(config.BACKFILL_REQUESTS_PER_SECOND)
+
+    # Highest trade id stored for this symbol, used to spot reconnect gaps
+    last_trade_id = await asyncio.to_thread(get_last_trade_id, symbol)
+    backfills = set()
+    caught_up = False
+
+    writer = TickWriter(symbol)
+    flusher = asyncio.create_task(writer.run(stop_event))
 
     try:
-        async with websockets.connect(url) as ws:
-            logger.info(f"WebSocket connected: {symbol}")
-
-            while not stop_event.is_set():
-                try:
-                    # Set timeout to check stop_event periodically
-                    message = await asyncio.wait_for(ws.recv(), timeout=1.0)
-
-                    try:
-                        data = json.loads(message)
-
-                        if data.get("e") == "trade":
-                            # Extract timestamp (T = trade time, E = event time)
-                            ts = datetime.fromtimestamp(
-                                (data.get("T") or data.get("E")) / 1000
-                            ).isoformat()
-
-                            symbol_name = data.get("s")
-                            price = float(data.get("p"))
-                            size = float(data.get("q"))
-
-                            # Insert into database
-                            insert_tick(ts, symbol_name, price, size)
-
-                    except json.JSONDecodeError as e:
-                        logger.warning(f"JSON decode error for {symbol}: {e}")
-                    except (KeyError, ValueError, TypeError) as e:
-                        logger.warning(f"Data parsing error for {symbol}: {e}")
-                    except Exception as e:
-                        logger.error(f"Unexpected error processing {symbol}: {e}")
-
-                except asyncio.TimeoutError:
-                    # Normal timeout, check stop_event and continue
-                    continue
-                except websockets.exceptions.ConnectionClosed:
-                    logger.warning(f"WebSocket connection closed for {symbol}")
+        while not stop_event.is_set():
+            try:
+                ws = await _unless_stopped(websockets.connect(url), stop_event)
+                if ws is None:
                     break
 
-    except Exception as e:
-        logger.error(f"WebSocket error for {symbol}: {e}")
+                async with ws:
+                    logger.info(f"WebSocket connected: {symbol} ({mode})")
+
+                    while not stop_event.is_set():
+                        try:
+                            # Set timeout to check stop_event periodically
+                            message = await asyncio.wait_for(ws.recv(), timeout=1.0)
+
+                            try:
+                                data = json.loads(message)
+                                tick = parse_trade_message(data)
+
+                                if tick is not None:
+                                    task = None
+                                    if (config.BACKFILL_ON_GAP
+                                            and last_trade_id is not None
+                                            and tick["first_trade_id"] > last_trade_id + 1):
+                                        # Trades were missed (e.g. while reconnecting)
+                                        task = asyncio.create_task(_backfill_gap(
+                                            tick["symbol"],
+                                            last_trade_id + 1,
+                                            tick["first_trade_id"] - 1,
+                                            limiter,
+                                            bar_builder,
+                                            writer
+                                        ))
+                                        backfills.add(task)
+                                        task.add_done_callback(backfills.discard)
+
+                                    writer.add(tick)
+                                    if bar_builder is not None:
+                                        bar_builder.on_tick(tick)
+                                    last_trade_id = max(
+                                        last_trade_id or 0, tick["last_trade_id"]
+                                    )
+
+                                    if not caught_up:
+                                        caught_up = True
+                                        waiter = _notify_caught_up(on_caught_up, symbol, writer, task)
+                                        if waiter is not None:
+                                            backfills.add(waiter)
+                                            waiter.add_done_callback(backfills.discard)
+
+                            except json.JSONDecodeError as e:
+                                logger.warning(f"JSON decode error for {symbol}: {e}")
+                            except (KeyError, ValueError, TypeError) as e:
+                                logger.warning(f"Data parsing error for {symbol}: {e}")
+                            except Exception as e:
+                                logger.error(f"Unexpected error processing {symbol}: {e}")
+
+                        except asyncio.TimeoutError:
+                            # Normal timeout, check stop_event and continue
+                            continue
+
+            except websockets.exceptions.ConnectionClosed:
+                logger.warning(f"WebSocket connection closed for {symbol}, reconnecting")
+            except Exception as e:
+                logger.error(f"WebSocket error for {symbol}: {e}")
+
+            await _unless_stopped(asyncio.sleep(config.WS_RECONNECT_DELAY_SECONDS), stop_event)
+
     finally:
+        # Do not let a long backfill hold up shutdown; inserts are
+        # idempotent and `backfill_gaps` can fill what it left
+        for task in backfills:
+            task.cancel()
+        if backfills:
+            await asyncio.gather(*backfills, return_exceptions=True)
+
+        flusher.cancel()
+        await asyncio.gather(flusher, return_exceptions=True)
+        await writer.flush()
         logger.info(f"WebSocket stream ended for {symbol}")
 
 
-async def start_stream(symbols, stop_event=None):
+async def start_stream(symbols, stop_event=None, modes=None, bar_builder=None,
+                       on_caught_up=None):
     """
     Start WebSocket streams for multiple symbols.
 
     Args:
         symbols: List of trading pair symbols (lowercase)
         stop_event: Optional threading event to signal shutdown
+        modes: Optional dict of symbol -> stream mode ('trade' or
+            'aggTrade'); symbols not listed use 'trade'
+        bar_builder: Optional BarBuilder; live ticks are folded into bars
+            and BarClosed events published as bars close
+        on_caught_up: Optional callback(symbol), see `stream_symbol`
     """
     if stop_event is None:
         # Create a dummy event that's never set for backward compatibility
         import threading
         stop_event = threading.Event()
 
-    tasks = [stream_symbol(sym.lower(), stop_event) for sym in symbols]
+    modes = {sym.lower(): mode for sym, mode in (modes or {}).items()}
+
+    # One REST budget for every symbol's backfills (see BACKFILL_REQUESTS_PER_SECOND)
+    limiter = RateLimiter(config.BACKFILL_REQUESTS_PER_SECOND)
+
+    tasks = [
+        stream_symbol(
+            sym.lower(), stop_event, modes.get(sym.lower(), "trade"), bar_builder, limiter,
+            on_caught_up
+        )
+        for sym in symbols
+    ]
+    if bar_builder is not None:
+        tasks.append(bar_builder.run(stop_event))
 
     try:
         await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,66 @@
+import json
+from urllib.error import URLError
+from urllib.request import Request, urlopen
+
+import config
+
+
+def _control_url(path):
+    return f"http://{config.INGESTION_CONTROL_HOST}:{config.INGESTION_CONTROL_PORT}{path}"
+
+
+def _call(path, payload=None, timeout=2.0):
+    """
+    Call the ingestion daemon's control API.
+
+    Returns:
+        Decoded JSON response, or None if the daemon is not reachable
+    """
+    data = None if payload is None else json.dumps(payload).encode()
+    request = Request(
+        _control_url(path),
+        data=data,
+        headers={"Content-Type": "application/json"},
+        method="GET" if payload is None else "POST"
+    )
+
+    try:
+        with urlopen(request, timeout=timeout) as response:
+            return json.loads(response.read())
+    except (URLError, ConnectionError, TimeoutError):
+        return None
+
+
+def get_status():
+    """
+    Daemon status dict (running, symbols, modes, started_at, pid), or None.
+    """
+    return _call("/status")
+
+
+def get_latest_bars():
+    """
+    Latest closed bar per symbol and timeframe from the daemon's bar
+    builder ({symbol: {timeframe: bar dict}}), or None.
+    """
+    return _call("/bars/latest")
+
+
+def get_live_state():
+    """
+    Live pair analytics held by the daemon (per-pair hedge, spread and
+    z-score, correlation matrix), or None.
+    """
+    return _call("/analytics/state")
+
+
+def start_ingestion(symbols, modes=None):
+    return _call("/start", {"symbols": list(symbols), "modes": modes or {}})
+
+
+def stop_ingestion():
+    return _call("/stop", {})
+
+
+def set_symbols(symbols, modes=None):
+    return _call("/symbols", {"symbols": list(symbols), "modes": modes or {}})
@@ -0,0 +1,525 @@
+"""
+Headless ingestion daemon: the single writer of tick data.
+
+Runs `start_stream` as one long-lived service, guarded by a pidfile lock so
+only one instance can write to the database, and exposes a small JSON
+control API on localhost for the dashboard.
+
+Usage:
+    python -m ingestion.daemon --symbols btcusdt,ethusdt [--agg-trade btcusdt]
+        [--retention-days 7]
+
+Live ticks are also folded into bars (BAR_TIMEFRAMES) with order-flow
+features, published as `BarClosed` events on the service's in-process bus
+and stored in the `bars` table. They also drive the live pair analytics
+state (`analytics.live_state`), checkpointed every
+LIVE_STATE_CHECKPOINT_SECONDS and on stop. On start it is rebuilt in the
+background from the snapshot, replaying only the ticks after it once the
+streams have backfilled the trades missed while stopped.
+
+Control API (127.0.0.1:INGESTION_CONTROL_PORT):
+    GET  /status
+    GET  /bars/latest
+    GET  /analytics/state
+    POST /start    {"symbols": [...], "modes": {"btcusdt": "aggTrade"}}
+    POST /stop
+    POST /symbols  {"symbols": [...], "modes": {...}}
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import signal
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import config
+from analytics.live_state import restore_live_state
+from storage.db import init_db, apply_retention, insert_bars
+from .binance_ws import start_stream, STREAM_MODES
+from .bar_builder import BarBuilder
+from .events import EventBus
+
+logger = logging.getLogger(__name__)
+
+
+class PidFileLock:
+    """
+    Exclusive, non-blocking lock on a pidfile.
+
+    The OS releases the lock when the process exits, so a stale pidfile
+    left by a crash never blocks the next start.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._fh = None
+
+    def acquire(self):
+        """
+        Take the lock and write our pid.
+
+        Raises:
+            RuntimeError: If another daemon already holds the lock
+        """
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        fh = open(self.path, "a+")
+
+        try:
+            _lock_file(fh)
+        except OSError:
+            fh.seek(0)
+            owner = fh.read().strip() or "unknown"
+            fh.close()
+            raise RuntimeError(f"Ingestion daemon already running (pid {owner})")
+
+        fh.seek(0)
+        fh.truncate()
+        fh.write(str(os.getpid()))
+        fh.flush()
+        self._fh = fh
+
+    def release(self):
+        if self._fh is None:
+            return
+        try:
+            self._fh.seek(0)
+            self._fh.truncate()
+            _unlock_file(self._fh)
+        finally:
+            self._fh.close()
+            self._fh = None
+
+
+try:
+    import fcntl
+
+    def _lock_file(fh):
+        fcntl.flock(fh.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+
+    def _unlock_file(fh):
+        fcntl.flock(fh.fileno(), fcntl.LOCK_UN)
+
+except ImportError:  # Windows
+    import msvcrt
+
+    def _lock_file(fh):
+        fh.seek(0)
+        msvcrt.locking(fh.fileno(), msvcrt.LK_NBLCK, 1)
+
+    def _unlock_file(fh):
+        fh.seek(0)
+        msvcrt.locking(fh.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class IngestionService:
+    """
+    Owns the ingestion thread and its asyncio loop, the event bus its
+    bar builder publishes BarClosed events on, and the live analytics
+    state fed from that bus.
+
+    All methods are thread-safe; the control API calls them from its
+    request threads.
+    """
+
+    def __init__(self, bus=None):
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stop_event = None
+        self.symbols = []
+        self.modes = {}
+        self.started_at = None
+
+        self.live = None
+        self.live_info = None
+        self._live_lock = threading.Lock()
+        # Bumped per warm-up; bars arriving meanwhile wait in _live_backlog
+        self._live_generation = 0
+        self._live_backlog = None
+
+        self.bus = bus or EventBus()
+        self._latest_bars = {}
+        self.bus.subscribe(self._record_bar, name="latest_bars")
+        # If the DB stalls, drop the newest bars rather than punch holes in the backlog
+        self.bus.subscribe(_store_bar, policy="drop_newest", name="bar_store")
+        self.bus.subscribe(self._update_live, policy="drop_newest", name="live_state")
+
+    @property
+    def running(self):
+        return self._alive() and not self._stop_event.is_set()
+
+    @property
+    def stopping(self):
+        """
+        A stop was requested but the ingestion thread has not exited yet.
+        """
+        return self._alive() and self._stop_event.is_set()
+
+    def _alive(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, symbols=None, modes=None):
+        """
+        Start streaming (restarting if the symbol set changed).
+        """
+        with self._lock:
+            if symbols is not None:
+                symbols, modes = _normalize(symbols, modes)
+                if self.running and (symbols, modes) != (self.symbols, self.modes):
+                    self._stop_locked()
+                self.symbols, self.modes = symbols, modes
+
+            if not self.running and self.symbols:
+                self._start_locked()
+
+            return self.status()
+
+    def stop(self):
+        with self._lock:
+            self._stop_locked()
+            return self.status()
+
+    def set_symbols(self, symbols, modes=None):
+        """
+        Change the symbol set; a running stream is restarted with it.
+        """
+        with self._lock:
+            was_running = self.running
+            self._stop_locked()
+            self.symbols, self.modes = _normalize(symbols, modes)
+            if was_running and self.symbols:
+                self._start_locked()
+            return self.status()
+
+    def status(self):
+        return {
+            "running": self.running,
+            "stopping": self.stopping,
+            "symbols": self.symbols,
+            "modes": self.modes,
+            "started_at": self.started_at,
+            "pid": os.getpid(),
+            "events": self.bus.stats(),
+            "live_state": self.live_status()
+        }
+
+    def _record_bar(self, bar):
+        key = (bar.symbol, bar.timeframe)
+        latest = self._latest_bars.get(key)
+        # A revised (backfilled) bar must not replace a newer live one
+        if latest is None or bar.ts >= latest.ts:
+            self._latest_bars[key] = bar
+
+    def latest_bars(self):
+        """
+        Most recent closed bar per symbol and timeframe.
+        """
+        bars = {}
+        for (symbol, timeframe), bar in list(self._latest_bars.items()):
+            bars.setdefault(symbol, {})[timeframe] = {
+                **bar._asdict(), "ts": bar.ts.isoformat()
+            }
+        return bars
+
+    def _update_live(self, bar):
+        with self._live_lock:
+            if self.live is not None:
+                self.live.on_bar(bar)
+            elif self._live_backlog is not None:
+                self._live_backlog.append(bar)
+
+    def _begin_live_warmup(self, symbols):
+        """
+        Checkpoint the current live state and start rebuilding it for
+        `symbols` in the background (see `_warm_live_state`).
+
+        Returns:
+            Dict of lowercase symbol -> Event, to be set by the streams once
+            they have caught up with the trades missed while stopped
+        """
+        caught_up = {s: threading.Event() for s in symbols}
+
+        with self._live_lock:
+            self._checkpoint_locked()
+            self._live_generation += 1
+            self.live, self.live_info = None, None
+            self._live_backlog = []
+
+        threading.Thread(
+            target=self._warm_live_state,
+            args=(list(symbols), caught_up, self._live_generation),
+            name="live-state-warmup",
+            daemon=True
+        ).start()
+
+        return caught_up
+
+    def _warm_live_state(self, symbols, caught_up, generation):
+        """
+        Restore the live analytics state from its snapshot and replay the
+        ticks since, without holding the service locks.
+
+        Waits (up to LIVE_STATE_CATCH_UP_SECONDS) until every stream has
+        stored its first live tick and backfilled the gap before it, so
+        trades from the downtime are part of the replay; bars published in
+        the meantime are applied afterwards.
+        """
+        deadline = time.monotonic() + config.LIVE_STATE_CATCH_UP_SECONDS
+        for symbol, event in caught_up.items():
+            if not event.wait(max(deadline - time.monotonic(), 0)):
+                logger.warning(f"Live state warm-up: {symbol} has not caught up, replaying anyway")
+
+        try:
+            state, info = restore_live_state(symbols)
+        except Exception as e:
+            logger.error(f"Live state restore failed: {e}")
+            return
+
+        with self._live_lock:
+            if generation != self._live_generation:
+                return
+            # Bars already covered by the replay are ignored by the state
+            for bar in self._live_backlog:
+                state.on_bar(bar)
+            self.live, self.live_info = state, info
+            self._live_backlog = None
+
+    def checkpoint(self):
+        """
+        Snapshot the live analytics state to config.LIVE_STATE_PATH.
+
+        Returns:
+            Snapshot path, or None if there was nothing to save
+        """
+        with self._live_lock:
+            return self._checkpoint_locked()
+
+    def _checkpoint_locked(self):
+        if self.live is None or self.live.last_ts is None:
+            return None
+        return self.live.save()
+
+    def live_status(self):
+        with self._live_lock:
+            if self.live is None:
+                return {"ready": False, "warming": self._live_backlog is not None}
+            return {
+                "ready": True,
+                "last_ts": None if self.live.last_ts is None else self.live.last_ts.isoformat(),
+                **(self.live_info or {})
+            }
+
+    def live_state(self):
+        """
+        Per-pair hedge, spread and z-score and the correlation matrix from
+        the live state, or None before it is built.
+        """
+        with self._live_lock:
+            return None if self.live is None else self.live.summary()
+
+    def _start_locked(self):
+        if self._alive():
+            # Never run two writers; the old thread is still winding down
+            logger.warning("Previous ingestion thread still stopping; not starting")
+            return
+        caught_up = self._begin_live_warmup(self.symbols)
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run,
+            args=(list(self.symbols), dict(self.modes), self._stop_event, self.bus, caught_up),
+            name="ingestion",
+            daemon=True
+        )
+        self._thread.start()
+        self.started_at = time.time()
+        logger.info(f"Ingestion started for: {', '.join(self.symbols)}")
+
+    def _stop_locked(self):
+        if not self._alive():
+            return
+        self._stop_event.set()
+        # Streams poll the stop event every WS_TIMEOUT_SECONDS
+        self._thread.join(timeout=config.WS_TIMEOUT_SECONDS * 5)
+        if self._thread.is_alive():
+            # Keep the reference: start() refuses until the thread has exited
+            logger.warning("Ingestion thread did not stop in time; still stopping")
+            return
+        self._thread = None
+        self.started_at = None
+        self.checkpoint()
+        logger.info("Ingestion stopped")
+
+    @staticmethod
+    def _run(symbols, modes, stop_event, bus, caught_up):
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        try:
+            loop.run_until_complete(start_stream(
+                symbols, stop_event, modes, bar_builder=BarBuilder(bus),
+                on_caught_up=lambda symbol: caught_up[symbol].set()
+            ))
+        except Exception as e:
+            logger.error(f"Ingestion error: {e}")
+        finally:
+            loop.close()
+
+
+def _store_bar(bar):
+    insert_bars([bar])
+
+
+def _normalize(symbols, modes):
+    symbols = [s.strip().lower() for s in symbols if s.strip()]
+    modes = {
+        s.lower(): m for s, m in (modes or {}).items()
+        if s.lower() in symbols and m in STREAM_MODES and m != "trade"
+    }
+    return symbols, modes
+
+
+def retention_loop(retention_days, stop_event):
+    """
+    Apply the tick retention policy now and every RETENTION_CHECK_SECONDS
+    until stop_event is set. Expired data goes a whole day partition at a time.
+    """
+    while True:
+        try:
+            apply_retention(retention_days)
+        except Exception as e:
+            logger.error(f"Retention error: {e}")
+
+        if stop_event.wait(config.RETENTION_CHECK_SECONDS):
+            return
+
+
+def checkpoint_loop(service, stop_event):
+    """
+    Snapshot the service's live analytics state every
+    LIVE_STATE_CHECKPOINT_SECONDS until stop_event is set.
+    """
+    while not stop_event.wait(config.LIVE_STATE_CHECKPOINT_SECONDS):
+        try:
+            service.checkpoint()
+        except Exception as e:
+            logger.error(f"Live state checkpoint error: {e}")
+
+
+def make_control_server(service, host=None, port=None):
+    """
+    Build the localhost JSON control server for a service.
+    """
+    class ControlHandler(BaseHTTPRequestHandler):
+
+        def do_GET(self):
+            if self.path == "/status":
+                self._reply(200, service.status())
+            elif self.path == "/bars/latest":
+                self._reply(200, service.latest_bars())
+            elif self.path == "/analytics/state":
+                self._reply(200, service.live_state())
+            else:
+                self._reply(404, {"error": "not found"})
+
+        def do_POST(self):
+            try:
+                length = int(self.headers.get("Content-Length") or 0)
+                body = json.loads(self.rfile.read(length) or b"{}")
+
+                if self.path == "/start":
+                    self._reply(200, service.start(body.get("symbols"), body.get("modes")))
+                elif self.path == "/stop":
+                    self._reply(200, service.stop())
+                elif self.path == "/symbols":
+                    self._reply(200, service.set_symbols(body.get("symbols") or [], body.get("modes")))
+                else:
+                    self._reply(404, {"error": "not found"})
+            except (ValueError, TypeError, AttributeError) as e:
+                self._reply(400, {"error": str(e)})
+
+        def _reply(self, code, payload):
+            data = json.dumps(payload).encode()
+            self.send_response(code)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, fmt, *args):
+            logger.debug(fmt % args)
+
+    return ThreadingHTTPServer(
+        (host or config.INGESTION_CONTROL_HOST, port or config.INGESTION_CONTROL_PORT),
+        ControlHandler
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Headless tick ingestion daemon")
+    parser.add_argument("--symbols", default="", help="Comma-separated symbols to stream on start")
+    parser.add_argument("--agg-trade", default="", help="Comma-separated symbols to stream as aggTrade")
+    parser.add_argument("--host", default=config.INGESTION_CONTROL_HOST)
+    parser.add_argument("--port", type=int, default=config.INGESTION_CONTROL_PORT)
+    parser.add_argument("--pidfile", default=config.INGESTION_PIDFILE)
+    parser.add_argument("--retention-days", type=int, default=config.TICK_RETENTION_DAYS,
+                        help="Drop tick partitions older than this many days")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=config.LOG_LEVEL, format=config.LOG_FORMAT)
+
+    lock = PidFileLock(args.pidfile)
+    try:
+        lock.acquire()
+    except RuntimeError as e:
+        logger.error(str(e))
+        return 1
+
+    init_db()
+
+    service = IngestionService()
+    server = make_control_server(service, args.host, args.port)
+
+    background_stop = threading.Event()
+    threading.Thread(
+        target=checkpoint_loop,
+        args=(service, background_stop),
+        name="checkpoint",
+        daemon=True
+    ).start()
+
+    if args.retention_days:
+        threading.Thread(
+            target=retention_loop,
+            args=(args.retention_days, background_stop),
+            name="retention",
+            daemon=True
+        ).start()
+
+    def shutdown(signum, frame):
+        logger.info(f"Received signal {signum}, shutting down")
+        # shutdown() blocks until serve_forever returns, so call it off-thread
+        threading.Thread(target=server.shutdown, daemon=True).start()
+
+    signal.signal(signal.SIGINT, shutdown)
+    signal.signal(signal.SIGTERM, shutdown)
+
+    symbols = [s for s in args.symbols.split(",") if s.strip()]
+    if symbols:
+        agg = [s.strip().lower() for s in args.agg_trade.split(",") if s.strip()]
+        service.start(symbols, {s: "aggTrade" for s in agg})
+
+    logger.info(f"Control API listening on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    finally:
+        background_stop.set()
+        service.stop()
+        server.server_close()
+        lock.release()
+
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
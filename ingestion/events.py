@@ -0,0 +1,234 @@
+"""
+In-process publish/subscribe bus for ingestion events.
+
+The bar builder publishes a `BarClosed` event as soon as a bar closes;
+consumers subscribe instead of polling SQLite. Every subscriber has its own
+bounded queue, so a slow consumer only loses its own events (per its drop
+policy) and never blocks ingestion or other subscribers.
+"""
+import asyncio
+import logging
+import queue
+import threading
+from datetime import datetime
+from typing import NamedTuple
+
+import config
+
+logger = logging.getLogger(__name__)
+
+# What to do when a subscriber's queue is full
+DROP_POLICIES = ("drop_oldest", "drop_newest")
+
+
+class BarClosed(NamedTuple):
+    """
+    A completed OHLCV bar with order-flow features. `ts` is the bar's start
+    (naive local time, like stored ticks and `resample_ticks` output).
+
+    buy_volume/sell_volume split volume by taker side; imbalance is
+    (buy - sell) / (buy + sell), in [-1, 1]. `revised` marks a bar
+    republished after backfilled trades changed it; it replaces the
+    stored bar but is older than the live ones.
+    """
+    symbol: str
+    timeframe: str
+    ts: datetime
+    open: float
+    high: float
+    low: float
+    close: float
+    volume: float
+    vwap: float
+    trade_count: int
+    buy_volume: float
+    sell_volume: float
+    imbalance: float
+    revised: bool = False
+
+
+class _Subscription:
+
+    def __init__(self, bus, maxsize, policy, name):
+        if policy not in DROP_POLICIES:
+            raise ValueError(f"Unsupported drop policy: {policy}")
+        self.bus = bus
+        self.maxsize = maxsize
+        self.policy = policy
+        self.name = name
+        self.delivered = 0
+        self.dropped = 0
+
+    def _dropped_one(self):
+        self.dropped += 1
+        if self.dropped == 1 or self.dropped % 1000 == 0:
+            logger.warning(f"Slow subscriber {self.name}: {self.dropped} events dropped")
+
+    def close(self):
+        self.bus.unsubscribe(self)
+
+    def stats(self):
+        return {
+            "name": self.name,
+            "policy": self.policy,
+            "maxsize": self.maxsize,
+            "delivered": self.delivered,
+            "dropped": self.dropped
+        }
+
+
+class CallbackSubscription(_Subscription):
+    """
+    Runs a sync callback for each event on its own worker thread.
+    """
+
+    def __init__(self, bus, callback, maxsize, policy, name):
+        super().__init__(bus, maxsize, policy, name)
+        self.callback = callback
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._thread = threading.Thread(target=self._run, name=f"bus-{name}", daemon=True)
+        self._thread.start()
+
+    def offer(self, event):
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            if self.policy == "drop_oldest":
+                try:
+                    self._queue.get_nowait()
+                    self._queue.put_nowait(event)
+                except (queue.Empty, queue.Full):
+                    pass
+            self._dropped_one()
+
+    def _run(self):
+        while True:
+            event = self._queue.get()
+            if event is None:
+                return
+            try:
+                self.callback(event)
+                self.delivered += 1
+            except Exception as e:
+                logger.error(f"Subscriber {self.name} failed: {e}")
+
+    def close(self):
+        super().close()
+        # Sentinel; make room for it if the queue is full
+        while True:
+            try:
+                self._queue.put_nowait(None)
+                break
+            except queue.Full:
+                try:
+                    self._queue.get_nowait()
+                except queue.Empty:
+                    pass
+
+
+class AsyncSubscription(_Subscription):
+    """
+    Delivers events to an asyncio.Queue on the subscriber's event loop.
+
+    Usage:
+        async for event in bus.subscribe_async():
+            ...
+    """
+
+    def __init__(self, bus, maxsize, policy, name, loop):
+        super().__init__(bus, maxsize, policy, name)
+        self._loop = loop
+        self._queue = asyncio.Queue(maxsize=maxsize)
+
+    def offer(self, event):
+        try:
+            self._loop.call_soon_threadsafe(self._put, event)
+        except RuntimeError:
+            # Subscriber's loop is closed
+            self.bus.unsubscribe(self)
+
+    def _put(self, event):
+        try:
+            self._queue.put_nowait(event)
+        except asyncio.QueueFull:
+            if self.policy == "drop_oldest":
+                self._queue.get_nowait()
+                self._queue.put_nowait(event)
+            self._dropped_one()
+
+    async def get(self):
+        event = await self._queue.get()
+        self.delivered += 1
+        return event
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        return await self.get()
+
+
+class EventBus:
+    """
+    Thread-safe fan-out of events to bounded per-subscriber queues.
+
+    `publish` never blocks: it only enqueues, from any thread.
+    """
+
+    def __init__(self):
+        self._subscribers = []
+        self._lock = threading.Lock()
+        self.published = 0
+
+    def subscribe(self, callback, maxsize=None, policy="drop_oldest", name=None):
+        """
+        Register a sync callback, run on a dedicated thread.
+
+        Args:
+            callback: Function taking one event
+            maxsize: Events buffered before the drop policy applies
+                (default config.EVENT_QUEUE_SIZE)
+            policy: 'drop_oldest' (keep the latest bars) or 'drop_newest'
+            name: Label for logs and stats
+
+        Returns:
+            CallbackSubscription (call .close() to unsubscribe)
+        """
+        sub = CallbackSubscription(
+            self, callback, maxsize or config.EVENT_QUEUE_SIZE, policy,
+            name or getattr(callback, "__name__", "callback")
+        )
+        return self._add(sub)
+
+    def subscribe_async(self, maxsize=None, policy="drop_oldest", name="async"):
+        """
+        Register an async subscriber; must be called from its running loop.
+
+        Returns:
+            AsyncSubscription, an async iterator of events
+        """
+        sub = AsyncSubscription(
+            self, maxsize or config.EVENT_QUEUE_SIZE, policy, name, asyncio.get_running_loop()
+        )
+        return self._add(sub)
+
+    def _add(self, sub):
+        with self._lock:
+            self._subscribers = self._subscribers + [sub]
+        return sub
+
+    def unsubscribe(self, sub):
+        with self._lock:
+            self._subscribers = [s for s in self._subscribers if s is not sub]
+
+    def publish(self, event):
+        self.published += 1
+        # Copy-on-write list: iterate without holding the lock
+        for sub in self._subscribers:
+            sub.offer(event)
+
+    def stats(self):
+        return {
+            "published": self.published,
+            "subscribers": [s.stats() for s in self._subscribers]
+        }
@@ -1,6 +1,26 @@
 """
 Database storage and retrieval operations.
 """
-from .db import init_db, insert_tick, insert_tick_batch, get_connection, engine
+from .db import (
+    init_db,
+    insert_tick,
+    insert_tick_batch,
+    insert_bars,
+    get_connection,
+    get_last_trade_id,
+    find_trade_id_gaps,
+    apply_retention,
+    engine
+)
 
-__all__ = ['init_db', 'insert_tick', 'insert_tick_batch', 'get_connection', 'engine']
+__all__ = [
+    'init_db',
+    'insert_tick',
+    'insert_tick_batch',
+    'insert_bars',
+    'get_connection',
+    'get_last_trade_id',
+    'find_trade_id_gaps',
+    'apply_retention',
+    'engine'
+]
@@ -1,6 +1,26 @@
-from sqlalchemy import create_engine, text
+import logging
+from collections import defaultdict
 from contextlib import contextmanager
 
+from sqlalchemy import create_engine, text
+
+import config
+from .partitions import (
+    ensure_partition,
+    list_partitions,
+    ticks_source,
+    union_source,
+    partitions_for_range,
+    upgrade_partitions,
+    refresh_ticks_view,
+    migrate_legacy_ticks,
+    drop_partitions_before,
+    retention_cutoff,
+    partition_day
+)
+
+logger = logging.getLogger(__name__)
+
 # Database configuration
 DB_PATH = "data/ticks.db"
 engine = create_engine(
@@ -25,43 +45,70 @@ def get_connection():
 
 def init_db():
     """
-    Initialize database schema and indexes.
+    Initialize database schema.
+
+    Ticks are stored in per-day partitions (see storage.partitions), which
+    are created on first insert; this migrates a legacy single `ticks`
+    table and (re)creates the `ticks` view over all partitions. Bars built
+    at ingest time, with their order-flow features, go to `bars`.
     """
     with get_connection() as conn:
+        moved = migrate_legacy_ticks(conn)
+        if moved:
+            logger.info(f"Moved {moved} ticks into day partitions")
+
+        upgrade_partitions(conn)
+        refresh_ticks_view(conn)
+
         conn.execute(text("""
-            CREATE TABLE IF NOT EXISTS ticks (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                ts TEXT NOT NULL,
+            CREATE TABLE IF NOT EXISTS bars (
                 symbol TEXT NOT NULL,
-                price REAL NOT NULL,
-                size REAL NOT NULL
+                timeframe TEXT NOT NULL,
+                ts TEXT NOT NULL,
+                price_open REAL NOT NULL,
+                price_high REAL NOT NULL,
+                price_low REAL NOT NULL,
+                price_close REAL NOT NULL,
+                volume REAL NOT NULL,
+                vwap REAL,
+                trade_count INTEGER,
+                buy_volume REAL,
+                sell_volume REAL,
+                imbalance REAL,
+                PRIMARY KEY (symbol, timeframe, ts)
             )
         """))
 
-        # Index to optimize symbol + time-based queries
-        conn.execute(text("""
-            CREATE INDEX IF NOT EXISTS idx_ticks_symbol_ts
-            ON ticks (symbol, ts)
-        """))
-
         conn.commit()
 
 
-def insert_tick(ts, symbol, price, size):
+def insert_tick(ts, symbol, price, size, first_trade_id=None, last_trade_id=None,
+                is_buyer_maker=None):
     """
     Insert a single tick into the database.
+
+    A tick is either one raw trade (first_trade_id == last_trade_id) or an
+    aggregated trade covering the id range [first_trade_id, last_trade_id].
+    is_buyer_maker records the aggressor side (True = taker sold; None =
+    unknown). Ticks whose trade id is already stored are ignored.
     """
     with get_connection() as conn:
+        table = ensure_partition(conn, ts)
         conn.execute(
-            text("""
-                INSERT INTO ticks (ts, symbol, price, size)
-                VALUES (:ts, :symbol, :price, :size)
+            text(f"""
+                INSERT OR IGNORE INTO {table} (
+                    ts, symbol, price, size, first_trade_id, last_trade_id, is_buyer_maker
+                )
+                VALUES (:ts, :symbol, :price, :size, :first_trade_id, :last_trade_id, :is_buyer_maker)
             """),
             {
                 "ts": ts,
                 "symbol": symbol,
                 "price": price,
-                "size": size
+                "size": size,
+                "first_trade_id": first_trade_id,
+                "last_trade_id": last_trade_id,
+                "is_buyer_maker": is_buyer_maker
             }
         )
         conn.commit()
@@ -70,17 +117,210 @@ def insert_tick(ts, symbol, price, size):
 def insert_tick_batch(ticks):
     """
     Insert multiple ticks efficiently using executemany.
-    Expects a list of dicts with keys: ts, symbol, price, size.
+    Expects a list of dicts with keys: ts, symbol, price, size and
+    optionally first_trade_id, last_trade_id, is_buyer_maker. Ticks whose
+    trade id is already stored are ignored.
     """
     if not ticks:
         return
 
+    by_day = defaultdict(list)
+    for tick in ticks:
+        by_day[partition_day(tick["ts"])].append(
+            {"first_trade_id": None, "last_trade_id": None, "is_buyer_maker": None, **tick}
+        )
+
+    with get_connection() as conn:
+        for day, rows in by_day.items():
+            table = ensure_partition(conn, day)
+            conn.execute(
+                text(f"""
+                    INSERT OR IGNORE INTO {table} (
+                        ts, symbol, price, size, first_trade_id, last_trade_id, is_buyer_maker
+                    )
+                    VALUES (:ts, :symbol, :price, :size, :first_trade_id, :last_trade_id, :is_buyer_maker)
+                """),
+                rows
+            )
+        conn.commit()
+
+
+def insert_bars(bars):
+    """
+    Store closed bars (BarClosed events or dicts with the same fields).
+    A bar already stored for the same (symbol, timeframe, ts) is replaced.
+    """
+    if not bars:
+        return
+
+    rows = []
+    for bar in bars:
+        row = bar._asdict() if hasattr(bar, "_asdict") else dict(bar)
+        if hasattr(row["ts"], "isoformat"):
+            row["ts"] = row["ts"].isoformat()
+        rows.append(row)
+
     with get_connection() as conn:
         conn.execute(
             text("""
-                INSERT INTO ticks (ts, symbol, price, size)
-                VALUES (:ts, :symbol, :price, :size)
+                INSERT OR REPLACE INTO bars (
+                    symbol, timeframe, ts, price_open, price_high, price_low, price_close,
+                    volume, vwap, trade_count, buy_volume, sell_volume, imbalance
+                )
+                VALUES (
+                    :symbol, :timeframe, :ts, :open, :high, :low, :close,
+                    :volume, :vwap, :trade_count, :buy_volume, :sell_volume, :imbalance
+                )
             """),
-            ticks
+            rows
         )
         conn.commit()
+
+
+def apply_retention(retention_days=None):
+    """
+    Drop tick partitions older than the retention window.
+
+    Whole day tables are dropped, so the cost does not depend on how many
+    rows expire and the writer is never blocked by a long DELETE.
+
+    Args:
+        retention_days: Days to keep including today (default
+            config.TICK_RETENTION_DAYS; None keeps everything)
+
+    Returns:
+        List of dropped partition names
+    """
+    retention_days = retention_days or config.TICK_RETENTION_DAYS
+    if not retention_days:
+        return []
+
+    cutoff = retention_cutoff(retention_days)
+
+    with get_connection() as conn:
+        dropped = drop_partitions_before(conn, cutoff)
+        # Bars are small; a plain DELETE is fine
+        conn.execute(text("DELETE FROM bars WHERE ts < :cutoff"), {"cutoff": cutoff.isoformat()})
+        conn.commit()
+
+    if dropped:
+        logger.info(f"Retention dropped partitions: {', '.join(dropped)}")
+
+    return dropped
+
+
+def load_symbol_ticks(symbol, start, end):
+    """
+    Stored ticks of one symbol with ts in [start, end), in trade id order.
+
+    Args:
+        symbol: Trading pair symbol
+        start: Naive local datetime (inclusive)
+        end: Naive local datetime (exclusive)
+
+    Returns:
+        List of tick dicts (keys as accepted by `insert_tick_batch`);
+        is_buyer_maker is None where the side was not recorded
+    """
+    with get_connection() as conn:
+        source = ticks_source(conn, start, end)
+        rows = conn.execute(
+            text(f"""
+                SELECT ts, symbol, price, size, first_trade_id, last_trade_id, is_buyer_maker
+                FROM {source}
+                WHERE symbol = :symbol AND ts >= :start AND ts < :end
+                ORDER BY first_trade_id, ts
+            """),
+            {"symbol": symbol.upper(), "start": start.isoformat(), "end": end.isoformat()}
+        ).mappings().fetchall()
+
+    return [
+        {**row, "is_buyer_maker": None if row["is_buyer_maker"] is None else bool(row["is_buyer_maker"])}
+        for row in rows
+    ]
+
+
+def get_last_trade_id(symbol):
+    """
+    Return the highest stored trade id for a symbol, or None.
+
+    Partitions are searched newest first, so this usually reads one.
+    """
+    with get_connection() as conn:
+        for _, table in reversed(list_partitions(conn)):
+            last_id = conn.execute(
+                text(f"""
+                    SELECT MAX(last_trade_id) FROM {table}
+                    WHERE symbol = :symbol
+                """),
+                {"symbol": symbol.upper()}
+            ).scalar()
+            if last_id is not None:
+                return last_id
+
+    return None
+
+
+def _max_trade_id(conn, table, symbol):
+    # Served by the partition's (symbol, first_trade_id) index
+    return conn.execute(
+        text(f"SELECT MAX(first_trade_id) FROM {table} WHERE symbol = :symbol"),
+        {"symbol": symbol}
+    ).scalar()
+
+
+def find_trade_id_gaps(symbol, since_id=None, start=None, end=None):
+    """
+    Detect missing Binance trade id ranges for a symbol.
+
+    Consecutive stored ticks must cover contiguous id ranges; any hole
+    between one tick's last_trade_id and the next tick's first_trade_id
+    is a gap (e.g. trades missed while the WebSocket was disconnected).
+
+    Only partitions overlapping [start, end) whose newest trade id reaches
+    since_id are scanned (trade ids grow with time), so a bounded search
+    reads a few day tables instead of the whole `ticks` view.
+
+    Args:
+        symbol: Trading pair symbol
+        since_id: Only look at trade ids >= since_id
+        start: Only look at ticks with ts >= start (naive local datetime)
+        end: Only look at ticks with ts < end
+
+    Returns:
+        List of (first_missing_id, last_missing_id) tuples, oldest first
+    """
+    symbol = symbol.upper()
+    filters = ["symbol = :symbol", "first_trade_id IS NOT NULL", "first_trade_id >= :since_id"]
+    params = {"symbol": symbol, "since_id": since_id or 0}
+    if start is not None:
+        filters.append("ts >= :start")
+        params["start"] = start.isoformat()
+    if end is not None:
+        filters.append("ts < :end")
+        params["end"] = end.isoformat()
+
+    with get_connection() as conn:
+        tables = partitions_for_range(conn, start, end)
+        if since_id:
+            tables = [t for t in tables if (_max_trade_id(conn, t, symbol) or 0) >= since_id]
+        if not tables:
+            return []
+
+        rows = conn.execute(
+            text(f"""
+                SELECT prev_last + 1 AS gap_start, first_trade_id - 1 AS gap_end
+                FROM (
+                    SELECT
+                        first_trade_id,
+                        LAG(last_trade_id) OVER (ORDER BY first_trade_id) AS prev_last
+                    FROM {union_source(tables)}
+                    WHERE {" AND ".join(filters)}
+                )
+                WHERE first_trade_id > prev_last + 1
+                ORDER BY gap_start
+            """),
+            params
+        ).fetchall()
+
+    return [(int(start_id), int(end_id)) for start_id, end_id in rows]
@@ -0,0 +1,309 @@
+"""
+Per-day tick partitions.
+
+Ticks live in one table per (local) trading day, `ticks_YYYYMMDD`, each
+with its own indexes. Time-bounded reads go through `ticks_source`, which
+only names the partitions overlapping the requested range, and retention
+drops whole tables instead of running a large DELETE. A `ticks` view over
+all partitions remains for ad-hoc and whole-history queries.
+
+All functions take an open connection; callers own the transaction,
+except that the view swap commits itself when no transaction is open.
+"""
+import threading
+from datetime import date, datetime, timedelta
+
+import pandas as pd
+from sqlalchemy import text
+
+PARTITION_PREFIX = "ticks_"
+
+# Columns exposed by ticks_source and the `ticks` view
+TICK_COLUMNS = "id, ts, symbol, price, size, first_trade_id, last_trade_id, is_buyer_maker"
+
+# Columns added after the first partitions were created: name -> SQL type
+_ADDED_COLUMNS = {"is_buyer_maker": "INTEGER"}
+
+# Partitions known to exist in this process (saves a DDL round trip per insert)
+_known_partitions = set()
+
+# Serializes partition DDL across threads (stream, backfill, retention).
+# Other processes are covered by swapping the view in one transaction
+# (see `_replace_ticks_view`).
+_ddl_lock = threading.RLock()
+
+
+def partition_day(value):
+    """
+    Trading day of a timestamp (ISO string as stored, datetime or date).
+    """
+    if isinstance(value, str):
+        return date.fromisoformat(value[:10])
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return pd.Timestamp(value).date()
+
+
+def partition_name(day):
+    return f"{PARTITION_PREFIX}{partition_day(day):%Y%m%d}"
+
+
+def list_partitions(conn):
+    """
+    Existing partitions, oldest first.
+
+    Returns:
+        List of (day, table_name) tuples
+    """
+    rows = conn.execute(text("""
+        SELECT name FROM sqlite_master
+        WHERE type = 'table' AND name GLOB 'ticks_[0-9][0-9][0-9][0-9][0-9][0-9][0-9][0-9]'
+        ORDER BY name
+    """)).fetchall()
+
+    return [(datetime.strptime(name[len(PARTITION_PREFIX):], "%Y%m%d").date(), name)
+            for (name,) in rows]
+
+
+def ensure_partition(conn, ts):
+    """
+    Create the partition holding `ts` if needed.
+
+    Returns:
+        Partition table name
+    """
+    name = partition_name(ts)
+    if name in _known_partitions:
+        return name
+
+    with _ddl_lock:
+        if name not in _known_partitions:
+            _create_partition(conn, name)
+            _known_partitions.add(name)
+
+    return name
+
+
+def _create_partition(conn, name):
+    """
+    Create a partition and its indexes if missing (idempotent, so another
+    process creating the same day concurrently is harmless).
+    """
+    exists = conn.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+        {"name": name}
+    ).first()
+
+    conn.execute(text(f"""
+        CREATE TABLE IF NOT EXISTS {name} (
+            id INTEGER PRIMARY KEY,
+            ts TEXT NOT NULL,
+            symbol TEXT NOT NULL,
+            price REAL NOT NULL,
+            size REAL NOT NULL,
+            first_trade_id INTEGER,
+            last_trade_id INTEGER,
+            is_buyer_maker INTEGER
+        )
+    """))
+    if exists:
+        _add_missing_columns(conn, name)
+
+    # Index to optimize symbol + time-based queries
+    conn.execute(text(f"CREATE INDEX IF NOT EXISTS idx_{name}_symbol_ts ON {name} (symbol, ts)"))
+
+    # One row per Binance trade id. A trade always lands in the partition
+    # of its own trade time, so per-partition uniqueness is enough.
+    conn.execute(text(f"""
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_{name}_symbol_trade_id
+        ON {name} (symbol, first_trade_id)
+        WHERE first_trade_id IS NOT NULL
+    """))
+
+    if not exists:
+        refresh_ticks_view(conn)
+
+
+def _add_missing_columns(conn, name):
+    """
+    Bring a partition created by an older version up to the current schema.
+    Rows stored before a column existed read as NULL (unknown).
+    """
+    columns = {row[1] for row in conn.execute(text(f"PRAGMA table_info({name})"))}
+    for column, sql_type in _ADDED_COLUMNS.items():
+        if column not in columns:
+            conn.execute(text(f"ALTER TABLE {name} ADD COLUMN {column} {sql_type}"))
+
+
+def upgrade_partitions(conn):
+    """
+    Add columns missing from existing partitions (the `ticks` view selects
+    them from every partition, so this must run before refreshing it).
+    """
+    with _ddl_lock:
+        for _, name in list_partitions(conn):
+            _add_missing_columns(conn, name)
+
+
+def refresh_ticks_view(conn):
+    """
+    (Re)create the `ticks` view as the union of all partitions.
+    """
+    with _ddl_lock:
+        tables = [name for _, name in list_partitions(conn)]
+
+        if tables:
+            body = " UNION ALL ".join(f"SELECT {TICK_COLUMNS} FROM {name}" for name in tables)
+        else:
+            body = _empty_select()
+
+        _replace_ticks_view(conn, body)
+
+
+def _replace_ticks_view(conn, body):
+    """
+    Drop and recreate the `ticks` view atomically, so readers in other
+    processes never find it missing between the two statements.
+
+    pysqlite runs DDL outside a transaction, so without an explicit one
+    each statement commits on its own. BEGIN IMMEDIATE takes the write
+    lock up front; if the caller already has a transaction open (e.g. a
+    migration mid-insert), the swap simply joins it.
+    """
+    dbapi_conn = conn.connection.dbapi_connection
+
+    if dbapi_conn.in_transaction:
+        conn.execute(text("DROP VIEW IF EXISTS ticks"))
+        conn.execute(text(f"CREATE VIEW ticks AS {body}"))
+        return
+
+    dbapi_conn.execute("BEGIN IMMEDIATE")
+    try:
+        dbapi_conn.execute("DROP VIEW IF EXISTS ticks")
+        dbapi_conn.execute(f"CREATE VIEW ticks AS {body}")
+    except BaseException:
+        dbapi_conn.execute("ROLLBACK")
+        raise
+    dbapi_conn.execute("COMMIT")
+
+
+def _empty_select():
+    return (
+        "SELECT NULL AS id, NULL AS ts, NULL AS symbol, NULL AS price, NULL AS size, "
+        "NULL AS first_trade_id, NULL AS last_trade_id, NULL AS is_buyer_maker WHERE 0"
+    )
+
+
+def partitions_for_range(conn, start=None, end=None):
+    """
+    Names of the partitions overlapping [start, end), oldest first.
+
+    start=None means from the beginning, end=None means up to now.
+    """
+    first = None if start is None else partition_day(start)
+    last = None if end is None else partition_day(pd.Timestamp(end) - pd.Timedelta(1, "ns"))
+
+    return [
+        name for day, name in list_partitions(conn)
+        if (first is None or day >= first) and (last is None or day <= last)
+    ]
+
+
+def ticks_source(conn, start=None, end=None):
+    """
+    FROM-clause source covering only the partitions that overlap
+    [start, end). Callers still filter on ts; this only prunes tables.
+
+    Returns:
+        A table name or a parenthesized UNION ALL subquery
+    """
+    return union_source(partitions_for_range(conn, start, end))
+
+
+def union_source(tables):
+    """
+    FROM-clause source over the given partitions (see `ticks_source`).
+    """
+    if len(tables) == 1:
+        return tables[0]
+    if not tables:
+        return f"({_empty_select()})"
+
+    return "(" + " UNION ALL ".join(
+        f"SELECT {TICK_COLUMNS} FROM {name}" for name in tables
+    ) + ")"
+
+
+def drop_partitions_before(conn, day):
+    """
+    Drop every partition older than `day` and refresh the view.
+
+    Returns:
+        List of dropped table names
+    """
+    cutoff = partition_day(day)
+
+    with _ddl_lock:
+        dropped = [name for d, name in list_partitions(conn) if d < cutoff]
+
+        for name in dropped:
+            _known_partitions.discard(name)
+            conn.execute(text(f"DROP TABLE IF EXISTS {name}"))
+
+        if dropped:
+            refresh_ticks_view(conn)
+
+    return dropped
+
+
+def retention_cutoff(retention_days, today=None):
+    """
+    First day kept when keeping `retention_days` days including today.
+    """
+    today = today or date.today()
+    return today - timedelta(days=max(int(retention_days), 1) - 1)
+
+
+def migrate_legacy_ticks(conn):
+    """
+    Move rows from a pre-partitioning `ticks` table into day partitions,
+    then drop the table (the `ticks` view replaces it).
+
+    Returns:
+        Number of rows moved
+    """
+    is_table = conn.execute(text(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'ticks'"
+    )).first()
+    if not is_table:
+        return 0
+
+    # Free the name for the view before creating partitions
+    conn.execute(text("ALTER TABLE ticks RENAME TO ticks_legacy"))
+
+    # Databases created before trade ids were stored lack these columns
+    columns = {row[1] for row in conn.execute(text("PRAGMA table_info(ticks_legacy)"))}
+    for column in ("first_trade_id", "last_trade_id"):
+        if column not in columns:
+            conn.execute(text(f"ALTER TABLE ticks_legacy ADD COLUMN {column} INTEGER"))
+
+    moved = 0
+    days = conn.execute(text("SELECT DISTINCT substr(ts, 1, 10) FROM ticks_legacy")).fetchall()
+    for (day,) in days:
+        name = ensure_partition(conn, day)
+        # Duplicated trade ids are dropped by the partition's unique index
+        moved += conn.execute(
+            text(f"""
+                INSERT OR IGNORE INTO {name} (ts, symbol, price, size, first_trade_id, last_trade_id)
+                SELECT ts, symbol, price, size, first_trade_id, last_trade_id
+                FROM ticks_legacy
+                WHERE substr(ts, 1, 10) = :day
+                ORDER BY id
+            """),
+            {"day": day}
+        ).rowcount
+
+    conn.execute(text("DROP TABLE ticks_legacy"))
+    return moved
@@ -0,0 +1,18 @@
+"""
+Shared test setup.
+
+`storage.db` opens `data/ticks.db` relative to the working directory when
+it is imported, so the session runs from a scratch directory before any
+repo module is loaded; tests that touch the database use their own symbols
+and days to stay independent.
+"""
+import os
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+_workdir = tempfile.mkdtemp(prefix="gemscap-tests-")
+os.makedirs(os.path.join(_workdir, "data"), exist_ok=True)
+os.chdir(_workdir)
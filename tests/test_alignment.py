@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from analytics.alignment import asof_align, asof_indices
+
+
+def _reference(left_ts, right_ts, tolerance_ns=None):
+    left = pd.DataFrame({"ts": left_ts})
+    right = pd.DataFrame({"ts": right_ts, "pos": np.arange(len(right_ts))})
+    merged = pd.merge_asof(
+        left, right, on="ts", direction="backward",
+        tolerance=tolerance_ns
+    )
+    return merged["pos"].fillna(-1).to_numpy("int64")
+
+
+@pytest.mark.parametrize("n_left, n_right", [(500, 400), (2_000, 30), (50, 0)])
+@pytest.mark.parametrize("tolerance_ns", [None, 5_000])
+def test_asof_indices_matches_merge_asof(n_left, n_right, tolerance_ns):
+    rng = np.random.default_rng(n_left + n_right)
+    left_ts = np.sort(rng.integers(0, 1_000_000, n_left)).astype("int64")
+    right_ts = np.sort(rng.integers(0, 1_000_000, n_right)).astype("int64")
+
+    idx = asof_indices(left_ts, right_ts, tolerance_ns)
+    expected = _reference(left_ts, right_ts, tolerance_ns)
+
+    # Duplicate right timestamps may resolve to any of the tied rows
+    matched = expected >= 0
+    np.testing.assert_array_equal(idx >= 0, matched)
+    np.testing.assert_array_equal(right_ts[idx[matched]], right_ts[expected[matched]])
+
+
+def test_asof_align_pairs_each_a_tick_with_latest_fresh_b_price():
+    ts = pd.to_datetime([
+        "2024-01-01 00:00:00", "2024-01-01 00:00:01", "2024-01-01 00:00:02",
+        "2024-01-01 00:00:02", "2024-01-01 00:00:03", "2024-01-01 00:00:10",
+        "2024-01-01 00:00:20"
+    ])
+    ticks = pd.DataFrame(
+        {
+            "symbol": ["AAA", "BBB", "AAA", "AAA", "BBB", "AAA", "AAA"],
+            "price": [1.0, 10.0, 2.0, 3.0, 11.0, 4.0, 5.0]
+        },
+        index=pd.DatetimeIndex(ts, name="ts")
+    )
+
+    aligned = asof_align(ticks, "AAA", "BBB", tolerance="8s")
+
+    # 00:00 has no B yet; 00:02 keeps the last A tick; 00:20 is stale
+    assert list(aligned.index) == list(pd.to_datetime(["2024-01-01 00:00:02", "2024-01-01 00:00:10"]))
+    assert aligned["AAA"].tolist() == [3.0, 4.0]
+    assert aligned["BBB"].tolist() == [10.0, 11.0]
+
+    # Compact frames (int64 ns index) align the same way
+    compact = ticks.set_axis(pd.Index(ts.as_unit("ns").asi8, name="ts"))
+    pd.testing.assert_frame_equal(asof_align(compact, "AAA", "BBB", tolerance="8s"), aligned)
+
+    # Without a tolerance only the tick before any B trade is dropped
+    assert asof_align(ticks, "AAA", "BBB")["BBB"].tolist() == [10.0, 11.0, 11.0]
@@ -0,0 +1,126 @@
+import asyncio
+import json
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from ingestion.backfill import HISTORICAL_TRADES_PATH, backfill_range
+from storage.db import find_trade_id_gaps, init_db, insert_tick_batch, load_symbol_ticks
+
+SYMBOL = "BKUSDT"
+START = datetime(2024, 3, 7, 15, 0)
+
+
+def _trade(trade_id):
+    ts = START + timedelta(seconds=trade_id)
+    return {
+        "id": trade_id,
+        "price": f"{100 + trade_id * 0.01:.2f}",
+        "qty": "0.500",
+        "quoteQty": "50.0",
+        "time": int(ts.timestamp() * 1000),
+        "isBuyerMaker": trade_id % 3 == 0
+    }
+
+
+@pytest.fixture
+def rest_server():
+    """
+    Local stand-in for /fapi/v1/historicalTrades serving trades 1-100.
+    Yields (base_url, request log of (monotonic time, fromId, limit)).
+    """
+    trades = {i: _trade(i) for i in range(1, 101)}
+    requests = []
+
+    class Handler(BaseHTTPRequestHandler):
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            if url.path != HISTORICAL_TRADES_PATH:
+                self.send_error(404)
+                return
+
+            query = {k: v[0] for k, v in parse_qs(url.query).items()}
+            from_id, limit = int(query["fromId"]), int(query["limit"])
+            requests.append((time.monotonic(), from_id, limit))
+            page = [trades[i] for i in range(from_id, from_id + limit) if i in trades]
+
+            body = json.dumps(page).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, fmt, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}", requests
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def _tick(trade):
+    return {
+        "ts": datetime.fromtimestamp(trade["time"] / 1000).isoformat(),
+        "symbol": SYMBOL,
+        "price": float(trade["price"]),
+        "size": float(trade["qty"]),
+        "first_trade_id": trade["id"],
+        "last_trade_id": trade["id"],
+        "is_buyer_maker": trade["isBuyerMaker"]
+    }
+
+
+def test_backfill_range_fills_gap_under_rate_limit(rest_server):
+    base_url, requests = rest_server
+    init_db()
+    insert_tick_batch([_tick(_trade(i)) for i in list(range(1, 11)) + list(range(31, 41))])
+    assert find_trade_id_gaps(SYMBOL) == [(11, 30)]
+
+    rate = 20.0
+    stored = asyncio.run(backfill_range(
+        SYMBOL, 11, 30, base_url=base_url, page_size=5, max_concurrency=4, rate_per_second=rate
+    ))
+
+    assert stored == 20
+    assert find_trade_id_gaps(SYMBOL) == []
+    assert find_trade_id_gaps(SYMBOL, since_id=35) == []
+
+    # Four pages, fetched concurrently but never faster than the limit
+    assert sorted(from_id for _, from_id, _ in requests) == [11, 16, 21, 26]
+    times = sorted(t for t, _, _ in requests)
+    assert all(b - a >= 0.9 / rate for a, b in zip(times, times[1:]))
+
+    ticks = load_symbol_ticks(SYMBOL, START, START + timedelta(minutes=5))
+    assert [t["first_trade_id"] for t in ticks] == list(range(1, 41))
+    assert [t["is_buyer_maker"] for t in ticks] == [i % 3 == 0 for i in range(1, 41)]
+
+
+def test_find_trade_id_gaps_skips_partitions_below_since_id():
+    init_db()
+    day_one = datetime(2024, 3, 8, 12, 0)
+    day_two = day_one + timedelta(days=1)
+    rows = [
+        {"ts": (day_one + timedelta(seconds=i)).isoformat(), "symbol": "GPUSDT",
+         "price": 1.0, "size": 1.0, "first_trade_id": i, "last_trade_id": i}
+        for i in (1, 2, 5, 6)
+    ] + [
+        {"ts": (day_two + timedelta(seconds=i)).isoformat(), "symbol": "GPUSDT",
+         "price": 1.0, "size": 1.0, "first_trade_id": i, "last_trade_id": i}
+        for i in (10, 11, 14)
+    ]
+    insert_tick_batch(rows)
+
+    assert find_trade_id_gaps("GPUSDT") == [(3, 4), (7, 9), (12, 13)]
+    assert find_trade_id_gaps("GPUSDT", since_id=10) == [(12, 13)]
+    assert find_trade_id_gaps("GPUSDT", start=day_one, end=day_two) == [(3, 4)]
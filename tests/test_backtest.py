@@ -0,0 +1,91 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from analytics.backtest import backtest_grid
+from analytics.kalman import kalman_hedge_ratio
+from analytics.stats import compute_spread, compute_zscore
+
+
+def _pair(n=400, seed=7):
+    rng = np.random.default_rng(seed)
+    ts = pd.date_range("2024-01-01", periods=n, freq="1min")
+    b = 100 + np.cumsum(rng.normal(0, 0.5, n))
+    # Drifting hedge ratio plus a mean-reverting residual
+    beta = np.linspace(1.2, 1.6, n)
+    noise = np.zeros(n)
+    for t in range(1, n):
+        noise[t] = 0.8 * noise[t - 1] + rng.normal(0, 0.4)
+    a = 5 + beta * b + noise
+    return pd.DataFrame({"AAA": a, "BBB": b}, index=pd.Index(ts, name="ts"))
+
+
+def _hand_positions(z, entry, exit_):
+    long_leg, short_leg = 0, 0
+    positions = np.zeros(len(z))
+    for t, value in enumerate(z):
+        if not np.isnan(value):
+            if value <= -entry:
+                long_leg = 1
+            elif value >= -exit_:
+                long_leg = 0
+            if value >= entry:
+                short_leg = -1
+            elif value <= exit_:
+                short_leg = 0
+        positions[t] = long_leg + short_leg
+    return positions
+
+
+def test_kalman_grid_pnl_matches_per_leg_hand_calculation():
+    wide = _pair()
+    beta = kalman_hedge_ratio(wide, "AAA", "BBB")["beta"]
+    spread_df = compute_spread(wide, "AAA", "BBB", beta)
+    assert np.isnan(beta.iloc[0])
+
+    window, entry, exit_, fee_bps = 30, 1.5, 0.25, 2.0
+    grid = backtest_grid(
+        spread_df, "AAA", "BBB", beta,
+        windows=[window], entry_thresholds=[entry], exit_thresholds=[exit_],
+        fee_bps=fee_bps
+    )
+
+    assert len(grid) == 1
+    row = grid.iloc[0]
+    assert np.isfinite(row["pnl"]) and np.isfinite(row["sharpe"])
+    assert row["n_trades"] > 0
+
+    # Hold β_{t-1} units of B from the close of t-1 into bar t
+    a = spread_df["AAA"].to_numpy()
+    b = spread_df["BBB"].to_numpy()
+    hedge = beta.to_numpy()
+    z = compute_zscore(spread_df["spread"], window).to_numpy()
+    pos = _hand_positions(z, entry, exit_)
+
+    pnl = 0.0
+    for t in range(1, len(pos)):
+        if pos[t - 1]:
+            pnl += pos[t - 1] * ((a[t] - a[t - 1]) - hedge[t - 1] * (b[t] - b[t - 1]))
+        change = abs(pos[t] - pos[t - 1])
+        if change:
+            notional = abs(a[t]) + abs(hedge[t]) * abs(b[t])
+            pnl -= change * notional * fee_bps / 10_000
+
+    assert row["pnl"] == pytest.approx(pnl)
+
+
+def test_constant_hedge_pnl_is_spread_move():
+    wide = _pair(seed=11)
+    spread_df = compute_spread(wide, "AAA", "BBB", 1.4)
+
+    grid = backtest_grid(
+        spread_df, "AAA", "BBB", 1.4,
+        windows=[20], entry_thresholds=[1.0], exit_thresholds=[0.0]
+    )
+
+    z = compute_zscore(spread_df["spread"], 20).to_numpy()
+    pos = _hand_positions(z, 1.0, 0.0)
+    expected = np.sum(pos[:-1] * np.diff(spread_df["spread"].to_numpy()))
+
+    assert grid.iloc[0]["pnl"] == pytest.approx(expected)
+
@@ -0,0 +1,121 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from analytics.sampling import resample_ticks
+from ingestion.bar_builder import BarBuilder
+from storage.db import init_db, insert_tick_batch, load_symbol_ticks
+
+
+class _Bus:
+
+    def __init__(self):
+        self.events = []
+
+    def publish(self, event):
+        self.events.append(event)
+
+
+def _tick(ts, price, size, trade_id, is_buyer_maker, symbol="BFUSDT"):
+    return {
+        "ts": ts.isoformat(),
+        "symbol": symbol,
+        "price": price,
+        "size": size,
+        "first_trade_id": trade_id,
+        "last_trade_id": trade_id,
+        "is_buyer_maker": is_buyer_maker
+    }
+
+
+def test_backfill_merges_open_bar_and_rebuilds_closed_ones():
+    init_db()
+    start = datetime(2024, 3, 5, 12, 0)
+    # Full history: minute 0 holds ids 1-4, minute 1 holds ids 5-7
+    history = [
+        _tick(start + timedelta(seconds=5), 100.0, 1.0, 1, False),
+        _tick(start + timedelta(seconds=20), 101.0, 2.0, 2, True),
+        _tick(start + timedelta(seconds=40), 99.0, 1.0, 3, False),
+        _tick(start + timedelta(seconds=50), 100.5, 3.0, 4, True),
+        _tick(start + timedelta(seconds=65), 102.0, 1.0, 5, False),
+        _tick(start + timedelta(seconds=70), 103.0, 2.0, 6, True),
+        _tick(start + timedelta(seconds=80), 102.5, 1.0, 7, False),
+    ]
+    insert_tick_batch(history)
+
+    bus = _Bus()
+    builder = BarBuilder(bus, timeframes=["1m"], grace_seconds=0)
+    # Live stream saw 1, then reconnected and resumed at 4 and 7; the
+    # live tick 7 closed minute 0 with only ids 1 and 4
+    for tick in (history[0], history[3], history[6]):
+        builder.on_tick(tick)
+    assert [bar.trade_count for bar in bus.events] == [2]
+
+    stale = builder.on_backfill([history[1], history[2], history[4], history[5]])
+    assert stale == {("BFUSDT", "1m"): {int((start - datetime(1970, 1, 1)).total_seconds())}}
+
+    ticks = load_symbol_ticks("BFUSDT", start, start + timedelta(minutes=1))
+    assert builder.rebuild(stale, ticks) == 1
+
+    revised = bus.events[-1]
+    assert revised.revised and revised.ts == start
+    assert (revised.open, revised.high, revised.low, revised.close) == (100.0, 101.0, 99.0, 100.5)
+    assert revised.trade_count == 4
+    assert revised.buy_volume == pytest.approx(2.0)
+    assert revised.sell_volume == pytest.approx(5.0)
+
+    # Minute 1 is still open: backfilled ids 5-6 were merged into it
+    builder.close_due(start + timedelta(minutes=5))
+    live = bus.events[-1]
+    assert not live.revised and live.ts == start + timedelta(minutes=1)
+    assert (live.open, live.high, live.low, live.close) == (102.0, 103.0, 102.0, 102.5)
+    assert live.trade_count == 3
+    assert live.buy_volume == pytest.approx(2.0)
+    assert live.sell_volume == pytest.approx(2.0)
+
+
+def test_live_bars_match_resampled_ticks_with_order_flow():
+    rng = np.random.default_rng(5)
+    start = datetime(2024, 3, 5, 13, 0)
+    offsets = np.sort(rng.uniform(0, 180, 400))
+    ticks = [
+        _tick(start + timedelta(seconds=float(s)), float(100 + rng.normal()), float(rng.uniform(0.1, 2)),
+              i + 1, bool(rng.random() < 0.4), symbol="LBUSDT")
+        for i, s in enumerate(offsets)
+    ]
+
+    bus = _Bus()
+    builder = BarBuilder(bus, timeframes=["1m"], grace_seconds=1.0)
+    for tick in ticks:
+        builder.on_tick(tick)
+    # Two bars closed by later ticks; the last waits for its end plus grace
+    assert len(bus.events) == 2
+    builder.close_due(start + timedelta(minutes=3))
+    assert len(bus.events) == 2
+    builder.close_due(start + timedelta(minutes=3, seconds=1))
+    assert len(bus.events) == 3
+
+    frame = pd.DataFrame(ticks)
+    frame["ts"] = pd.to_datetime(frame["ts"])
+    expected = resample_ticks(frame.set_index("ts"), "1m")
+    for bar, (_, row) in zip(bus.events, expected.iterrows()):
+        assert bar.ts == row["ts"]
+        assert (bar.open, bar.high, bar.low, bar.close) == (
+            row["price_open"], row["price_high"], row["price_low"], row["price_close"]
+        )
+        assert bar.volume == pytest.approx(row["volume"])
+
+    in_bar = frame[frame["ts"] < start + timedelta(minutes=1)]
+    first = bus.events[0]
+    buys = in_bar.loc[~in_bar["is_buyer_maker"], "size"].sum()
+    assert first.trade_count == len(in_bar)
+    assert first.buy_volume == pytest.approx(buys)
+    assert first.imbalance == pytest.approx((2 * buys - in_bar["size"].sum()) / in_bar["size"].sum())
+    assert first.vwap == pytest.approx((in_bar["price"] * in_bar["size"]).sum() / in_bar["size"].sum())
+
+    # A tick for a published bar is counted, not folded in
+    builder.on_tick(ticks[0])
+    assert builder.late_ticks == 1
+    assert len(bus.events) == 3
@@ -0,0 +1,101 @@
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from analytics.cache import ResultCache
+
+
+def test_lru_eviction_respects_the_memory_budget():
+    cache = ResultCache(max_bytes=2_500)
+    # 800-byte arrays: three fit, the fourth evicts the least recently used
+    for key in ("a", "b", "c"):
+        cache.get_or_compute(key, lambda: np.zeros(100))
+    cache.get_or_compute("a", lambda: pytest.fail("'a' should be cached"))
+    cache.get_or_compute("d", lambda: np.zeros(100))
+
+    recomputed = []
+    cache.get_or_compute("b", lambda: recomputed.append("b") or np.zeros(100))
+    assert recomputed == ["b"]
+
+    metrics = cache.metrics()
+    assert metrics["bytes"] <= 2_500
+    assert metrics["evictions"] >= 1
+    # Oversized values are returned but never stored
+    assert cache.get_or_compute("huge", lambda: np.zeros(1_000)).shape == (1_000,)
+    assert cache.metrics()["entries"] == metrics["entries"]
+
+
+def test_concurrent_callers_share_one_computation():
+    cache = ResultCache(max_bytes=10_000)
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return 42
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(cache.get_or_compute("k", compute)))
+    leader.start()
+    started.wait(5)
+    waiters = [
+        threading.Thread(target=lambda: results.append(cache.get_or_compute("k", compute)))
+        for _ in range(3)
+    ]
+    for thread in waiters:
+        thread.start()
+    deadline = time.monotonic() + 5
+    while cache.metrics()["coalesced"] < 3 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    release.set()
+    for thread in [leader] + waiters:
+        thread.join(5)
+
+    assert results == [42] * 4
+    assert len(calls) == 1
+    assert cache.metrics()["misses"] == 1
+
+
+def test_leader_failure_reaches_waiters_and_is_not_cached():
+    cache = ResultCache(max_bytes=10_000)
+
+    with pytest.raises(ZeroDivisionError):
+        cache.get_or_compute("k", lambda: 1 / 0)
+    assert cache.get_or_compute("k", lambda: "ok") == "ok"
+
+
+class _Rerun(BaseException):
+    pass
+
+
+def test_waiter_takes_over_when_the_leader_is_aborted():
+    cache = ResultCache(max_bytes=10_000)
+    started, release = threading.Event(), threading.Event()
+
+    def aborted():
+        started.set()
+        release.wait(5)
+        raise _Rerun()
+
+    def leader():
+        with pytest.raises(_Rerun):
+            cache.get_or_compute("k", aborted)
+
+    results = []
+    first = threading.Thread(target=leader)
+    first.start()
+    started.wait(5)
+    waiter = threading.Thread(target=lambda: results.append(cache.get_or_compute("k", lambda: "retried")))
+    waiter.start()
+    deadline = time.monotonic() + 5
+    while cache.metrics()["coalesced"] < 1 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    release.set()
+    first.join(5)
+    waiter.join(5)
+
+    assert results == ["retried"]
@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from analytics.correlation import RollingCorrelationMatrix, compute_correlation_matrix
+
+
+def _prices(n=300, seed=3):
+    rng = np.random.default_rng(seed)
+    common = np.cumsum(rng.normal(0, 1, n))
+    return pd.DataFrame({
+        "AAA": 30_000 + common + np.cumsum(rng.normal(0, 0.5, n)),
+        "BBB": 2_000 + 0.5 * common + np.cumsum(rng.normal(0, 0.5, n)),
+        "CCC": 100 + np.cumsum(rng.normal(0, 0.2, n))
+    })
+
+
+def test_rolling_matrix_matches_pandas_over_the_last_window():
+    prices = _prices()
+    window = 40
+    tracker = RollingCorrelationMatrix(list(prices.columns), window)
+
+    for i, row in enumerate(prices.to_numpy()):
+        tracker.update(row)
+        if i + 1 < window:
+            assert tracker.correlation() is None
+        elif i % 37 == 0 or i == len(prices) - 1:
+            expected = prices.iloc[i + 1 - window:i + 1].corr()
+            np.testing.assert_allclose(tracker.correlation().to_numpy(), expected.to_numpy(), atol=1e-9)
+            np.testing.assert_allclose(
+                tracker.covariance().to_numpy(),
+                prices.iloc[i + 1 - window:i + 1].cov().to_numpy(),
+                rtol=1e-9
+            )
+
+
+def test_missing_values_carry_forward_and_state_round_trips():
+    tracker = RollingCorrelationMatrix(["AAA", "BBB"], 3)
+    assert not tracker.update({"AAA": 1.0})
+    assert tracker.update({"BBB": 2.0})
+    assert tracker.update([2.0, np.nan])
+    np.testing.assert_array_equal(tracker.last, [2.0, 2.0])
+
+    clone = RollingCorrelationMatrix(["AAA", "BBB"], 3)
+    clone.set_state(tracker.get_state())
+    for row in ([3.0, 5.0], [4.0, 3.0], [6.0, 7.0]):
+        tracker.update(row)
+        clone.update(row)
+    pd.testing.assert_frame_equal(clone.correlation(), tracker.correlation())
+
+    with pytest.raises(ValueError):
+        RollingCorrelationMatrix(["AAA", "BBB", "CCC"], 3).set_state(tracker.get_state())
+
+
+def test_compute_correlation_matrix_from_bars():
+    prices = _prices(n=60)
+    ts = pd.date_range("2024-01-01", periods=len(prices), freq="1min")
+    bars = prices.assign(ts=ts).melt(id_vars="ts", var_name="symbol", value_name="price_close")
+
+    corr = compute_correlation_matrix(bars, window=20)
+    expected = prices.iloc[-20:].corr()
+    np.testing.assert_allclose(corr.to_numpy(), expected.to_numpy(), atol=1e-9)
+    assert compute_correlation_matrix(bars, window=100) is None
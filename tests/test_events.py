@@ -0,0 +1,80 @@
+import asyncio
+import threading
+import time
+
+from ingestion.events import EventBus
+
+
+def _wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def test_every_subscriber_gets_every_event_in_order():
+    bus = EventBus()
+    first, second = [], []
+    subs = [bus.subscribe(first.append, name="first"), bus.subscribe(second.append, name="second")]
+
+    for i in range(50):
+        bus.publish(i)
+
+    assert _wait_for(lambda: len(first) == 50 and len(second) == 50)
+    assert first == second == list(range(50))
+    assert bus.stats()["published"] == 50
+    for sub in subs:
+        sub.close()
+
+
+def test_slow_subscriber_drops_per_policy_without_blocking_others():
+    bus = EventBus()
+    release = threading.Event()
+    fast, newest, oldest, picked = [], [], [], []
+
+    def blocked(store):
+        def callback(event):
+            picked.append(event)
+            release.wait(5)
+            store.append(event)
+        return callback
+
+    subs = [
+        bus.subscribe(fast.append, maxsize=100, name="fast"),
+        bus.subscribe(blocked(newest), maxsize=2, policy="drop_newest", name="newest"),
+        bus.subscribe(blocked(oldest), maxsize=2, policy="drop_oldest", name="oldest")
+    ]
+    bus.publish(0)
+    # Both slow workers take event 0 and block on it
+    assert _wait_for(lambda: len(picked) == 2)
+
+    started = time.monotonic()
+    for i in range(1, 10):
+        bus.publish(i)
+    assert time.monotonic() - started < 0.5
+    assert _wait_for(lambda: len(fast) == 10)
+
+    release.set()
+    assert _wait_for(lambda: len(newest) == 3 and len(oldest) == 3)
+    assert newest == [0, 1, 2]
+    assert oldest == [0, 8, 9]
+    assert {s["name"]: s["dropped"] for s in bus.stats()["subscribers"]} == {
+        "fast": 0, "newest": 7, "oldest": 7
+    }
+    for sub in subs:
+        sub.close()
+    assert bus.stats()["subscribers"] == []
+
+
+def test_async_subscriber_receives_events_published_from_threads():
+    bus = EventBus()
+
+    async def consume():
+        sub = bus.subscribe_async(name="async")
+        publisher = threading.Thread(target=lambda: [bus.publish(i) for i in range(5)])
+        publisher.start()
+        received = [await asyncio.wait_for(sub.get(), 5) for _ in range(5)]
+        publisher.join()
+        return received
+
+    assert asyncio.run(consume()) == list(range(5))
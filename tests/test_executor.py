@@ -0,0 +1,117 @@
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from analytics.executor import (
+    AnalyticsCancelled,
+    AnalyticsExecutor,
+    buffers_to_frame,
+    frame_to_buffers,
+    report_progress
+)
+from analytics.pipeline import run_pair_analytics
+from storage.db import init_db, insert_tick_batch
+
+
+def staged_job(stages, delay, progress=None):
+    for i in range(stages):
+        report_progress(progress, f"stage {i}", i / stages)
+        time.sleep(delay)
+    return stages
+
+
+def stuck_job(progress=None):
+    report_progress(progress, "stuck", 0.5)
+    time.sleep(60)
+
+
+@pytest.fixture(scope="module")
+def executor():
+    executor = AnalyticsExecutor(max_workers=1)
+    yield executor
+    executor.shutdown()
+
+
+def test_job_reports_progress_and_returns(executor):
+    job = executor.submit(staged_job, {"stages": 3, "delay": 0.1})
+    seen = set()
+    while not job.done():
+        seen.add(job.progress()[0])
+        time.sleep(0.02)
+
+    assert job.result(timeout=30) == 3
+    assert seen & {"stage 0", "stage 1", "stage 2"}
+    assert job.params == {"stages": 3, "delay": 0.1}
+
+
+def test_cancel_stops_a_cooperative_job_at_its_next_stage(executor):
+    job = executor.submit(staged_job, {"stages": 50, "delay": 0.1})
+    while job.progress()[0] == "Queued":
+        time.sleep(0.02)
+    job.cancel()
+
+    with pytest.raises(AnalyticsCancelled):
+        job.result(timeout=30)
+
+
+def test_terminate_recycles_the_pool_of_a_stuck_job(executor):
+    job = executor.submit(stuck_job, {})
+    while job.progress()[0] != "stuck":
+        time.sleep(0.02)
+
+    assert executor.terminate(job, grace_seconds=0.2)
+    with pytest.raises(AnalyticsCancelled):
+        job.result(timeout=10)
+    assert executor.recycled == 1
+
+    # The fresh pool takes new work
+    assert executor.submit(staged_job, {"stages": 1, "delay": 0.0}).result(timeout=30) == 1
+
+
+def test_frame_buffers_round_trip():
+    df = pd.DataFrame(
+        {
+            "price": [1.0, 2.0],
+            "symbol": ["A", "B"],
+            "when": pd.to_datetime(["2024-01-01", "2024-01-02"]).as_unit("ns")
+        },
+        index=pd.DatetimeIndex(pd.to_datetime(["2024-01-01 10:00", "2024-01-01 10:01"]), name="ts").as_unit("ns")
+    )
+    df.columns.name = "field"
+
+    pd.testing.assert_frame_equal(buffers_to_frame(frame_to_buffers(df)), df, check_freq=False)
+
+
+def test_pipeline_runs_end_to_end_on_stored_ticks():
+    init_db()
+    rng = np.random.default_rng(13)
+    now = datetime.now().replace(microsecond=0)
+    start = now - timedelta(minutes=50)
+    b = 20 + np.cumsum(rng.normal(0, 0.05, 3_000))
+    a = 3 + 1.5 * b + rng.normal(0, 0.02, 3_000)
+    ticks = []
+    for i in range(3_000):
+        ts = (start + timedelta(seconds=i)).isoformat()
+        ticks.append({"ts": ts, "symbol": "PLAUSDT", "price": float(a[i]), "size": 1.0,
+                      "first_trade_id": i + 1, "last_trade_id": i + 1})
+        ticks.append({"ts": ts, "symbol": "PLBUSDT", "price": float(b[i]), "size": 1.0,
+                      "first_trade_id": i + 1, "last_trade_id": i + 1})
+    insert_tick_batch(ticks)
+
+    progress = {}
+    result = run_pair_analytics(
+        ["plausdt", "plbusdt"], "1m", "PLAUSDT", "PLBUSDT", window=10,
+        lookback_minutes=60, progress=progress
+    )
+
+    assert result["status"] == "ok"
+    assert progress == {"stage": "Done", "fraction": 1.0}
+    assert result["hedge"] == pytest.approx(1.5, abs=0.05)
+    spread = buffers_to_frame(result["spread"])
+    assert len(spread) >= 45
+    assert spread["zscore"].notna().sum() == len(spread) - 9
+    assert result["corr_matrix"]["symbols"] == ["PLAUSDT", "PLBUSDT"]
+    assert {record["stage"] for record in result["profile"]} >= {"load_resample", "hedge_ratio_ols", "adf"}
@@ -0,0 +1,94 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from analytics.kalman import kalman_hedge_ratio
+from analytics.live_state import LiveAnalyticsState, restore_live_state
+from analytics.stats import compute_spread, compute_zscore
+from storage.db import init_db, insert_tick_batch
+
+SYMBOLS = ["LSAUSDT", "LSBUSDT"]
+START = datetime(2024, 3, 10, 8, 0)
+
+
+def _closes(n, seed=9):
+    rng = np.random.default_rng(seed)
+    b = 50 + np.cumsum(rng.normal(0, 0.3, n))
+    a = 10 + 2 * b + rng.normal(0, 0.5, n)
+    ts = pd.date_range(START, periods=n, freq="1min")
+    return pd.DataFrame({SYMBOLS[0]: a, SYMBOLS[1]: b}, index=pd.Index(ts, name="ts"))
+
+
+def _feed(state, closes):
+    for ts, row in closes.iterrows():
+        state.update(ts, row.to_dict())
+
+
+def _assert_same(left, right):
+    assert left.last_ts == right.last_ts
+    np.testing.assert_allclose(left.kalman.beta, right.kalman.beta)
+    np.testing.assert_allclose(left.zscores(), right.zscores(), equal_nan=True)
+    pd.testing.assert_frame_equal(left.corr.correlation(), right.corr.correlation())
+
+
+def test_incremental_state_matches_batch_analytics():
+    closes = _closes(120)
+    state = LiveAnalyticsState(SYMBOLS, timeframe="1m", window=20)
+    _feed(state, closes)
+
+    beta = kalman_hedge_ratio(closes, *SYMBOLS, delta=state.delta, obs_var=state.obs_var)["beta"]
+    spread = compute_spread(closes, *SYMBOLS, beta)["spread"].dropna()
+    expected = compute_zscore(spread, 20).iloc[-1]
+
+    assert state.zscores()[0] == pytest.approx(expected, rel=1e-9)
+    assert state.summary()["pairs"][0]["observations"] == 120
+
+
+def test_snapshot_round_trip_continues_like_an_uninterrupted_state(tmp_path):
+    closes = _closes(150)
+    path = str(tmp_path / "live_state.npz")
+
+    uninterrupted = LiveAnalyticsState(SYMBOLS, timeframe="1m", window=20)
+    _feed(uninterrupted, closes)
+
+    before = LiveAnalyticsState(SYMBOLS, timeframe="1m", window=20)
+    _feed(before, closes.iloc[:90])
+    before.save(path)
+
+    after = LiveAnalyticsState(SYMBOLS, timeframe="1m", window=20)
+    assert after.load(path)
+    _feed(after, closes.iloc[85:])  # overlap is ignored
+    _assert_same(after, uninterrupted)
+
+    # Snapshots for other settings are rejected
+    assert not LiveAnalyticsState(SYMBOLS, timeframe="1m", window=30).load(path)
+    assert not LiveAnalyticsState(SYMBOLS[::-1], timeframe="1m", window=20).load(path)
+
+
+def test_restore_replays_ticks_after_the_snapshot(tmp_path):
+    init_db()
+    closes = _closes(60, seed=21)
+    ticks = [
+        {"ts": (ts + timedelta(seconds=30)).isoformat(), "symbol": symbol, "price": float(price),
+         "size": 1.0, "first_trade_id": i + 1, "last_trade_id": i + 1}
+        for i, (ts, row) in enumerate(closes.iterrows())
+        for symbol, price in row.items()
+    ]
+    insert_tick_batch(ticks)
+    path = str(tmp_path / "live_state.npz")
+    now = START + timedelta(minutes=60)
+
+    cold, info = restore_live_state(SYMBOLS, path=path, lookback_minutes=120, now=now,
+                                    timeframe="1m", window=20)
+    assert not info["restored"] and info["replayed_bars"] == 60
+
+    partial = LiveAnalyticsState(SYMBOLS, timeframe="1m", window=20)
+    _feed(partial, closes.iloc[:40])
+    partial.save(path)
+
+    warm, info = restore_live_state(SYMBOLS, path=path, now=now, timeframe="1m", window=20)
+    assert info["restored"] and info["replayed_bars"] == 20
+    assert info["replay_from"] == (START + timedelta(minutes=40)).isoformat()
+    _assert_same(warm, cold)
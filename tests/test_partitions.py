@@ -0,0 +1,142 @@
+import threading
+import time
+from datetime import date, datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+
+import storage.db as db
+from storage import partitions
+from storage.partitions import (
+    drop_partitions_before,
+    list_partitions,
+    migrate_legacy_ticks,
+    partitions_for_range,
+    retention_cutoff,
+    ticks_source
+)
+
+
+@pytest.fixture
+def scratch_db(tmp_path, monkeypatch):
+    """
+    A separate database for tests that drop partitions wholesale.
+    """
+    engine = create_engine(f"sqlite:///{tmp_path / 'ticks.db'}", future=True)
+    monkeypatch.setattr(db, "engine", engine)
+    monkeypatch.setattr(partitions, "_known_partitions", set())
+    db.init_db()
+    yield engine
+    engine.dispose()
+
+
+def _tick(ts, trade_id, symbol="PTUSDT"):
+    return {"ts": ts.isoformat(), "symbol": symbol, "price": 1.0, "size": 1.0,
+            "first_trade_id": trade_id, "last_trade_id": trade_id}
+
+
+def _count(conn, source="ticks"):
+    return conn.execute(text(f"SELECT COUNT(*) FROM {source}")).scalar()
+
+
+def test_ticks_route_to_day_partitions_and_reads_prune_them(scratch_db):
+    first = datetime(2024, 4, 1, 23, 59, 59)
+    db.insert_tick_batch([_tick(first + timedelta(seconds=i), i) for i in range(3)])
+    # Duplicate trade ids are ignored
+    db.insert_tick_batch([_tick(first, 0)])
+
+    with scratch_db.connect() as conn:
+        assert [name for _, name in list_partitions(conn)] == ["ticks_20240401", "ticks_20240402"]
+        assert _count(conn) == 3
+        assert _count(conn, "ticks_20240402") == 2
+
+        assert ticks_source(conn, datetime(2024, 4, 2), datetime(2024, 4, 3)) == "ticks_20240402"
+        assert partitions_for_range(conn, None, datetime(2024, 4, 2)) == ["ticks_20240401"]
+        assert _count(conn, ticks_source(conn, datetime(2024, 5, 1), None)) == 0
+
+
+def test_retention_drops_whole_days_and_old_bars(scratch_db):
+    today = date.today()
+    for age in range(4):
+        day = datetime.combine(today - timedelta(days=age), datetime.min.time())
+        db.insert_tick_batch([_tick(day + timedelta(hours=1), 100 - age)])
+        db.insert_bars([{
+            "symbol": "PTUSDT", "timeframe": "1m", "ts": day, "open": 1.0, "high": 1.0,
+            "low": 1.0, "close": 1.0, "volume": 1.0, "vwap": 1.0, "trade_count": 1,
+            "buy_volume": 1.0, "sell_volume": 0.0, "imbalance": 1.0
+        }])
+
+    dropped = db.apply_retention(retention_days=2)
+
+    cutoff = retention_cutoff(2)
+    assert cutoff == today - timedelta(days=1)
+    assert sorted(dropped) == [
+        partitions.partition_name(today - timedelta(days=age)) for age in (3, 2)
+    ]
+    with scratch_db.connect() as conn:
+        assert _count(conn) == 2
+        assert conn.execute(text("SELECT MIN(ts) FROM bars")).scalar() >= cutoff.isoformat()
+        assert drop_partitions_before(conn, cutoff) == []
+
+
+def test_legacy_ticks_table_is_migrated_into_partitions(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}", future=True)
+    monkeypatch.setattr(partitions, "_known_partitions", set())
+
+    with engine.connect() as conn:
+        conn.execute(text(
+            "CREATE TABLE ticks (id INTEGER PRIMARY KEY, ts TEXT, symbol TEXT, price REAL, size REAL)"
+        ))
+        conn.execute(text("""
+            INSERT INTO ticks (ts, symbol, price, size) VALUES
+            ('2024-04-01T10:00:00', 'LGUSDT', 1.0, 1.0),
+            ('2024-04-02T10:00:00', 'LGUSDT', 2.0, 1.0)
+        """))
+        conn.commit()
+
+        assert migrate_legacy_ticks(conn) == 2
+        partitions.refresh_ticks_view(conn)
+        conn.commit()
+
+        assert [name for _, name in list_partitions(conn)] == ["ticks_20240401", "ticks_20240402"]
+        assert conn.execute(text("SELECT type FROM sqlite_master WHERE name = 'ticks'")).scalar() == "view"
+        assert _count(conn) == 2
+        assert migrate_legacy_ticks(conn) == 0
+
+    engine.dispose()
+
+
+def test_readers_never_see_the_view_missing_while_it_is_rebuilt(scratch_db):
+    db.insert_tick_batch([_tick(datetime(2024, 4, 3, 12, 0), 1)])
+    errors, reads = [], []
+    stop = threading.Event()
+
+    def rebuild():
+        with scratch_db.connect() as conn:
+            while not stop.is_set():
+                partitions.refresh_ticks_view(conn)
+                conn.commit()
+
+    def read():
+        # Separate engine: stands in for another process (dashboard, Arrow service)
+        reader = create_engine(f"sqlite:///{scratch_db.url.database}", future=True)
+        with reader.connect() as conn:
+            while not stop.is_set():
+                try:
+                    reads.append(_count(conn))
+                except OperationalError as e:
+                    errors.append(str(e))
+                conn.rollback()
+        reader.dispose()
+
+    threads = [threading.Thread(target=rebuild), threading.Thread(target=read)]
+    for thread in threads:
+        thread.start()
+    time.sleep(1.0)
+    stop.set()
+    for thread in threads:
+        thread.join(10)
+
+    assert reads and set(reads) == {1}
+    assert errors == []
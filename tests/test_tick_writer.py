@@ -0,0 +1,49 @@
+import asyncio
+from datetime import datetime, timedelta
+
+from ingestion.binance_ws import TickWriter
+from storage.db import init_db, load_symbol_ticks
+
+
+def _ticks(start, count, symbol="TWUSDT"):
+    return [
+        {
+            "ts": (start + timedelta(seconds=i)).isoformat(),
+            "symbol": symbol,
+            "price": 100.0 + i,
+            "size": 1.0,
+            "first_trade_id": i + 1,
+            "last_trade_id": i + 1,
+            "is_buyer_maker": bool(i % 2)
+        }
+        for i in range(count)
+    ]
+
+
+def test_tick_writer_stores_full_batches_and_flushes_the_rest():
+    init_db()
+    start = datetime(2024, 3, 6, 9, 0)
+    ticks = _ticks(start, 7)
+
+    async def scenario():
+        writer = TickWriter("twusdt", batch_size=3, flush_seconds=60)
+        for tick in ticks[:2]:
+            writer.add(tick)
+        assert writer._pending is None
+
+        # A full buffer is written in the background
+        writer.add(ticks[2])
+        await writer._pending
+        assert writer.stored == 3
+
+        # Ticks arriving during a write join the next batch
+        for tick in ticks[3:]:
+            writer.add(tick)
+        await writer._pending
+        return writer.stored
+
+    assert asyncio.run(scenario()) == 7
+
+    stored = load_symbol_ticks("TWUSDT", start, start + timedelta(minutes=1))
+    assert [t["first_trade_id"] for t in stored] == list(range(1, 8))
+    assert [t["is_buyer_maker"] for t in stored] == [bool(i % 2) for i in range(7)]
@@ -1,6 +1,6 @@
 """
 User interface components and visualizations.
 """
-from .plots import plot_prices, plot_spread_zscore, plot_correlation
+from .plots import plot_prices, plot_spread_zscore, plot_correlation, plot_correlation_matrix
 
-__all__ = ['plot_prices', 'plot_spread_zscore', 'plot_correlation']
+__all__ = ['plot_prices', 'plot_spread_zscore', 'plot_correlation', 'plot_correlation_matrix']
@@ -1,4 +1,5 @@
-import plotly.graph_objects as go
+# plotly is imported inside each function so importing this module (and
+# the dashboard) stays cheap until a chart is actually drawn.
 
 
 def plot_prices(df, symbol_a, symbol_b):
@@ -17,6 +18,8 @@ def plot_prices(df, symbol_a, symbol_b):
     Returns:
         Plotly figure object
     """
+    import plotly.graph_objects as go
+
     fig = go.Figure()
 
     fig.add_trace(go.Scatter(
@@ -64,6 +67,8 @@ def plot_spread_zscore(df, threshold=2.0):
     Returns:
         Plotly figure object
     """
+    import plotly.graph_objects as go
+
     fig = go.Figure()
 
     # Spread trace
@@ -155,6 +160,8 @@ def plot_correlation(corr_series):
     Returns:
         Plotly figure object
     """
+    import plotly.graph_objects as go
+
     fig = go.Figure()
 
     fig.add_trace(go.Scatter(
@@ -201,3 +208,40 @@ def plot_correlation(corr_series):
     )
 
     return fig
+
+
+def plot_correlation_matrix(corr_df):
+    """
+    Plot an N×N correlation matrix as a heatmap.
+
+    Args:
+        corr_df: Square DataFrame of correlation coefficients labelled by symbol
+
+    Returns:
+        Plotly figure object
+    """
+    import plotly.graph_objects as go
+
+    fig = go.Figure()
+
+    fig.add_trace(go.Heatmap(
+        z=corr_df.values,
+        x=list(corr_df.columns),
+        y=list(corr_df.index),
+        zmin=-1,
+        zmax=1,
+        colorscale="RdBu",
+        reversescale=True,
+        text=corr_df.values,
+        texttemplate="%{text:.2f}",
+        hovertemplate='%{y} / %{x}: %{z:.3f}<extra></extra>'
+    ))
+
+    fig.update_layout(
+        title="Rolling Correlation Matrix",
+        template="plotly_dark",
+        height=max(400, 40 * len(corr_df)),
+        yaxis=dict(autorange="reversed")
+    )
+
+    return fig